@@ -0,0 +1,100 @@
+"""records.search_vector: indexed full-text search over payload values
+
+Revision ID: 8e41c0d7a9f2
+Revises: 5b2d9e61c7a3
+Create Date: 2025-12-09 10:41:05.220317
+
+`search_vector` holds the lexemes of the payload *values* (strings, numbers
+and booleans, never keys) and is maintained by a trigger on insert/update.
+Like the JSONB migration, it avoids a table rewrite: the column is added
+nullable, backfilled in id-range batches and indexed CONCURRENTLY.
+
+"""
+from typing import Sequence, Union
+
+from alembic import op, context
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8e41c0d7a9f2'
+down_revision: Union[str, Sequence[str], None] = '5b2d9e61c7a3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+BACKFILL_BATCH_SIZE = 10_000
+
+SEARCH_VECTOR_EXPR = (
+    "jsonb_to_tsvector('simple', {payload}, '[\"string\", \"numeric\", \"boolean\"]')"
+)
+
+
+def _backfill() -> None:
+    expr = SEARCH_VECTOR_EXPR.format(payload="payload")
+    if context.is_offline_mode():
+        op.execute(
+            f"UPDATE records SET search_vector = {expr} WHERE search_vector IS NULL"
+        )
+        return
+
+    bind = op.get_bind()
+    lo, hi = bind.execute(sa.text("SELECT min(id), max(id) FROM records")).one()
+    if lo is None:
+        return
+
+    start = lo - 1
+    while start < hi:
+        end = start + BACKFILL_BATCH_SIZE
+        bind.execute(
+            sa.text(
+                f"UPDATE records SET search_vector = {expr} "
+                "WHERE id > :start AND id <= :end AND search_vector IS NULL"
+            ),
+            {"start": start, "end": end},
+        )
+        start = end
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('records', sa.Column('search_vector', postgresql.TSVECTOR(), nullable=True))
+    op.execute(
+        f"""
+        CREATE FUNCTION records_search_vector_sync() RETURNS trigger AS $$
+        BEGIN
+            NEW.search_vector := {SEARCH_VECTOR_EXPR.format(payload="NEW.payload")};
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    op.execute(
+        "CREATE TRIGGER records_search_vector_sync "
+        "BEFORE INSERT OR UPDATE OF payload ON records "
+        "FOR EACH ROW EXECUTE FUNCTION records_search_vector_sync()"
+    )
+
+    with op.get_context().autocommit_block():
+        _backfill()
+        op.create_index(
+            'ix_records_search_vector',
+            'records',
+            ['search_vector'],
+            postgresql_using='gin',
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_records_search_vector',
+            table_name='records',
+            postgresql_concurrently=True,
+        )
+    op.execute("DROP TRIGGER records_search_vector_sync ON records")
+    op.execute("DROP FUNCTION records_search_vector_sync()")
+    op.drop_column('records', 'search_vector')
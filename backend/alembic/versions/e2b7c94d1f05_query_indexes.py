@@ -0,0 +1,58 @@
+"""composite indexes for the repository queries
+
+Revision ID: e2b7c94d1f05
+Revises: c3f1a8d52b67
+Create Date: 2025-12-14 16:05:38.901244
+
+acc16dc01f81 only created primary keys and unique constraints, so every
+dataset-scoped records query, the bookmark listing and the default
+dataset sort were sequential scans:
+
+- records (dataset_id, id): WHERE dataset_id = ? ORDER BY / seek on id,
+  counts and batch lookups
+- bookmarks (user_id, dataset_id, created_at DESC) and
+  (user_id, created_at DESC): list_bookmarks_for_user with and without a
+  dataset, newest first
+- datasets (updated_at): list_datasets' default sort
+
+Built CONCURRENTLY so writes keep flowing on large tables. Check the
+result with `python -m app.db.index_advisor`.
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2b7c94d1f05'
+down_revision: Union[str, Sequence[str], None] = 'c3f1a8d52b67'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+INDEXES = [
+    ('ix_records_dataset_id_id', 'records', ['dataset_id', 'id']),
+    (
+        'ix_bookmarks_user_dataset_created_at',
+        'bookmarks',
+        ['user_id', 'dataset_id', sa.text('created_at DESC')],
+    ),
+    ('ix_bookmarks_user_created_at', 'bookmarks', ['user_id', sa.text('created_at DESC')]),
+    ('ix_datasets_updated_at', 'datasets', ['updated_at']),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True)
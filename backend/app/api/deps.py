@@ -1,4 +1,15 @@
-from fastapi import Header, HTTPException, status
+import secrets
+from typing import Any, Awaitable, Callable, Optional, TypeVar
+
+from fastapi import Depends, Header, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.base import get_async_db, get_db
+
+T = TypeVar("T")
 
 
 def get_current_user_id(x_user_id: str = Header(alias="X-User-Id")) -> str:
@@ -12,3 +23,54 @@ def get_current_user_id(x_user_id: str = Header(alias="X-User-Id")) -> str:
             detail="X-User-Id header is required",
         )
     return user_id
+
+
+def require_admin(x_admin_token: str = Header("", alias="X-Admin-Token")) -> None:
+    """
+    Guard for admin endpoints: X-Admin-Token must match settings.admin_token.
+    """
+    if not settings.admin_token or not secrets.compare_digest(
+        x_admin_token, settings.admin_token
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin token required",
+        )
+
+
+class DbRunner:
+    """
+    Runs a service against the request's database session:
+
+    - fn(db=Session, ...) in FastAPI's threadpool, as plain `def` endpoints
+      did; CPU work in the service (page assembly, the columnar cache,
+      NumPy filtering) stays off the event loop.
+    - with settings.db_async, async_fn(db=AsyncSession, ...) instead when
+      the endpoint has one: a service over async repository functions,
+      awaited on the loop with every query on psycopg's async driver, so no
+      threadpool slot is held while queries are in flight. Only the hot
+      read paths have one.
+    """
+
+    def __init__(self, db: Session, async_db: AsyncSession, use_async: bool):
+        self.db = db
+        self.async_db = async_db
+        self.use_async = use_async
+
+    async def run(
+        self,
+        fn: Callable[..., T],
+        async_fn: Optional[Callable[..., Awaitable[T]]] = None,
+        **kwargs: Any,
+    ) -> T:
+        if self.use_async and async_fn is not None:
+            return await async_fn(db=self.async_db, **kwargs)
+        return await run_in_threadpool(fn, db=self.db, **kwargs)
+
+
+def get_db_runner(
+    db: Session = Depends(get_db),
+    async_db: AsyncSession = Depends(get_async_db),
+) -> DbRunner:
+    # Both sessions are lazy: only the one actually used opens a connection.
+    return DbRunner(db, async_db, settings.db_async)
@@ -0,0 +1,111 @@
+# app/api/routers/admin.py
+
+from typing import Dict, List
+
+from fastapi import APIRouter, BackgroundTasks, Depends, Query, status
+from sqlalchemy.orm import Session
+
+from app.db.base import async_engine, engine, export_engine, get_db
+from app.db.index_manager import apply_plan
+from app.db.pool import pool_metrics
+from app.api.deps import require_admin
+from app.domain.schemas.admin import IndexPlan, IndexRequest, PoolMetrics
+from app.domain.schemas.job import Job, StatsRefreshRequest
+from app.domain.services.dataset_service import (
+    delete_dataset as svc_delete_dataset,
+)
+from app.domain.services.index_service import (
+    plan_dataset_indexes as svc_plan_dataset_indexes,
+)
+from app.domain.services.job_service import (
+    refresh_dataset_stats as svc_refresh_dataset_stats,
+)
+
+router = APIRouter(
+    prefix="/api/v1/admin",
+    tags=["admin"],
+    dependencies=[Depends(require_admin)],
+)
+
+
+@router.get("/datasets/{dataset_id}/indexes", response_model=IndexPlan)
+def get_dataset_indexes(
+    dataset_id: str,
+    db: Session = Depends(get_db),
+):
+    """
+    Current index plan for a dataset: which managed indexes exist, which are
+    missing, and which are INVALID after a failed concurrent build.
+    """
+    return svc_plan_dataset_indexes(db=db, dataset_id=dataset_id, hot_fields=[])
+
+
+@router.post(
+    "/datasets/{dataset_id}/indexes",
+    response_model=IndexPlan,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+def post_dataset_indexes(
+    dataset_id: str,
+    background_tasks: BackgroundTasks,
+    body: IndexRequest = IndexRequest(),
+    dry_run: bool = Query(False, description="Only return the plan"),
+    db: Session = Depends(get_db),
+):
+    """
+    Plan the payload expression indexes for a dataset and build them in the
+    background (CREATE INDEX CONCURRENTLY can take a while on big datasets).
+
+    Build failures are logged; poll GET .../indexes to see the outcome.
+    """
+    plan = svc_plan_dataset_indexes(
+        db=db,
+        dataset_id=dataset_id,
+        hot_fields=body.hot_fields,
+    )
+    if not dry_run:
+        background_tasks.add_task(
+            apply_plan, db.get_bind(), plan, drop_stale=body.drop_stale
+        )
+    return plan
+
+
+@router.delete("/datasets/{dataset_id}", status_code=status.HTTP_204_NO_CONTENT)
+def delete_dataset(
+    dataset_id: str,
+    db: Session = Depends(get_db),
+):
+    """
+    Delete a dataset with its records, fields, bookmarks and jobs. With a
+    partitioned records table this drops the dataset's partition.
+    """
+    svc_delete_dataset(db=db, dataset_id=dataset_id)
+
+
+@router.get("/pools", response_model=Dict[str, PoolMetrics])
+def get_pool_metrics():
+    """
+    Connection pool usage per engine: checked-out, idle and overflow
+    connections right now, plus checkout wait times since startup.
+    """
+    return {
+        "api": pool_metrics(engine.pool),
+        "export": pool_metrics(export_engine.pool),
+        "async": pool_metrics(async_engine.sync_engine.pool),
+    }
+
+
+@router.post(
+    "/stats:refresh",
+    response_model=List[Job],
+    status_code=status.HTTP_202_ACCEPTED,
+)
+def post_stats_refresh(
+    body: StatsRefreshRequest = StatsRefreshRequest(),
+    db: Session = Depends(get_db),
+):
+    """
+    Queue stats refresh jobs for several datasets (all when dataset_ids is
+    empty); they run in parallel in the job worker processes.
+    """
+    return svc_refresh_dataset_stats(db=db, dataset_ids=body.dataset_ids)
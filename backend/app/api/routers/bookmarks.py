@@ -1,73 +1,126 @@
-from typing import Optional
+from typing import Literal, Optional
 
 from fastapi import APIRouter, Depends, Query, status
-from sqlalchemy.orm import Session
 
-from app.db.base import get_db
-from app.api.deps import get_current_user_id
+from app.api.deps import DbRunner, get_current_user_id, get_db_runner
 from app.domain.schemas.bookmark import (
     PaginatedBookmarks,
     Bookmark,
+    BookmarkBulkCreate,
+    BookmarkBulkDelete,
+    BookmarkBulkDeleteResult,
+    BookmarkBulkResult,
     BookmarkCreate,
 )
 from app.domain.services.bookmark_service import (
     list_bookmarks as svc_list_bookmarks,
+    list_bookmarks_async as svc_list_bookmarks_async,
     create_bookmark as svc_create_bookmark,
+    create_bookmarks as svc_create_bookmarks,
     delete_bookmark as svc_delete_bookmark,
+    delete_bookmarks as svc_delete_bookmarks,
 )
 
 router = APIRouter(prefix="/api/v1/bookmarks", tags=["bookmarks"])
 
 
 @router.get("", response_model=PaginatedBookmarks)
-def get_bookmarks(
+async def get_bookmarks(
     dataset_id: Optional[str] = Query(
         None, description="Filter bookmarks by dataset id"
     ),
     page: int = Query(1, ge=1),
     limit: int = Query(20, ge=1, le=100),
-    db: Session = Depends(get_db),
+    include: Optional[Literal["record"]] = Query(
+        None, description="'record' to embed each bookmarked record"
+    ),
+    fields: Optional[str] = Query(
+        None,
+        description="With include=record: comma-separated payload fields to "
+        "return, e.g. 'symbol,length' (default: the whole payload)",
+    ),
+    db: DbRunner = Depends(get_db_runner),
     user_id: str = Depends(get_current_user_id),
 ):
     """
     List bookmarks for current user, optionally filtered by dataset.
+
+    With include=record the records come from the same query (a join), not
+    one request per bookmark.
     """
-    return svc_list_bookmarks(
-        db=db,
+    return await db.run(
+        svc_list_bookmarks,
+        svc_list_bookmarks_async,
         user_id=user_id,
         dataset_id=dataset_id,
         page=page,
         limit=limit,
+        include_record=include == "record",
+        fields=[f.strip() for f in fields.split(",") if f.strip()] if fields else None,
     )
 
 
 @router.post("", response_model=Bookmark, status_code=status.HTTP_201_CREATED)
-def post_bookmark(
+async def post_bookmark(
     payload: BookmarkCreate,
-    db: Session = Depends(get_db),
+    db: DbRunner = Depends(get_db_runner),
     user_id: str = Depends(get_current_user_id),
 ):
     """
     Create a bookmark for the current user.
     """
-    return svc_create_bookmark(
-        db=db,
+    return await db.run(
+        svc_create_bookmark,
+        user_id=user_id,
+        payload=payload,
+    )
+
+
+# IMPORTANT: put the /bulk routes BEFORE /{bookmark_id}
+@router.post("/bulk", response_model=BookmarkBulkResult)
+async def post_bookmarks_bulk(
+    payload: BookmarkBulkCreate,
+    db: DbRunner = Depends(get_db_runner),
+    user_id: str = Depends(get_current_user_id),
+):
+    """
+    Create up to MAX_BULK_BOOKMARKS bookmarks for the current user in one
+    INSERT ... ON CONFLICT, with a status per item.
+    """
+    return await db.run(
+        svc_create_bookmarks,
         user_id=user_id,
         payload=payload,
     )
 
 
+@router.delete("/bulk", response_model=BookmarkBulkDeleteResult)
+async def delete_bookmarks_bulk(
+    payload: BookmarkBulkDelete,
+    db: DbRunner = Depends(get_db_runner),
+    user_id: str = Depends(get_current_user_id),
+):
+    """
+    Delete several bookmarks of the current user in one statement.
+    """
+    return await db.run(
+        svc_delete_bookmarks,
+        user_id=user_id,
+        bookmark_ids=payload.ids,
+    )
+
+
 @router.delete("/{bookmark_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_bookmark_endpoint(
+async def delete_bookmark_endpoint(
     bookmark_id: int,
-    db: Session = Depends(get_db),
+    db: DbRunner = Depends(get_db_runner),
     user_id: str = Depends(get_current_user_id),
 ):
     """
     Delete a bookmark owned by the current user.
     """
-    svc_delete_bookmark(
-        db=db,
+    await db.run(
+        svc_delete_bookmark,
         user_id=user_id,
         bookmark_id=bookmark_id,
     )
@@ -1,84 +1,254 @@
 # app/api/routers/datasets.py
 
-from typing import Optional
+from typing import Literal, Optional
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Request, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from fastapi.responses import StreamingResponse
+from fastapi.responses import Response, StreamingResponse
 
-from app.db.base import get_db
+from app.api.deps import DbRunner, get_db_runner
+from app.core.config import settings
+from app.db.base import get_async_db, get_export_db
 from app.domain.schemas.dataset import (
     PaginatedDatasets,
     DatasetDetail,
+    FieldHistogram,
 )
-from app.domain.schemas.record import PaginatedRecords, RecordDetail
+from app.domain.schemas.job import Job
+from app.domain.schemas.record import (
+    AggregateResult,
+    IngestResult,
+    PaginatedRecords,
+    RecordBatch,
+    RecordBatchRequest,
+    RecordDetail,
+)
+from app.domain.repositories.record_repo import SearchMode
 from app.domain.services.dataset_service import (
     list_datasets as svc_list_datasets,
     get_dataset_detail as svc_get_dataset_detail,
+    get_dataset_detail_async as svc_get_dataset_detail_async,
+)
+from app.domain.services.arrow_export import EXTENSIONS, MEDIA_TYPES
+from app.domain.services.aggregate_service import (
+    aggregate_records as svc_aggregate_records,
+)
+from app.domain.services.histogram_service import (
+    field_histogram as svc_field_histogram,
+)
+from app.domain.services.job_service import (
+    refresh_single_dataset_stats as svc_refresh_single_dataset_stats,
+)
+from app.domain.services.ingest_service import (
+    IngestFormat,
+    ingest_records as svc_ingest_records,
+    resolve_format as svc_resolve_format,
 )
 from app.domain.services.record_service import (
-    list_records as svc_list_records,
+    CountMode,
+    list_records_json as svc_list_records_json,
+    list_records_json_async as svc_list_records_json_async,
     get_record_detail as svc_get_record_detail,
+    get_records_batch as svc_get_records_batch,
     export_records_csv as svc_export_records_csv,
+    export_records_columnar as svc_export_records_columnar,
 )
 
 router = APIRouter(prefix="/api/v1/datasets", tags=["datasets"])
 
 
 @router.get("", response_model=PaginatedDatasets)
-def get_datasets(
+async def get_datasets(
     search: Optional[str] = Query(None, description="Search by dataset name"),
     page: int = Query(1, ge=1),
     limit: int = Query(20, ge=1, le=100),
-    db: Session = Depends(get_db),
+    db: DbRunner = Depends(get_db_runner),
 ):
     """
     List datasets with simple search + pagination.
     """
-    return svc_list_datasets(db=db, search=search, page=page, limit=limit)
+    return await db.run(svc_list_datasets, search=search, page=page, limit=limit)
 
 
 @router.get("/{dataset_id}", response_model=DatasetDetail)
-def get_dataset(
+async def get_dataset(
     dataset_id: str,
-    db: Session = Depends(get_db),
+    db: DbRunner = Depends(get_db_runner),
 ):
     """
     Get dataset detail including schema fields.
     """
-    return svc_get_dataset_detail(db=db, dataset_id=dataset_id)
+    return await db.run(
+        svc_get_dataset_detail,
+        svc_get_dataset_detail_async,
+        dataset_id=dataset_id,
+    )
+
+
+@router.get(
+    "/{dataset_id}/fields/{field_name}/histogram",
+    response_model=FieldHistogram,
+)
+async def get_field_histogram(
+    dataset_id: str,
+    field_name: str,
+    bins: int = Query(20, ge=1, le=200, description="Buckets for numeric fields"),
+    top: int = Query(10, ge=1, le=100, description="Most frequent values for other fields"),
+    search: Optional[str] = Query(
+        None, description="Simple text search against record payload"
+    ),
+    search_mode: SearchMode = Query(
+        "substring",
+        description="'substring' (ILIKE over the payload text) or 'fulltext' "
+        "(indexed prefix match on payload values)",
+    ),
+    filter: Optional[str] = Query(  # noqa: A002
+        None,
+        description="Filter clauses, e.g. 'length:gt:1000,symbol:like:TP', "
+        "'symbol:in:TP53|EGFR', 'length:between:100|2000', 'note:isnull:true', "
+        "'or(symbol:eq:MYC,length:gt:1000)'",
+    ),
+    db: DbRunner = Depends(get_db_runner),
+):
+    """
+    Value distribution of a field over the records matching search/filter:
+    binned counts, min/max/mean and p50/p90/p99 for numeric fields, top-k
+    value counts for the others.
+    """
+    return await db.run(
+        svc_field_histogram,
+        dataset_id=dataset_id,
+        field=field_name,
+        bins=bins,
+        top=top,
+        search=search,
+        filter_str=filter,
+        search_mode=search_mode,
+    )
+
+
+@router.post(
+    "/{dataset_id}/stats:refresh",
+    response_model=Job,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+async def refresh_dataset_stats(
+    dataset_id: str,
+    db: DbRunner = Depends(get_db_runner),
+):
+    """
+    Queue a recomputation of the dataset's row_count and field stats.
+
+    Returns the job; poll GET /api/v1/jobs/{job_id} for its status.
+    """
+    return await db.run(svc_refresh_single_dataset_stats, dataset_id=dataset_id)
 
 
 @router.get("/{dataset_id}/records", response_model=PaginatedRecords)
-def get_dataset_records(
+async def get_dataset_records(
     dataset_id: str,
     page: int = Query(1, ge=1),
     limit: int = Query(25, ge=1, le=100),
     search: Optional[str] = Query(
         None, description="Simple text search against record payload"
     ),
+    search_mode: SearchMode = Query(
+        "substring",
+        description="'substring' (ILIKE over the payload text) or 'fulltext' "
+        "(indexed prefix match on payload values)",
+    ),
     sort: Optional[str] = Query(
         None,
         description="Sort by field and direction, e.g. 'length:asc' or 'symbol:desc'",
     ),
     filter: Optional[str] = Query(  # noqa: A002
         None,
-        description="Filter clauses, e.g. 'length:gt:1000,symbol:like:TP'",
+        description="Filter clauses, e.g. 'length:gt:1000,symbol:like:TP', "
+        "'symbol:in:TP53|EGFR', 'length:between:100|2000', 'note:isnull:true', "
+        "'or(symbol:eq:MYC,length:gt:1000)'",
+    ),
+    cursor: Optional[str] = Query(
+        None,
+        description="Keyset cursor from a previous page's next_cursor; "
+        "when given, 'page' is ignored",
     ),
-    db: Session = Depends(get_db),
+    count_mode: CountMode = Query(
+        "exact",
+        description="'exact' count(*), 'estimated' planner/row_count estimate, "
+        "or 'cached' exact count reused until the dataset changes",
+    ),
+    db: DbRunner = Depends(get_db_runner),
 ):
     """
     List records for a dataset with pagination, search, sort, and filters.
+
+    Pages can be addressed either by 'page' (OFFSET) or by 'cursor'
+    (keyset); every response carries a next_cursor for the following page.
+
+    The body is assembled from the payloads' JSON text as Postgres returns
+    it (response_model documents its shape; it is not re-validated).
     """
-    return svc_list_records(
-        db=db,
+    body = await db.run(
+        svc_list_records_json,
+        # the columnar cache is CPU-bound: threadpool only
+        None if settings.columnar_cache_enabled else svc_list_records_json_async,
         dataset_id=dataset_id,
         page=page,
         limit=limit,
         search=search,
         sort=sort,
         filter_str=filter,
+        cursor=cursor,
+        search_mode=search_mode,
+        count_mode=count_mode,
+    )
+    return Response(content=body, media_type="application/json")
+
+
+# IMPORTANT: put this BEFORE /{dataset_id}/records/{record_id}
+@router.get("/{dataset_id}/records/aggregate", response_model=AggregateResult)
+async def aggregate_dataset_records(
+    dataset_id: str,
+    group_by: Optional[str] = Query(
+        None, description="Comma-separated fields to group by, e.g. 'condition'"
+    ),
+    metrics: Optional[str] = Query(
+        None,
+        description="Comma-separated aggregates: count, or sum|mean|min|max|count "
+        "over a field, e.g. 'count,mean:value,max:pvalue' (default: count)",
+    ),
+    limit: int = Query(1000, ge=1, le=10_000, description="Max groups returned"),
+    search: Optional[str] = Query(
+        None, description="Simple text search against record payload"
+    ),
+    search_mode: SearchMode = Query(
+        "substring",
+        description="'substring' (ILIKE over the payload text) or 'fulltext' "
+        "(indexed prefix match on payload values)",
+    ),
+    filter: Optional[str] = Query(  # noqa: A002
+        None,
+        description="Filter clauses, e.g. 'length:gt:1000,symbol:like:TP', "
+        "'symbol:in:TP53|EGFR', 'length:between:100|2000', 'note:isnull:true', "
+        "'or(symbol:eq:MYC,length:gt:1000)'",
+    ),
+    db: DbRunner = Depends(get_db_runner),
+):
+    """
+    Aggregate the records matching search/filter per group, computed in the
+    database, e.g. ?group_by=condition&metrics=count,mean:value.
+    """
+    return await db.run(
+        svc_aggregate_records,
+        dataset_id=dataset_id,
+        group_by_str=group_by,
+        metrics_str=metrics,
+        search=search,
+        filter_str=filter,
+        search_mode=search_mode,
+        limit=limit,
     )
 
 
@@ -91,53 +261,128 @@ def export_dataset_records(
     search: Optional[str] = Query(
         None, description="Simple text search against record payload"
     ),
+    search_mode: SearchMode = Query(
+        "substring",
+        description="'substring' (ILIKE over the payload text) or 'fulltext' "
+        "(indexed prefix match on payload values)",
+    ),
     sort: Optional[str] = Query(
         None,
         description="Sort by field and direction, e.g. 'length:asc' or 'symbol:desc'",
     ),
     filter: Optional[str] = Query(  # noqa: A002
         None,
-        description="Filter clauses, e.g. 'length:gt:1000,symbol:like:TP'",
+        description="Filter clauses, e.g. 'length:gt:1000,symbol:like:TP', "
+        "'symbol:in:TP53|EGFR', 'length:between:100|2000', 'note:isnull:true', "
+        "'or(symbol:eq:MYC,length:gt:1000)'",
+    ),
+    format: Literal["csv", "parquet", "arrow"] = Query(  # noqa: A002
+        "csv",
+        description="'csv', 'parquet', or 'arrow' (Arrow IPC stream); the "
+        "columnar formats are typed from the dataset's field types",
     ),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_export_db),
 ):
     """
-    Export the current page of records as CSV, using the same
+    Export all matching records as CSV, Parquet or Arrow, using the same
     search/sort/filter parameters as the JSON records endpoint.
+
+    The body is streamed batch by batch (row group by row group for the
+    columnar formats) straight from a server-side cursor.
+    This stays a sync endpoint on the export engine, whose pool is separate
+    from the one serving the other endpoints.
     """
-    csv_buf = svc_export_records_csv(
-        db=db,
-        dataset_id=dataset_id,
-        page=page,
-        limit=limit,
-        search=search,
-        sort=sort,
-        filter_str=filter,
-    )
+    if format == "csv":
+        chunks = svc_export_records_csv(
+            db=db,
+            dataset_id=dataset_id,
+            page=page,
+            limit=limit,
+            search=search,
+            sort=sort,
+            filter_str=filter,
+            search_mode=search_mode,
+        )
+        media_type, extension = "text/csv", "csv"
+    else:
+        chunks = svc_export_records_columnar(
+            db=db,
+            dataset_id=dataset_id,
+            search=search,
+            sort=sort,
+            filter_str=filter,
+            fmt=format,
+            search_mode=search_mode,
+        )
+        media_type, extension = MEDIA_TYPES[format], EXTENSIONS[format]
 
-    csv_buf.seek(0)
-    filename = f"{dataset_id}_export.csv"
+    filename = f"{dataset_id}_export.{extension}"
 
     return StreamingResponse(
-        csv_buf,
-        media_type="text/csv",
+        chunks,
+        media_type=media_type,
         headers={
             "Content-Disposition": f'attachment; filename="{filename}"'
         },
     )
 
 
+@router.post("/{dataset_id}/records/ingest", response_model=IngestResult)
+async def ingest_dataset_records(
+    dataset_id: str,
+    request: Request,
+    format: Optional[IngestFormat] = Query(  # noqa: A002
+        None,
+        description="'csv' (header row + one record per row) or 'ndjson' "
+        "(one JSON object per line); defaults from the Content-Type",
+    ),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Bulk-append records to a dataset from a streamed CSV or NDJSON body.
+
+    The body is parsed as it arrives and loaded with COPY in batches, in a
+    single transaction; a malformed row rejects the whole upload with 400.
+    Always runs on the async engine, since it consumes the request stream.
+    """
+    fmt = svc_resolve_format(format, request.headers.get("content-type"))
+    return await svc_ingest_records(
+        db=db,
+        dataset_id=dataset_id,
+        chunks=request.stream(),
+        fmt=fmt,
+    )
+
+
+@router.post("/{dataset_id}/records/batch", response_model=RecordBatch)
+async def get_dataset_records_batch(
+    dataset_id: str,
+    body: RecordBatchRequest,
+    db: DbRunner = Depends(get_db_runner),
+):
+    """
+    Fetch up to MAX_BATCH_IDS records of a dataset by id in one request
+    (and one query), optionally projected to some payload fields.
+    """
+    return await db.run(
+        svc_get_records_batch,
+        dataset_id=dataset_id,
+        record_ids=body.ids,
+        fields=body.fields,
+    )
+
+
 @router.get("/{dataset_id}/records/{record_id}", response_model=RecordDetail)
-def get_dataset_record_detail(
+async def get_dataset_record_detail(
     dataset_id: str,
     record_id: int,
-    db: Session = Depends(get_db),
+    db: DbRunner = Depends(get_db_runner),
 ):
     """
     Get a single record by id for a dataset.
     """
-    return svc_get_record_detail(
-        db=db,
+    return await db.run(
+        svc_get_record_detail,
         dataset_id=dataset_id,
         record_id=record_id,
     )
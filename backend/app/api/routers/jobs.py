@@ -0,0 +1,18 @@
+from fastapi import APIRouter, Depends
+
+from app.api.deps import DbRunner, get_db_runner
+from app.domain.schemas.job import Job
+from app.domain.services.job_service import get_job as svc_get_job
+
+router = APIRouter(prefix="/api/v1/jobs", tags=["jobs"])
+
+
+@router.get("/{job_id}", response_model=Job)
+async def get_job(
+    job_id: str,
+    db: DbRunner = Depends(get_db_runner),
+):
+    """
+    Status of a background job (queued, running, succeeded or failed).
+    """
+    return await db.run(svc_get_job, job_id=job_id)
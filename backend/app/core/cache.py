@@ -0,0 +1,71 @@
+# app/core/cache.py
+
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Callable, Dict, Hashable, Optional
+
+
+class LRUCache:
+    """
+    Small thread-safe LRU mapping for per-process caches.
+
+    Requests are served from a threadpool, so every access takes the lock.
+
+    Entries are evicted beyond `maxsize` entries and, when `weigh` is
+    given, beyond a total weight of `max_weight` (e.g. bytes). An entry
+    heavier than max_weight on its own is not stored.
+    """
+
+    def __init__(
+        self,
+        maxsize: int,
+        max_weight: Optional[int] = None,
+        weigh: Optional[Callable[[Any], int]] = None,
+    ):
+        self.maxsize = maxsize
+        self.max_weight = max_weight
+        self.weigh = weigh
+        self.weight = 0
+        self._data: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._weights: Dict[Hashable, int] = {}
+        self._lock = Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            try:
+                self._data.move_to_end(key)
+            except KeyError:
+                return None
+            return self._data[key]
+
+    def set(self, key: Hashable, value: Any) -> None:
+        weight = self.weigh(value) if self.weigh else 0
+        with self._lock:
+            self._discard(key)
+            if self.max_weight is not None and weight > self.max_weight:
+                return
+            self._data[key] = value
+            self._weights[key] = weight
+            self.weight += weight
+            while len(self._data) > self.maxsize or (
+                self.max_weight is not None and self.weight > self.max_weight
+            ):
+                self._discard(next(iter(self._data)))
+
+    def pop(self, key: Hashable) -> None:
+        with self._lock:
+            self._discard(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._weights.clear()
+            self.weight = 0
+
+    def _discard(self, key: Hashable) -> None:
+        if key in self._data:
+            del self._data[key]
+            self.weight -= self._weights.pop(key)
+
+    def __len__(self) -> int:
+        return len(self._data)
@@ -1,4 +1,6 @@
 # app/core/config.py
+from typing import Optional
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -6,6 +8,57 @@ class Settings(BaseSettings):
     # This is the DB URL used by default (e.g. in Docker)
     database_url: str = "postgresql+psycopg://dataexplorer:dataexplorer@db:5432/dataexplorer"
 
+    # Serve the hot read paths (dataset detail, records listing, bookmark
+    # listing) with async repository functions on the async engine
+    # (psycopg async driver) instead of sync sessions in FastAPI's
+    # threadpool; everything else stays on the threadpool either way.
+    db_async: bool = False
+
+    # Connection pool of the request engines (sync and async each get one).
+    # Checkouts beyond pool_size + max_overflow wait up to pool_timeout s.
+    db_pool_size: int = 10
+    db_max_overflow: int = 10
+    db_pool_timeout: float = 30
+    # Test connections on checkout (survives DB restarts / idle proxies)
+    db_pool_pre_ping: bool = True
+    # Replace connections older than this many seconds (-1 = never)
+    db_pool_recycle: int = 1800
+    # Server-side statement_timeout in ms for request queries (0 = none)
+    db_statement_timeout_ms: int = 30_000
+    # psycopg prepares a statement server-side after this many executions
+    # on a connection, so Postgres stops re-planning it (None = never, e.g.
+    # behind a transaction-pooling pgbouncer)
+    db_prepare_threshold: Optional[int] = 5
+
+    # Separate pool for long-running work (CSV export), so a few exports
+    # cannot starve the regular endpoints
+    export_pool_size: int = 4
+    export_max_overflow: int = 0
+    export_statement_timeout_ms: int = 0
+
+    # In-process columnar cache for record listings of hot datasets
+    # (vectorized filter/sort). Datasets above max_rows always use SQL.
+    columnar_cache_enabled: bool = False
+    columnar_cache_max_bytes: int = 512 * 1024 * 1024
+    columnar_cache_max_rows: int = 1_000_000
+
+    # Worker processes for background jobs (stats refresh)
+    job_workers: int = 2
+    # A job still running this long after it started is taken to belong to
+    # a dead worker or process, and is failed at startup. Keep it above the
+    # longest expected job: other API processes may be running theirs.
+    job_stale_after_s: int = 3600
+
+    # Shared secret for /api/v1/admin endpoints (X-Admin-Token header).
+    # Empty => admin endpoints are disabled.
+    admin_token: str = ""
+
+    # Max (dataset, search, filters) totals memoized by count_mode=cached
+    count_cache_size: int = 10_000
+
+    # Compiled record queries kept per process, one per filter/sort shape
+    filter_statement_cache_size: int = 1000
+
     model_config = SettingsConfigDict(
         env_file=".env",
         # no prefix => env var is just DATABASE_URL
@@ -1,6 +1,10 @@
+from typing import Any, Dict
+
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, DeclarativeBase
 from app.core.config import settings
+from app.db.pool import TimedAsyncQueuePool, TimedQueuePool
 
 
 class Base(DeclarativeBase):
@@ -8,11 +12,34 @@ class Base(DeclarativeBase):
     pass
 
 
-# For now, use a synchronous engine; that’s perfectly fine with FastAPI.
+def engine_options(pool_size: int, max_overflow: int, statement_timeout_ms: int) -> Dict[str, Any]:
+    """create_engine / create_async_engine keyword arguments from settings."""
+    options: Dict[str, Any] = {
+        "echo": False,     # set True if you want to see SQL in logs
+        "pool_size": pool_size,
+        "max_overflow": max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+        "pool_recycle": settings.db_pool_recycle,
+    }
+    connect_args: Dict[str, Any] = {"prepare_threshold": settings.db_prepare_threshold}
+    if statement_timeout_ms:
+        connect_args["options"] = f"-c statement_timeout={statement_timeout_ms}"
+    options["connect_args"] = connect_args
+    return options
+
+
+# Synchronous engine: scripts (init_seed, index_manager, ...) and the
+# threadpool request path.
 engine = create_engine(
     settings.database_url,
-    echo=False,        # set True if you want to see SQL in logs
+    poolclass=TimedQueuePool,
     future=True,
+    **engine_options(
+        settings.db_pool_size,
+        settings.db_max_overflow,
+        settings.db_statement_timeout_ms,
+    ),
 )
 
 SessionLocal = sessionmaker(
@@ -21,6 +48,43 @@ SessionLocal = sessionmaker(
     autocommit=False,
 )
 
+# Heavy, long-running reads (export) get their own pool and timeout
+export_engine = create_engine(
+    settings.database_url,
+    poolclass=TimedQueuePool,
+    future=True,
+    **engine_options(
+        settings.export_pool_size,
+        settings.export_max_overflow,
+        settings.export_statement_timeout_ms,
+    ),
+)
+
+ExportSessionLocal = sessionmaker(
+    bind=export_engine,
+    autoflush=False,
+    autocommit=False,
+)
+
+# Async engine on the same URL: "postgresql+psycopg" picks psycopg's async
+# driver under create_async_engine. Used when settings.db_async is on.
+async_engine = create_async_engine(
+    settings.database_url,
+    poolclass=TimedAsyncQueuePool,
+    **engine_options(
+        settings.db_pool_size,
+        settings.db_max_overflow,
+        settings.db_statement_timeout_ms,
+    ),
+)
+
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    autoflush=False,
+    expire_on_commit=False,
+    class_=AsyncSession,
+)
+
 
 # FastAPI dependency to get a DB session per request
 def get_db():
@@ -29,3 +93,18 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+# Same, on the export pool
+def get_export_db():
+    db = ExportSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+# Async counterpart of get_db
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -0,0 +1,18 @@
+# app/db/copy_format.py
+
+"""
+PostgreSQL COPY text format, for the loaders that stream rows with
+COPY ... FROM STDIN (the ingest endpoint and the demo seeder).
+"""
+
+
+def copy_text(value: str) -> str:
+    """
+    Escape a JSON document for a COPY text-format column.
+
+    json.dumps output never holds raw tabs, newlines or other control
+    characters, so only its backslashes (string escapes) need doubling.
+    """
+    if "\\" in value:
+        value = value.replace("\\", "\\\\")
+    return value
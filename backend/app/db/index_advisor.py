@@ -0,0 +1,424 @@
+# app/db/index_advisor.py
+
+"""
+EXPLAIN every repository query and flag sequential scans.
+
+Each probe below calls a repository function the way the services do,
+against a real dataset, user and record of the configured database (point
+DATABASE_URL at a scaled-up copy: plans on a handful of rows say nothing).
+The SQL and bound parameters are captured exactly as the repository sends
+them, EXPLAINed, and every Seq Scan on a table with at least --min-rows
+rows is reported. Smaller tables are cheap enough to scan.
+
+With --strict, sequential scans are disabled for the planner, so only the
+queries no index can serve at all are flagged, whatever the table sizes.
+
+Every probe runs in its own transaction, which is rolled back, so the
+write queries (bookmark upserts and deletes) leave nothing behind. COPY
+(ingest_repo) has no plan and is not probed.
+
+Usage:
+    python -m app.db.index_advisor
+    python -m app.db.index_advisor --dataset <id> --user <user id> --verbose
+    python -m app.db.index_advisor --strict --min-rows 0
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from dataclasses import dataclass, field as dc_field
+from decimal import Decimal
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from uuid import uuid4
+
+from sqlalchemy import event, func, select, text
+from sqlalchemy.orm import Session
+
+from app.db.base import SessionLocal
+from app.db.index_manager import MIN_ROWS
+from app.db.models import Bookmark, Dataset, Record
+from app.domain.repositories import (
+    bookmark_repo,
+    dataset_repo,
+    job_repo,
+    record_repo,
+    stats_repo,
+)
+from app.domain.schemas.filters import FilterClause
+
+
+# statements worth planning (not SET, SAVEPOINT, the estimator's EXPLAIN...)
+PLANNED = ("SELECT", "WITH", "INSERT", "UPDATE", "DELETE")
+
+_TABLE_ROWS = text(
+    """
+    SELECT c.relname, greatest(c.reltuples, coalesce(s.n_live_tup, 0))::bigint
+    FROM pg_class c
+    LEFT JOIN pg_stat_user_tables s ON s.relid = c.oid
+    WHERE c.relkind IN ('r', 'p') AND pg_table_is_visible(c.oid)
+    """
+)
+
+
+@dataclass
+class ProbeContext:
+    dataset_id: str
+    record_id: int
+    user_id: str
+    field_types: Dict[str, str]
+    number_field: Optional[str] = None
+    text_field: Optional[str] = None
+
+
+@dataclass
+class QueryReport:
+    probe: str
+    statement: str
+    plan: Any
+    # (table, rows) of the flagged sequential scans
+    seq_scans: List[Tuple[str, int]] = dc_field(default_factory=list)
+    error: Optional[str] = None
+
+
+Probe = Tuple[str, Callable[[Session, ProbeContext], Any]]
+
+
+def _first_field(field_types: Dict[str, str], type_: str) -> Optional[str]:
+    return next((name for name, t in sorted(field_types.items()) if t == type_), None)
+
+
+def load_context(
+    db: Session, dataset_id: Optional[str] = None, user_id: Optional[str] = None
+) -> ProbeContext:
+    """
+    Probe targets: the given dataset (default: the largest one), its first
+    record, and the given user (default: the one with most bookmarks).
+    Raises LookupError when there is no dataset to probe.
+    """
+    if dataset_id is None:
+        dataset_id = db.scalar(
+            select(Dataset.id).order_by(Dataset.row_count.desc()).limit(1)
+        )
+        if dataset_id is None:
+            raise LookupError("No datasets to probe")
+    elif dataset_repo.get_dataset(db, dataset_id) is None:
+        raise LookupError(f"Dataset {dataset_id} not found")
+
+    record_id = db.scalar(
+        select(func.min(Record.id)).where(Record.dataset_id == dataset_id)
+    )
+    if user_id is None:
+        user_id = db.scalar(
+            select(Bookmark.user_id)
+            .group_by(Bookmark.user_id)
+            .order_by(func.count().desc())
+            .limit(1)
+        )
+    field_types = dataset_repo.get_field_types(db, dataset_id)
+    db.rollback()
+
+    return ProbeContext(
+        dataset_id=dataset_id,
+        record_id=record_id or 0,
+        user_id=user_id or "index-advisor",
+        field_types=field_types,
+        number_field=_first_field(field_types, "number"),
+        text_field=_first_field(field_types, "string"),
+    )
+
+
+def _number_filter(ctx: ProbeContext) -> List[FilterClause]:
+    return [FilterClause(ctx.number_field, "ge", 0.0, "0")]
+
+
+def _text_filter(ctx: ProbeContext) -> List[FilterClause]:
+    return [FilterClause(ctx.text_field, "eq", "x", "x")]
+
+
+def _first_batch(db: Session, ctx: ProbeContext) -> None:
+    batches = record_repo.iter_all_records(db, ctx.dataset_id, None, None)
+    next(batches, None)
+    batches.close()
+
+
+def probes(ctx: ProbeContext) -> List[Probe]:
+    """(name, call) of every repository query, with representative arguments."""
+    ds, rid, user, types = ctx.dataset_id, ctx.record_id, ctx.user_id, ctx.field_types
+    found: List[Probe] = [
+        ("dataset_repo.list_datasets", lambda db, c: dataset_repo.list_datasets(db, None, 1, 20)),
+        (
+            "dataset_repo.list_datasets (search)",
+            lambda db, c: dataset_repo.list_datasets(db, "a", 1, 20),
+        ),
+        (
+            "dataset_repo.get_dataset_with_fields",
+            lambda db, c: dataset_repo.get_dataset_with_fields(db, ds),
+        ),
+        ("dataset_repo.get_field_types", lambda db, c: dataset_repo.get_field_types(db, ds)),
+        ("dataset_repo.get_dataset", lambda db, c: dataset_repo.get_dataset(db, ds)),
+        (
+            "record_repo.list_records",
+            lambda db, c: record_repo.list_records(db, ds, 1, 50, None, field_types=types),
+        ),
+        (
+            "record_repo.list_records (keyset)",
+            lambda db, c: record_repo.list_records(
+                db, ds, 1, 50, None, after=(rid, rid), field_types=types, count=False
+            ),
+        ),
+        (
+            "record_repo.list_records (search)",
+            lambda db, c: record_repo.list_records(db, ds, 1, 50, "a", field_types=types),
+        ),
+        (
+            "record_repo.list_records (fulltext search)",
+            lambda db, c: record_repo.list_records(
+                db, ds, 1, 50, "a", field_types=types, search_mode="fulltext"
+            ),
+        ),
+        (
+            "record_repo.list_records_raw",
+            lambda db, c: record_repo.list_records_raw(db, ds, 1, 50, None, field_types=types),
+        ),
+        ("record_repo.iter_all_records", _first_batch),
+        ("record_repo.count_records", lambda db, c: record_repo.count_records(db, ds, None)),
+        ("record_repo.get_record_by_id", lambda db, c: record_repo.get_record_by_id(db, ds, rid)),
+        (
+            "record_repo.get_records_by_ids",
+            lambda db, c: record_repo.get_records_by_ids(db, ds, [rid], ["id"]),
+        ),
+        (
+            "stats_repo.count_dataset_records",
+            lambda db, c: stats_repo.count_dataset_records(db, ds),
+        ),
+        (
+            "stats_repo.aggregate_field_stats",
+            lambda db, c: stats_repo.aggregate_field_stats(db, ds),
+        ),
+        (
+            "bookmark_repo.list_bookmarks_for_user",
+            lambda db, c: bookmark_repo.list_bookmarks_for_user(db, user, None, 1, 20),
+        ),
+        (
+            "bookmark_repo.list_bookmarks_for_user (dataset)",
+            lambda db, c: bookmark_repo.list_bookmarks_for_user(db, user, ds, 1, 20),
+        ),
+        (
+            "bookmark_repo.list_bookmarks_for_user (include record)",
+            lambda db, c: bookmark_repo.list_bookmarks_for_user(
+                db, user, ds, 1, 20, include_record=True
+            ),
+        ),
+        (
+            "bookmark_repo.get_bookmark_by_id",
+            lambda db, c: bookmark_repo.get_bookmark_by_id(db, 0, user),
+        ),
+        (
+            "bookmark_repo.get_bookmarks_by_records",
+            lambda db, c: bookmark_repo.get_bookmarks_by_records(db, user, [rid]),
+        ),
+        (
+            "bookmark_repo.upsert_bookmarks",
+            lambda db, c: bookmark_repo.upsert_bookmarks(db, user, [(ds, rid, "")]),
+        ),
+        (
+            "bookmark_repo.delete_bookmarks",
+            lambda db, c: bookmark_repo.delete_bookmarks(db, user, [0]),
+        ),
+        ("job_repo.get_job", lambda db, c: job_repo.get_job(db, str(uuid4()))),
+        ("job_repo.list_queued_job_ids", lambda db, c: job_repo.list_queued_job_ids(db)),
+    ]
+
+    if ctx.number_field:
+        found += [
+            (
+                "record_repo.list_records (number sort)",
+                lambda db, c: record_repo.list_records(
+                    db, ds, 1, 50, None, sort=f"{c.number_field}:desc", field_types=types
+                ),
+            ),
+            (
+                "record_repo.list_records (range filter)",
+                lambda db, c: record_repo.list_records(
+                    db, ds, 1, 50, None, filters=_number_filter(c), field_types=types
+                ),
+            ),
+            (
+                "record_repo.estimate_records",
+                lambda db, c: record_repo.estimate_records(
+                    db, ds, None, _number_filter(c), field_types=types
+                ),
+            ),
+            (
+                "record_repo.numeric_summary",
+                lambda db, c: record_repo.numeric_summary(
+                    db, ds, c.number_field, None, field_types=types
+                ),
+            ),
+            (
+                "record_repo.numeric_histogram",
+                lambda db, c: record_repo.numeric_histogram(
+                    db, ds, c.number_field, Decimal(0), Decimal(100), 10, None, field_types=types
+                ),
+            ),
+            (
+                "stats_repo.get_example_values",
+                lambda db, c: stats_repo.get_example_values(
+                    db, ds, {c.number_field: rid}
+                ),
+            ),
+        ]
+    if ctx.text_field:
+        found += [
+            (
+                "record_repo.list_records (eq filter)",
+                lambda db, c: record_repo.list_records(
+                    db, ds, 1, 50, None, filters=_text_filter(c), field_types=types
+                ),
+            ),
+            (
+                "record_repo.top_values",
+                lambda db, c: record_repo.top_values(
+                    db, ds, c.text_field, 10, None, field_types=types
+                ),
+            ),
+            (
+                "record_repo.aggregate_records",
+                lambda db, c: record_repo.aggregate_records(
+                    db, ds, [c.text_field], [("count", None)], None, field_types=types
+                ),
+            ),
+        ]
+    return found
+
+
+def seq_scans(plan: Dict[str, Any]) -> Iterator[str]:
+    """Relations read by Seq Scan nodes anywhere in an EXPLAIN JSON plan."""
+    if plan.get("Node Type") == "Seq Scan":
+        yield plan["Relation Name"]
+    for child in plan.get("Plans", []):
+        yield from seq_scans(child)
+
+
+def run_probe(
+    db: Session,
+    ctx: ProbeContext,
+    name: str,
+    call: Callable[[Session, ProbeContext], Any],
+    table_rows: Dict[str, int],
+    min_rows: int = MIN_ROWS,
+    strict: bool = False,
+) -> List[QueryReport]:
+    """EXPLAIN each statement one probe sends, then roll its transaction back."""
+    captured: List[Tuple[str, Any]] = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if not executemany and statement.lstrip().upper().startswith(PLANNED):
+            captured.append((statement, parameters))
+
+    conn = db.connection()
+    if strict:
+        conn.exec_driver_sql("SET LOCAL enable_seqscan = off")
+    event.listen(conn, "before_cursor_execute", capture)
+    try:
+        call(db, ctx)
+    except Exception as exc:
+        db.rollback()
+        return [QueryReport(name, "", None, error=str(exc).splitlines()[0])]
+    finally:
+        event.remove(conn, "before_cursor_execute", capture)
+
+    reports = []
+    try:
+        for statement, parameters in captured:
+            plan = conn.exec_driver_sql(
+                "EXPLAIN (FORMAT JSON) " + statement, parameters
+            ).scalar()
+            report = QueryReport(name, statement, plan)
+            for table in seq_scans(plan[0]["Plan"]):
+                rows = table_rows.get(table, 0)
+                if rows >= min_rows:
+                    report.seq_scans.append((table, rows))
+            reports.append(report)
+    finally:
+        db.rollback()
+    return reports
+
+
+def advise(
+    db: Session,
+    ctx: ProbeContext,
+    min_rows: int = MIN_ROWS,
+    strict: bool = False,
+) -> List[QueryReport]:
+    """Reports of every statement of every probe."""
+    table_rows = {name: int(rows) for name, rows in db.execute(_TABLE_ROWS)}
+    db.rollback()
+    reports: List[QueryReport] = []
+    for name, call in probes(ctx):
+        reports += run_probe(db, ctx, name, call, table_rows, min_rows, strict)
+    return reports
+
+
+def _one_line(statement: str, width: int = 100) -> str:
+    line = " ".join(statement.split())
+    return line if len(line) <= width else line[: width - 3] + "..."
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        description="EXPLAIN every repository query and flag sequential scans."
+    )
+    parser.add_argument("--dataset", help="dataset id to probe (default: the largest)")
+    parser.add_argument("--user", help="user id to probe (default: most bookmarks)")
+    parser.add_argument(
+        "--min-rows",
+        type=int,
+        default=MIN_ROWS,
+        help=f"ignore scans of smaller tables (default: {MIN_ROWS})",
+    )
+    parser.add_argument(
+        "--strict",
+        action="store_true",
+        help="disable sequential scans: flag queries no index can serve",
+    )
+    parser.add_argument(
+        "--verbose", action="store_true", help="print every statement and its plan"
+    )
+    args = parser.parse_args(argv)
+
+    db: Session = SessionLocal()
+    try:
+        ctx = load_context(db, args.dataset, args.user)
+        reports = advise(db, ctx, args.min_rows, args.strict)
+    except LookupError as exc:
+        sys.exit(str(exc))
+    finally:
+        db.close()
+
+    print(f"dataset {ctx.dataset_id}, user {ctx.user_id}:")
+    flagged = 0
+    for report in reports:
+        if report.error:
+            flagged += 1
+            print(f"  ERROR {report.probe}: {report.error}")
+            continue
+        if report.seq_scans:
+            flagged += 1
+            scans = ", ".join(f"{t} (~{rows:,} rows)" for t, rows in report.seq_scans)
+            print(f"  SEQ SCAN {report.probe}: {scans}")
+            print(f"    {_one_line(report.statement)}")
+        else:
+            print(f"  ok       {report.probe}")
+        if args.verbose:
+            print(f"    {report.statement}")
+            print(f"    {report.plan}")
+
+    print(f"{len(reports)} statements, {flagged} flagged.")
+    if flagged:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
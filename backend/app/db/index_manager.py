@@ -0,0 +1,252 @@
+# app/db/index_manager.py
+
+"""
+Per-dataset partial expression indexes on payload fields.
+
+For a dataset, picks the payload fields worth indexing from their
+DatasetField stats (plus any explicitly requested "hot" fields) and builds
+
+    CREATE INDEX CONCURRENTLY ix_rec_<dataset>_<field>_<kind> ON records
+        (<typed payload expression>, id) WHERE dataset_id = '<dataset id>'
+
+or, once records is partitioned (app.db.partitioning), the same index
+without the WHERE on the dataset's partition: CONCURRENTLY is not
+supported on the partitioned parent, and the partition holds only that
+dataset anyway.
+
+The expression comes from app.db.payload_expr, which is also where the
+record query builder gets it, so sorts, keyset seeks and range filters on
+that field match the index.
+
+Usage:
+    python -m app.db.index_manager --all
+    python -m app.db.index_manager --dataset <id> --field length --drop-stale
+    python -m app.db.index_manager --all --dry-run
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import logging
+from dataclasses import dataclass, field as dc_field
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import select, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, selectinload
+
+from app.db.base import SessionLocal, engine
+from app.db.models import Dataset, DatasetField
+from app.db.partitioning import is_partitioned, partition_name
+from app.db.payload_expr import payload_typed, render
+
+
+logger = logging.getLogger(__name__)
+
+# Below this many rows a sequential scan is cheap enough
+MIN_ROWS = 10_000
+# Mostly-NULL fields are rarely filtered or sorted on
+MAX_NULL_FRAC = 0.5
+# Low-cardinality fields are better served by the payload GIN index
+MIN_DISTINCT = 100
+
+# DatasetField.type -> index kind suffix
+INDEXABLE_TYPES = {"number": "num", "string": "txt"}
+
+
+@dataclass
+class PayloadIndex:
+    name: str
+    field: str
+    kind: str
+    ddl: str
+
+
+@dataclass
+class IndexPlan:
+    dataset_id: str
+    create: List[PayloadIndex] = dc_field(default_factory=list)
+    keep: List[str] = dc_field(default_factory=list)
+    drop: List[str] = dc_field(default_factory=list)
+    # names in `create` that exist but are INVALID (failed concurrent build)
+    rebuild: List[str] = dc_field(default_factory=list)
+
+
+def index_prefix(dataset_id: str) -> str:
+    return f"ix_rec_{dataset_id.replace('-', '')[:12]}_"
+
+
+def index_name(dataset_id: str, field_name: str, kind: str) -> str:
+    # field names are arbitrary JSON keys, so they are hashed into the name
+    digest = hashlib.sha1(field_name.encode()).hexdigest()[:8]
+    return f"{index_prefix(dataset_id)}{digest}_{kind}"
+
+
+def is_selective(field: DatasetField, row_count: int) -> bool:
+    if row_count < MIN_ROWS or field.null_frac > MAX_NULL_FRAC:
+        return False
+    return (field.distinct_count or 0) >= MIN_DISTINCT
+
+
+def build_index(
+    dataset_id: str, field: DatasetField, partitioned: bool = False
+) -> PayloadIndex:
+    kind = INDEXABLE_TYPES[field.type]
+    name = index_name(dataset_id, field.name, kind)
+    expr = render(payload_typed(field.name, field.type))
+    if partitioned:
+        ddl = (
+            f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} "
+            f"ON {partition_name(dataset_id)} ({expr}, id)"
+        )
+    else:
+        ddl = (
+            f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} "
+            f"ON records ({expr}, id) "
+            f"WHERE dataset_id = '{dataset_id}'"
+        )
+    return PayloadIndex(name=name, field=field.name, kind=kind, ddl=ddl)
+
+
+def existing_indexes(
+    db: Session, dataset_id: str, partitioned: bool = False
+) -> Dict[str, bool]:
+    """Managed indexes for a dataset: name -> indisvalid."""
+    table = partition_name(dataset_id) if partitioned else "records"
+    rows = db.execute(
+        text(
+            "SELECT c.relname, i.indisvalid "
+            "FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+            "WHERE i.indrelid = to_regclass(:table) "
+            "AND starts_with(c.relname, :prefix)"
+        ),
+        {"table": table, "prefix": index_prefix(dataset_id)},
+    )
+    return {name: valid for name, valid in rows}
+
+
+def plan_indexes(
+    db: Session,
+    dataset: Dataset,
+    hot_fields: Iterable[str] = (),
+) -> IndexPlan:
+    """
+    Decide which indexes a dataset should have.
+
+    A field is indexed if it is number/string typed and either listed in
+    hot_fields or selective according to its stats.
+    """
+    hot = set(hot_fields)
+    partitioned = is_partitioned(db)
+    wanted = [
+        build_index(dataset.id, f, partitioned)
+        for f in sorted(dataset.fields, key=lambda f: f.name)
+        if f.type in INDEXABLE_TYPES
+        and (f.name in hot or is_selective(f, dataset.row_count))
+    ]
+    existing = existing_indexes(db, dataset.id, partitioned)
+
+    plan = IndexPlan(dataset_id=dataset.id)
+    for idx in wanted:
+        if existing.get(idx.name):
+            plan.keep.append(idx.name)
+        else:
+            plan.create.append(idx)
+            if idx.name in existing:
+                plan.rebuild.append(idx.name)
+
+    wanted_names = {idx.name for idx in wanted}
+    plan.drop = sorted(name for name in existing if name not in wanted_names)
+    return plan
+
+
+def apply_plan(bind: Engine, plan: IndexPlan, drop_stale: bool = False) -> List[str]:
+    """
+    Execute a plan. CONCURRENTLY cannot run inside a transaction, so this
+    uses an AUTOCOMMIT connection; writes to records keep flowing.
+
+    A failing statement is logged and skipped so one bad field does not stop
+    the others. A failed concurrent build leaves an INVALID index behind,
+    which the next plan lists under `rebuild`. Returns the names of the
+    indexes whose statements failed.
+    """
+    drop = "DROP INDEX CONCURRENTLY IF EXISTS {}"
+    statements = [(name, drop.format(name)) for name in plan.rebuild]
+    statements += [(idx.name, idx.ddl) for idx in plan.create]
+    if drop_stale:
+        statements += [(name, drop.format(name)) for name in plan.drop]
+
+    failed: List[str] = []
+    with bind.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        # index builds outlast the request statement_timeout
+        conn.execute(text("SET statement_timeout = 0"))
+        for name, ddl in statements:
+            try:
+                conn.execute(text(ddl))
+            except Exception:
+                logger.exception(
+                    "index statement failed for dataset %s: %s", plan.dataset_id, ddl
+                )
+                failed.append(name)
+    return failed
+
+
+def load_datasets(db: Session, dataset_ids: Optional[List[str]]) -> List[Dataset]:
+    stmt = select(Dataset).options(selectinload(Dataset.fields)).order_by(Dataset.name)
+    if dataset_ids:
+        stmt = stmt.where(Dataset.id.in_(dataset_ids))
+    return list(db.scalars(stmt).all())
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        description="Create per-dataset payload expression indexes."
+    )
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument(
+        "--dataset", action="append", dest="datasets", help="dataset id (repeatable)"
+    )
+    target.add_argument("--all", action="store_true", help="every dataset")
+    parser.add_argument(
+        "--field",
+        action="append",
+        default=[],
+        dest="fields",
+        help="hot field to index regardless of its stats (repeatable)",
+    )
+    parser.add_argument(
+        "--drop-stale",
+        action="store_true",
+        help="drop managed indexes that are no longer wanted",
+    )
+    parser.add_argument(
+        "--dry-run", action="store_true", help="print the plan without executing it"
+    )
+    args = parser.parse_args(argv)
+
+    db: Session = SessionLocal()
+    try:
+        datasets = load_datasets(db, None if args.all else args.datasets)
+        plans = [plan_indexes(db, ds, args.fields) for ds in datasets]
+    finally:
+        db.close()
+
+    for ds, plan in zip(datasets, plans):
+        print(f"{ds.name} ({ds.id}):")
+        for idx in plan.create:
+            print(f"  create {idx.name} [{idx.field}]: {idx.ddl}")
+        for name in plan.keep:
+            print(f"  keep   {name}")
+        for name in plan.drop:
+            print(f"  {'drop' if args.drop_stale else 'stale'}  {name}")
+
+        if not args.dry_run:
+            for name in apply_plan(engine, plan, drop_stale=args.drop_stale):
+                print(f"  FAILED {name} (see log)")
+
+    print("Done." if not args.dry_run else "Dry run, nothing executed.")
+
+
+if __name__ == "__main__":
+    main()
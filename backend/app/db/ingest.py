@@ -0,0 +1,87 @@
+# app/db/ingest.py
+
+"""
+Bulk-load records into an existing dataset from a CSV or NDJSON file.
+
+Same code path as POST /api/v1/datasets/{id}/records/ingest: the file is
+read in chunks, parsed incrementally and loaded with COPY in batches, in a
+single transaction.
+
+Usage:
+    python -m app.db.ingest --dataset <id> genes.csv
+    python -m app.db.ingest --dataset <id> --format ndjson - < rows.jsonl
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sys
+import time
+from typing import AsyncIterator, BinaryIO, List, Optional
+
+from fastapi import HTTPException
+
+from app.db.base import AsyncSessionLocal, async_engine
+from app.domain.services.ingest_service import INGEST_BATCH_SIZE, ingest_records
+
+
+READ_SIZE = 1 << 20
+
+
+async def _read_chunks(f: BinaryIO) -> AsyncIterator[bytes]:
+    while True:
+        chunk = await asyncio.to_thread(f.read, READ_SIZE)
+        if not chunk:
+            return
+        yield chunk
+
+
+async def _ingest(dataset_id: str, f: BinaryIO, fmt: str, batch_size: int) -> int:
+    try:
+        async with AsyncSessionLocal() as db:
+            result = await ingest_records(
+                db, dataset_id, _read_chunks(f), fmt, batch_size=batch_size
+            )
+        return result["rows_ingested"]
+    finally:
+        await async_engine.dispose()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Bulk-load records with COPY.")
+    parser.add_argument("--dataset", required=True, help="target dataset id")
+    parser.add_argument(
+        "--format",
+        choices=["csv", "ndjson"],
+        help="input format (default: from the file extension)",
+    )
+    parser.add_argument("--batch-size", type=int, default=INGEST_BATCH_SIZE)
+    parser.add_argument("path", help="input file, or - for stdin")
+    args = parser.parse_args(argv)
+
+    fmt = args.format
+    if fmt is None:
+        if args.path.endswith(".csv"):
+            fmt = "csv"
+        elif args.path.endswith((".ndjson", ".jsonl")):
+            fmt = "ndjson"
+        else:
+            parser.error("cannot tell the format from the file name, pass --format")
+
+    f = sys.stdin.buffer if args.path == "-" else open(args.path, "rb")
+    started = time.perf_counter()
+    try:
+        rows = asyncio.run(_ingest(args.dataset, f, fmt, args.batch_size))
+    except HTTPException as exc:
+        sys.exit(f"Ingest failed: {exc.detail}")
+    finally:
+        if f is not sys.stdin.buffer:
+            f.close()
+
+    elapsed = time.perf_counter() - started
+    print(f"Ingested {rows} rows in {elapsed:.1f}s ({rows / max(elapsed, 1e-9):,.0f} rows/s).")
+
+
+if __name__ == "__main__":
+    main()
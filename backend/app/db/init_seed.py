@@ -1,98 +1,56 @@
 # app/db/init_seed.py
 
+"""
+Synthetic datasets for development and load testing.
+
+Creates --datasets datasets cycling through the demo kinds (genes,
+assays, experiments) with --rows records each (default: the demo sizes).
+Payloads are generated in --workers processes, one chunk of rows at a
+time, and each worker loads its chunks with COPY over its own connection.
+
+The output is deterministic for a given --seed: every chunk draws from
+its own generator seeded by (seed, dataset, chunk), dataset ids are
+derived from the seed, and record ids are assigned explicitly in
+dataset/chunk order (the id sequence is moved past them afterwards). So
+the same command always builds the same database, whatever the number
+of workers. Existing data is wiped first.
+
+Usage:
+    python -m app.db.init_seed
+    python -m app.db.init_seed --datasets 10 --rows 5000000 --workers 8
+    python -m app.db.init_seed --datasets 3 --rows 100000 --seed 7 --skip-stats
+"""
+
 from __future__ import annotations
 
+import argparse
+import json
+import multiprocessing
 import random
+import time
+from dataclasses import dataclass
 from datetime import datetime
-from uuid import uuid4
-from typing import Any, Dict, List
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from uuid import UUID
 
-from sqlalchemy import select
+from sqlalchemy import select, text
 from sqlalchemy.orm import Session
 
-from app.db.base import SessionLocal
-from app.db.models import Dataset, Record, DatasetField, Bookmark
-
-
-# --------- Helpers for stats --------- #
-
-def infer_type(value: Any) -> str:
-    """Very simple type inference just for demos."""
-    if value is None:
-        return "unknown"
-    if isinstance(value, bool):
-        return "boolean"
-    if isinstance(value, (int, float)):
-        return "number"
-    # could add datetime parsing here if you want
-    return "string"
-
-
-def compute_schema_stats_for_dataset(
-    db: Session,
-    dataset: Dataset,
-) -> None:
-    """
-    Scan all records for a dataset and populate dataset_fields
-    + update datasets.row_count.
-
-    This is done in Python because our demo datasets are small (a few thousand rows),
-    and it's easier to understand than fancy SQL.
-    """
-    records: List[Record] = db.scalars(
-        select(Record).where(Record.dataset_id == dataset.id)
-    ).all()
-
-    row_count = len(records)
-    dataset.row_count = row_count
-    dataset.updated_at = datetime.utcnow()
-
-    # Clear old stats for this dataset (so you can re-run the script)
-    db.query(DatasetField).filter(
-        DatasetField.dataset_id == dataset.id
-    ).delete()
-
-    if row_count == 0:
-        return
-
-    # Collect all field names we see in any payload
-    field_names: set[str] = set()
-    for rec in records:
-        if isinstance(rec.payload, dict):
-            field_names.update(rec.payload.keys())
-
-    for field_name in sorted(field_names):
-        values: List[Any] = [
-            (rec.payload or {}).get(field_name) for rec in records
-        ]
-        non_null_values = [v for v in values if v is not None]
-
-        null_frac = 1.0 - (len(non_null_values) / row_count)
-        distinct_count = len(set(non_null_values))
-        example_value = non_null_values[0] if non_null_values else None
-
-        # infer a "type" based on first non-null
-        value_type = infer_type(example_value)
-
-        df = DatasetField(
-            dataset_id=dataset.id,
-            name=field_name,
-            type=value_type,
-            null_frac=float(null_frac),
-            distinct_count=distinct_count,
-            example_value=example_value,
-        )
-        db.add(df)
+from app.db.base import SessionLocal, engine
+from app.db.copy_format import copy_text
+from app.db.models import Dataset
+from app.db.partitioning import drop_partition, is_partitioned
+from app.domain.services.stats_service import compute_schema_stats
 
 
 # --------- Data generation helpers --------- #
 
-def random_gene_payload() -> Dict[str, Any]:
-    symbol = random.choice(["TP53", "BRCA1", "EGFR", "MYC", "KRAS"])
-    ensembl_id = f"ENSG{random.randint(1000000000, 9999999999)}"
-    length = random.randint(500, 20000)
-    gc_content = round(random.uniform(0.3, 0.7), 2)
-    is_protein_coding = random.choice([True, False])
+def random_gene_payload(rng: Any = random) -> Dict[str, Any]:
+    symbol = rng.choice(["TP53", "BRCA1", "EGFR", "MYC", "KRAS"])
+    ensembl_id = f"ENSG{rng.randint(1000000000, 9999999999)}"
+    length = rng.randint(500, 20000)
+    gc_content = round(rng.uniform(0.3, 0.7), 2)
+    is_protein_coding = rng.choice([True, False])
 
     return {
         "symbol": symbol,
@@ -103,15 +61,15 @@ def random_gene_payload() -> Dict[str, Any]:
     }
 
 
-def random_assay_payload() -> Dict[str, Any]:
-    platform = random.choice(["Illumina", "Nanopore", "PacBio"])
-    name = random.choice(["RNA-seq", "WGS", "ChIP-seq", "ATAC-seq"])
-    read_length = random.choice([75, 100, 150, 250])
-    coverage = round(random.uniform(10, 100), 1)
+def random_assay_payload(rng: Any = random) -> Dict[str, Any]:
+    platform = rng.choice(["Illumina", "Nanopore", "PacBio"])
+    name = rng.choice(["RNA-seq", "WGS", "ChIP-seq", "ATAC-seq"])
+    read_length = rng.choice([75, 100, 150, 250])
+    coverage = round(rng.uniform(10, 100), 1)
     date = datetime(
-        year=random.randint(2018, 2025),
-        month=random.randint(1, 12),
-        day=random.randint(1, 28),
+        year=rng.randint(2018, 2025),
+        month=rng.randint(1, 12),
+        day=rng.randint(1, 28),
     ).date().isoformat()
 
     return {
@@ -123,15 +81,15 @@ def random_assay_payload() -> Dict[str, Any]:
     }
 
 
-def random_experiment_payload() -> Dict[str, Any]:
-    condition = random.choice(["control", "treated", "knockout"])
-    gene_symbol = random.choice(["TP53", "BRCA1", "EGFR", "MYC", "KRAS"])
-    value = round(random.uniform(-2.0, 2.0), 3)
-    pvalue = round(10 ** random.uniform(-6, -1), 6)
+def random_experiment_payload(rng: Any = random) -> Dict[str, Any]:
+    condition = rng.choice(["control", "treated", "knockout"])
+    gene_symbol = rng.choice(["TP53", "BRCA1", "EGFR", "MYC", "KRAS"])
+    value = round(rng.uniform(-2.0, 2.0), 3)
+    pvalue = round(10 ** rng.uniform(-6, -1), 6)
     date = datetime(
-        year=random.randint(2018, 2025),
-        month=random.randint(1, 12),
-        day=random.randint(1, 28),
+        year=rng.randint(2018, 2025),
+        month=rng.randint(1, 12),
+        day=rng.randint(1, 28),
     ).date().isoformat()
 
     return {
@@ -143,85 +101,267 @@ def random_experiment_payload() -> Dict[str, Any]:
     }
 
 
-def seed_dataset(
-    db: Session,
-    name: str,
-    description: str,
-    n_rows: int,
-    payload_fn,
-) -> Dataset:
-    """
-    Create a dataset, insert n_rows records using payload_fn, and compute stats.
-    """
-    dataset = Dataset(
-        id=uuid4(),
-        name=name,
-        description=description,
-    )
-    db.add(dataset)
-    db.flush()  # get dataset.id
+# kind -> (description, payload generator, demo row count)
+KINDS: Dict[str, Tuple[str, Callable[..., Dict[str, Any]], int]] = {
+    "genes": ("Human genes", random_gene_payload, 3000),
+    "assays": ("Sequencing assays", random_assay_payload, 2000),
+    "experiments": ("Gene expression experiments", random_experiment_payload, 2500),
+}
 
-    for _ in range(n_rows):
-        rec = Record(
-            dataset_id=dataset.id,
-            payload=payload_fn(),
-        )
-        db.add(rec)
+# Rows generated and COPYed per task; bounds worker memory
+CHUNK_ROWS = 50_000
+
+COPY_RECORDS = "COPY records (id, dataset_id, payload) FROM STDIN"
+
+
+@dataclass(frozen=True)
+class DatasetSpec:
+    id: str
+    name: str
+    kind: str
+    rows: int
 
-    # Flush records so stats can see them
-    db.flush()
 
-    compute_schema_stats_for_dataset(db, dataset)
+@dataclass(frozen=True)
+class Chunk:
+    dataset_id: str
+    kind: str
+    # seed of this chunk's generator
+    seed: str
+    first_id: int
+    rows: int
 
-    return dataset
 
+# --------- Planning --------- #
+
+def plan_datasets(n_datasets: int, rows: Optional[int], seed: int) -> List[DatasetSpec]:
+    """
+    Datasets cycle through KINDS. The first of each kind keeps the demo
+    name (genes, assays, experiments), later ones are numbered (genes_2).
+    """
+    kinds = list(KINDS)
+    specs = []
+    for i in range(n_datasets):
+        kind = kinds[i % len(kinds)]
+        round_ = i // len(kinds)
+        rng = random.Random(f"{seed}:dataset:{i}")
+        specs.append(
+            DatasetSpec(
+                id=str(UUID(int=rng.getrandbits(128), version=4)),
+                name=kind if round_ == 0 else f"{kind}_{round_ + 1}",
+                kind=kind,
+                rows=KINDS[kind][2] if rows is None else rows,
+            )
+        )
+    return specs
+
+
+def plan_chunks(
+    specs: List[DatasetSpec], first_id: int, seed: int, chunk_rows: int = CHUNK_ROWS
+) -> List[Chunk]:
+    chunks = []
+    next_id = first_id
+    for i, spec in enumerate(specs):
+        for n, start in enumerate(range(0, spec.rows, chunk_rows)):
+            rows = min(chunk_rows, spec.rows - start)
+            chunks.append(Chunk(spec.id, spec.kind, f"{seed}:{i}:{n}", next_id, rows))
+            next_id += rows
+    return chunks
+
+
+# --------- Generation and loading --------- #
+
+def generate_chunk(chunk: Chunk) -> bytes:
+    """The chunk's rows in COPY text format (id, dataset_id, payload)."""
+    rng = random.Random(chunk.seed)
+    payload_fn = KINDS[chunk.kind][1]
+    prefix = f"\t{chunk.dataset_id}\t"
+    return "".join(
+        f"{chunk.first_id + i}{prefix}{copy_text(json.dumps(payload_fn(rng)))}\n"
+        for i in range(chunk.rows)
+    ).encode()
+
+
+def _init_worker() -> None:
+    # connections inherited from the parent must not be shared
+    engine.dispose(close=False)
+
+
+def load_chunk(chunk: Chunk) -> int:
+    """Generate one chunk and COPY it in, in its own transaction."""
+    data = generate_chunk(chunk)
+    with engine.connect() as conn:
+        conn.exec_driver_sql("SET statement_timeout = 0")
+        # a lost chunk on a crash is fine for generated data
+        conn.exec_driver_sql("SET synchronous_commit = off")
+        with conn.connection.driver_connection.cursor() as cur:
+            with cur.copy(COPY_RECORDS) as copy:
+                copy.write(data)
+        conn.commit()
+    return chunk.rows
+
+
+def load_chunks(chunks: List[Chunk], workers: int) -> Iterator[int]:
+    """Load chunks in parallel; yields the row count of each finished chunk."""
+    if workers <= 1:
+        yield from map(load_chunk, chunks)
+        return
+    with multiprocessing.Pool(workers, initializer=_init_worker) as pool:
+        yield from pool.imap_unordered(load_chunk, chunks)
+
+
+# --------- Database setup --------- #
 
 def reset_demo_data(db: Session) -> None:
     """
-    Wipe existing demo data so the script is idempotent for development.
+    Wipe all datasets and what hangs off them, and restart the id
+    sequences, so the script is idempotent. Partitions of a partitioned
+    records table are dropped with their datasets.
     """
-    db.query(Bookmark).delete()
-    db.query(DatasetField).delete()
-    db.query(Record).delete()
-    db.query(Dataset).delete()
+    if is_partitioned(db):
+        # a partition still referenced by a bookmark can't be detached
+        db.execute(text("TRUNCATE bookmarks"))
+        for dataset_id in db.scalars(select(Dataset.id)).all():
+            drop_partition(db, dataset_id)
+    db.execute(
+        text(
+            "TRUNCATE bookmarks, dataset_fields, jobs, records, datasets "
+            "RESTART IDENTITY"
+        )
+    )
     db.commit()
 
 
-def main() -> None:
-    db: Session = SessionLocal()
-    try:
-        print("Clearing existing demo data...")
-        reset_demo_data(db)
+def create_datasets(db: Session, specs: List[DatasetSpec]) -> None:
+    # the ORM insert also creates each dataset's partition, if any
+    db.add_all(
+        [
+            Dataset(
+                id=spec.id,
+                name=spec.name,
+                description=KINDS[spec.kind][0],
+                row_count=spec.rows,
+            )
+            for spec in specs
+        ]
+    )
+    db.commit()
 
-        print("Seeding genes dataset...")
-        seed_dataset(
-            db,
-            name="genes",
-            description="Human genes",
-            n_rows=3000,
-            payload_fn=random_gene_payload,
-        )
 
-        print("Seeding assays dataset...")
-        seed_dataset(
-            db,
-            name="assays",
-            description="Sequencing assays",
-            n_rows=2000,
-            payload_fn=random_assay_payload,
+def next_record_id(db: Session) -> int:
+    return (db.scalar(text("SELECT max(id) FROM records")) or 0) + 1
+
+
+def sync_id_sequence(db: Session) -> None:
+    """Move the records id sequence past the explicitly assigned ids."""
+    db.execute(
+        text(
+            "SELECT setval(pg_get_serial_sequence('records', 'id'), "
+            "greatest((SELECT max(id) FROM records), 1))"
         )
+    )
+    db.commit()
 
-        print("Seeding experiments dataset...")
-        seed_dataset(
-            db,
-            name="experiments",
-            description="Gene expression experiments",
-            n_rows=2500,
-            payload_fn=random_experiment_payload,
+
+def drop_record_indexes(db: Session) -> List[str]:
+    """
+    Drop the non-unique indexes of records and return their definitions.
+    Building the GIN indexes once after a bulk load is much cheaper than
+    maintaining them row by row during it.
+    """
+    rows = db.execute(
+        text(
+            "SELECT i.indexrelid::regclass::text, pg_get_indexdef(i.indexrelid) "
+            "FROM pg_index i "
+            "WHERE i.indrelid = 'records'::regclass AND NOT i.indisunique"
         )
+    ).all()
+    for name, _ in rows:
+        db.execute(text(f"DROP INDEX {name}"))
+    db.commit()
+    # a partitioned parent's index is defined ON ONLY records; rebuilt
+    # like that it would not cover the partitions
+    return [ddl.replace(" ON ONLY ", " ON ", 1) for _, ddl in rows]
+
+
+def restore_record_indexes(db: Session, definitions: List[str]) -> None:
+    db.execute(text("SET maintenance_work_mem = '512MB'"))
+    for ddl in definitions:
+        db.execute(text(ddl))
+        db.commit()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Generate synthetic datasets.")
+    parser.add_argument("--datasets", type=int, default=len(KINDS))
+    parser.add_argument(
+        "--rows",
+        type=int,
+        help="records per dataset (default: the demo sizes, 2000-3000)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=multiprocessing.cpu_count(),
+        help="generator/loader processes (default: one per CPU)",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--keep-indexes",
+        action="store_true",
+        help="maintain the records indexes during the load instead of "
+        "rebuilding them afterwards",
+    )
+    parser.add_argument(
+        "--skip-stats",
+        action="store_true",
+        help="leave field stats to a stats refresh job",
+    )
+    args = parser.parse_args(argv)
 
+    specs = plan_datasets(args.datasets, args.rows, args.seed)
+    total = sum(spec.rows for spec in specs)
+
+    db: Session = SessionLocal()
+    try:
+        db.execute(text("SET statement_timeout = 0"))
+        print("Clearing existing data...")
+        reset_demo_data(db)
+        create_datasets(db, specs)
+        chunks = plan_chunks(specs, next_record_id(db), args.seed)
         db.commit()
-        print("Done.")
+
+        print(
+            f"Loading {total:,} records into {len(specs)} datasets "
+            f"with {args.workers} workers..."
+        )
+        started = time.perf_counter()
+        deferred = [] if args.keep_indexes else drop_record_indexes(db)
+        try:
+            loaded = 0
+            for rows in load_chunks(chunks, args.workers):
+                loaded += rows
+                elapsed = time.perf_counter() - started
+                print(
+                    f"  {loaded:,}/{total:,} ({loaded / max(elapsed, 1e-9):,.0f} rows/s)",
+                    end="\r",
+                    flush=True,
+                )
+            print()
+        finally:
+            if deferred:
+                print("Building indexes...")
+                db.rollback()
+                restore_record_indexes(db, deferred)
+        sync_id_sequence(db)
+
+        if not args.skip_stats:
+            print("Computing stats...")
+            for spec in specs:
+                compute_schema_stats(db, db.get(Dataset, spec.id))
+                db.commit()
+
+        print(f"Done in {time.perf_counter() - started:.1f}s.")
     finally:
         db.close()
 
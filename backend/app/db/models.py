@@ -3,19 +3,24 @@ from typing import Optional
 from uuid import uuid4
 
 from sqlalchemy import (
+    DDL,
     BigInteger,
     Column,
     DateTime,
     ForeignKey,
+    Index,
     JSON,
     String,
     Text,
     UniqueConstraint,
+    event,
+    text,
 )
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.dialects.postgresql import JSONB, TSVECTOR, UUID
 from sqlalchemy.orm import relationship, Mapped, mapped_column
 
 from app.db.base import Base
+from app.db.partitioning import create_partition, is_partitioned
 
 
 class Dataset(Base):
@@ -44,6 +49,11 @@ class Dataset(Base):
         cascade="all, delete-orphan",
     )
 
+    __table_args__ = (
+        # list_datasets: default sort is updated_at DESC
+        Index("ix_datasets_updated_at", "updated_at"),
+    )
+
 
 class DatasetField(Base):
     __tablename__ = "dataset_fields"
@@ -76,7 +86,12 @@ class Record(Base):
         ForeignKey("datasets.id", ondelete="CASCADE"),
         nullable=False,
     )
-    payload: Mapped[dict] = mapped_column(JSON, nullable=False)
+    payload: Mapped[dict] = mapped_column(JSONB, nullable=False)
+    # Lexemes of the payload values (not keys), maintained by the
+    # records_search_vector_sync trigger; deferred so it is never loaded
+    search_vector: Mapped[Optional[str]] = mapped_column(
+        TSVECTOR, nullable=True, deferred=True
+    )
 
     dataset: Mapped[Dataset] = relationship("Dataset", back_populates="records")
     bookmarks: Mapped[list["Bookmark"]] = relationship(
@@ -85,6 +100,21 @@ class Record(Base):
         cascade="all, delete-orphan",
     )
 
+    __table_args__ = (
+        # Every records query is scoped to one dataset and ordered or
+        # seeked by id (default sort, keyset pages, batch lookups)
+        Index("ix_records_dataset_id_id", "dataset_id", "id"),
+        # Serves containment (@>) lookups such as eq filters
+        Index(
+            "ix_records_payload_gin",
+            "payload",
+            postgresql_using="gin",
+            postgresql_ops={"payload": "jsonb_path_ops"},
+        ),
+        # Serves full-text search (search_vector @@ tsquery)
+        Index("ix_records_search_vector", "search_vector", postgresql_using="gin"),
+    )
+
 
 class Bookmark(Base):
     __tablename__ = "bookmarks"
@@ -110,4 +140,80 @@ class Bookmark(Base):
 
     __table_args__ = (
         UniqueConstraint("user_id", "record_id", name="uix_user_record_bookmark"),
+        # list_bookmarks_for_user: newest first, with and without a dataset
+        Index(
+            "ix_bookmarks_user_dataset_created_at",
+            "user_id",
+            "dataset_id",
+            text("created_at DESC"),
+        ),
+        Index("ix_bookmarks_user_created_at", "user_id", text("created_at DESC")),
     )
+
+
+class Job(Base):
+    """
+    A unit of background work (e.g. a stats refresh). The table is the
+    queue: workers claim a job by moving it from queued to running.
+    """
+
+    __tablename__ = "jobs"
+
+    id: Mapped[str] = mapped_column(
+        UUID(as_uuid=False),
+        primary_key=True,
+        default=lambda: str(uuid4()),
+    )
+    kind: Mapped[str] = mapped_column(String, nullable=False)
+    dataset_id: Mapped[Optional[str]] = mapped_column(
+        UUID(as_uuid=False),
+        ForeignKey("datasets.id", ondelete="CASCADE"),
+        nullable=True,
+    )
+    # queued -> running -> succeeded | failed
+    status: Mapped[str] = mapped_column(String, default="queued", nullable=False)
+    error: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=datetime.utcnow, nullable=False
+    )
+    started_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
+    finished_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
+
+    __table_args__ = (
+        Index("ix_jobs_status_created_at", "status", "created_at"),
+    )
+
+
+# Same trigger as migration 8e41c0d7a9f2, for schemas built with create_all
+event.listen(
+    Record.__table__,
+    "after_create",
+    DDL(
+        """
+        CREATE OR REPLACE FUNCTION records_search_vector_sync() RETURNS trigger AS $$
+        BEGIN
+            NEW.search_vector := jsonb_to_tsvector(
+                'simple', NEW.payload, '["string", "numeric", "boolean"]'
+            );
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql;
+        CREATE TRIGGER records_search_vector_sync
+        BEFORE INSERT OR UPDATE OF payload ON records
+        FOR EACH ROW EXECUTE FUNCTION records_search_vector_sync();
+        """
+    ),
+)
+
+
+
+@event.listens_for(Dataset, "after_insert")
+def _create_records_partition(mapper, connection, target: Dataset) -> None:
+    # Once records is partitioned (app.db.partitioning), each dataset gets
+    # its partition in the transaction that creates it
+    if is_partitioned(connection):
+        create_partition(connection, target.id)
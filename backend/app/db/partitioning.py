@@ -0,0 +1,252 @@
+# app/db/partitioning.py
+
+"""
+Optional LIST partitioning of records by dataset_id.
+
+The plain records table is what the migrations create. Converting it is
+opt-in and done once, offline:
+
+    python -m app.db.partitioning convert
+    python -m app.db.partitioning status
+
+From then on:
+
+- every new dataset gets its own partition, records_<dataset id hex>,
+  created in the same transaction as the dataset row (Dataset after_insert
+  hook in app.db.models)
+- deleting a dataset (dataset_repo.delete_dataset) detaches and drops its
+  partition instead of DELETEing its rows one by one
+- dataset-scoped queries (WHERE dataset_id = :id) only touch that
+  partition; with a generic prepared plan the pruning happens at executor
+  start-up, so it holds for cached statements too
+- per-dataset payload indexes (index_manager) are built on the partition
+
+Records of a dataset without a partition land in records_default.
+
+A unique constraint on a partitioned table has to include the partition
+key, so the partitioned layout differs from the plain one in two places:
+the primary key is (dataset_id, id), and bookmarks reference records by
+(dataset_id, record_id). Ids still come from the same sequence and stay
+unique across datasets, so nothing that looks records up by id changes.
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from typing import Dict, List, Optional, Union
+from uuid import UUID
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from app.db.base import engine
+
+
+DEFAULT_PARTITION = "records_default"
+
+_IS_PARTITIONED = text(
+    "SELECT EXISTS ("
+    "SELECT 1 FROM pg_partitioned_table p JOIN pg_class c ON c.oid = p.partrelid "
+    "WHERE c.relname = 'records' AND pg_table_is_visible(c.oid))"
+)
+
+_PARTITIONS = text(
+    """
+    SELECT c.relname, pg_get_expr(c.relpartbound, c.oid),
+           greatest(c.reltuples, 0)::bigint
+    FROM pg_inherits i
+    JOIN pg_class c ON c.oid = i.inhrelid
+    WHERE i.inhparent = 'records'::regclass
+    ORDER BY c.relname
+    """
+)
+
+Bind = Union[Connection, Session]
+
+
+def partition_name(dataset_id: Union[str, UUID]) -> str:
+    return f"records_{UUID(str(dataset_id)).hex}"
+
+
+def is_partitioned(bind: Bind) -> bool:
+    """Whether records has been converted to a partitioned table."""
+    return bool(bind.execute(_IS_PARTITIONED).scalar())
+
+
+def create_partition(bind: Bind, dataset_id: Union[str, UUID]) -> str:
+    """
+    CREATE TABLE records_<hex> PARTITION OF records FOR VALUES IN (<id>).
+    The dataset id is validated as a UUID, so it is safe to inline (DDL
+    takes no parameters).
+    """
+    name = partition_name(dataset_id)
+    bind.execute(
+        text(
+            f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF records "
+            f"FOR VALUES IN ('{UUID(str(dataset_id))}')"
+        )
+    )
+    return name
+
+
+def drop_partition(bind: Bind, dataset_id: Union[str, UUID]) -> bool:
+    """
+    Detach and drop the partition of a dataset. Bookmarks of the dataset
+    must be gone first: detaching checks that no row still references the
+    partition. Returns False if the dataset has no partition.
+    """
+    name = partition_name(dataset_id)
+    if bind.execute(text("SELECT to_regclass(:name)"), {"name": name}).scalar() is None:
+        return False
+    bind.execute(text(f"ALTER TABLE records DETACH PARTITION {name}"))
+    bind.execute(text(f"DROP TABLE {name}"))
+    return True
+
+
+def list_partitions(bind: Bind) -> List[Dict[str, object]]:
+    """name / bound / estimated rows of every partition of records."""
+    return [
+        {"name": name, "bound": bound, "rows": rows}
+        for name, bound, rows in bind.execute(_PARTITIONS)
+    ]
+
+
+def _scalar(conn: Connection, sql: str) -> Optional[str]:
+    return conn.execute(text(sql)).scalar()
+
+
+def convert(conn: Connection) -> Optional[int]:
+    """
+    Rebuild records as a table partitioned by dataset_id, with one
+    partition per existing dataset, in the caller's transaction.
+
+    records is locked ACCESS EXCLUSIVE and every row copied once, so the
+    table is unavailable for the duration: run it in a maintenance window.
+    Per-dataset payload indexes are not carried over (re-run
+    `python -m app.db.index_manager --all`). Returns the number of
+    dataset partitions created, or None if records is already partitioned.
+    """
+    if is_partitioned(conn):
+        return None
+
+    conn.execute(text("LOCK TABLE bookmarks, records IN ACCESS EXCLUSIVE MODE"))
+    conn.execute(text("ALTER TABLE records RENAME TO records_unpartitioned"))
+    conn.execute(
+        text(
+            "ALTER TABLE records_unpartitioned "
+            "RENAME CONSTRAINT records_pkey TO records_unpartitioned_pkey"
+        )
+    )
+    # the other index names are taken over by the partitioned table
+    indexes = conn.execute(
+        text(
+            "SELECT c.relname FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+            "WHERE i.indrelid = 'records_unpartitioned'::regclass AND NOT i.indisprimary"
+        )
+    ).scalars()
+    for index in list(indexes):
+        conn.execute(text(f"DROP INDEX {index}"))
+
+    # the id sequence is owned by the old table and would go with it
+    sequence = _scalar(conn, "SELECT pg_get_serial_sequence('records_unpartitioned', 'id')")
+    conn.execute(text(f"ALTER SEQUENCE {sequence} OWNED BY NONE"))
+
+    conn.execute(
+        text(
+            "CREATE TABLE records (LIKE records_unpartitioned INCLUDING DEFAULTS) "
+            "PARTITION BY LIST (dataset_id)"
+        )
+    )
+    # also serves what ix_records_dataset_id_id did on the plain table
+    conn.execute(text("ALTER TABLE records ADD PRIMARY KEY (dataset_id, id)"))
+    conn.execute(
+        text(
+            "ALTER TABLE records ADD CONSTRAINT records_dataset_id_fkey "
+            "FOREIGN KEY (dataset_id) REFERENCES datasets (id) ON DELETE CASCADE"
+        )
+    )
+    conn.execute(text(f"CREATE TABLE {DEFAULT_PARTITION} PARTITION OF records DEFAULT"))
+    dataset_ids = conn.execute(text("SELECT id FROM datasets ORDER BY id")).scalars()
+    created = [create_partition(conn, dataset_id) for dataset_id in list(dataset_ids)]
+
+    # indexes and the search_vector trigger after the copy: cheaper to
+    # build once than to maintain row by row (search_vector is copied)
+    conn.execute(text("INSERT INTO records SELECT * FROM records_unpartitioned"))
+    conn.execute(
+        text(
+            "CREATE INDEX ix_records_payload_gin ON records "
+            "USING gin (payload jsonb_path_ops)"
+        )
+    )
+    conn.execute(
+        text("CREATE INDEX ix_records_search_vector ON records USING gin (search_vector)")
+    )
+    conn.execute(
+        text(
+            "CREATE TRIGGER records_search_vector_sync "
+            "BEFORE INSERT OR UPDATE OF payload ON records "
+            "FOR EACH ROW EXECUTE FUNCTION records_search_vector_sync()"
+        )
+    )
+
+    fk = _scalar(
+        conn,
+        "SELECT conname FROM pg_constraint WHERE contype = 'f' "
+        "AND conrelid = 'bookmarks'::regclass "
+        "AND confrelid = 'records_unpartitioned'::regclass",
+    )
+    conn.execute(text(f"ALTER TABLE bookmarks DROP CONSTRAINT {fk}"))
+    conn.execute(
+        text(
+            "ALTER TABLE bookmarks ADD CONSTRAINT bookmarks_dataset_id_record_id_fkey "
+            "FOREIGN KEY (dataset_id, record_id) REFERENCES records (dataset_id, id) "
+            "ON DELETE CASCADE"
+        )
+    )
+
+    conn.execute(text(f"ALTER SEQUENCE {sequence} OWNED BY records.id"))
+    conn.execute(text("DROP TABLE records_unpartitioned"))
+    conn.execute(text("ANALYZE records"))
+    return len(created)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        description="Partition the records table by dataset."
+    )
+    parser.add_argument(
+        "command",
+        choices=["convert", "status"],
+        help="convert: rebuild records as a partitioned table (locks it); "
+        "status: list the partitions",
+    )
+    args = parser.parse_args(argv)
+
+    if args.command == "status":
+        with engine.connect() as conn:
+            if not is_partitioned(conn):
+                print("records is not partitioned.")
+                return
+            for p in list_partitions(conn):
+                print(f"  {p['name']}: {p['bound']} (~{p['rows']:,} rows)")
+        return
+
+    started = time.perf_counter()
+    with engine.begin() as conn:
+        # the copy outlasts the request statement_timeout
+        conn.execute(text("SET LOCAL statement_timeout = 0"))
+        created = convert(conn)
+    if created is None:
+        print("records is already partitioned.")
+        return
+    print(
+        f"Partitioned records: {created} dataset partitions "
+        f"in {time.perf_counter() - started:.1f}s. "
+        "Re-run `python -m app.db.index_manager --all` for payload indexes."
+    )
+
+
+if __name__ == "__main__":
+    main()
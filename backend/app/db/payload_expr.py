@@ -0,0 +1,57 @@
+# app/db/payload_expr.py
+
+"""
+SQL expressions over fields of Record.payload.
+
+Both the record query builder and the index manager build their field
+expressions here, so queries emit exactly the expressions the per-field
+expression indexes are declared on (the planner only uses an expression
+index when the query expression matches it).
+"""
+
+from typing import Optional
+
+from sqlalchemy import Numeric, Text, literal_column
+from sqlalchemy.dialects import postgresql
+
+
+def payload_text(name: str):
+    """payload->>'name' as text."""
+    quoted = name.replace("'", "''")
+    return literal_column(f"(payload->>'{quoted}')", Text)
+
+
+def payload_numeric(name: str):
+    """
+    (payload->>'name')::numeric, or NULL when the JSON value is not a number.
+
+    Guarding the cast keeps a stray "NA" in a number field from failing the
+    whole query; the guard is part of the expression, so the index DDL and
+    the queries stay identical.
+    """
+    quoted = name.replace("'", "''")
+    return literal_column(
+        f"(CASE WHEN jsonb_typeof(payload->'{quoted}') = 'number' "
+        f"THEN (payload->>'{quoted}')::numeric END)",
+        Numeric,
+    )
+
+
+def payload_typed(name: str, field_type: Optional[str]):
+    """
+    Field expression according to its DatasetField.type: numbers compare
+    and sort numerically, everything else as text.
+    """
+    if field_type == "number":
+        return payload_numeric(name)
+    return payload_text(name)
+
+
+def render(expr) -> str:
+    """Render an expression as literal Postgres SQL (for DDL)."""
+    return str(
+        expr.compile(
+            dialect=postgresql.dialect(),
+            compile_kwargs={"literal_binds": True},
+        )
+    )
@@ -0,0 +1,116 @@
+# app/db/pool.py
+
+"""
+Connection pools that record how long checkouts wait.
+
+SQLAlchemy's pool exposes its current counts (size, checked in/out,
+overflow) but not how long requests queue for a connection, which is what
+tells an undersized pool apart from slow queries. TimedQueuePool and
+TimedAsyncQueuePool time every checkout and keep the numbers in a
+PoolStats that the admin pool endpoint reports.
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any, Dict
+
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool, QueuePool
+
+
+logger = logging.getLogger(__name__)
+
+# Waits kept for percentiles
+RECENT_WAITS = 1000
+
+
+class PoolStats:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.recent = deque(maxlen=RECENT_WAITS)
+
+    def record(self, wait: float) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+            self.recent.append(wait)
+
+    def record_timeout(self) -> None:
+        with self._lock:
+            self.timeouts += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            recent = sorted(self.recent)
+            checkouts, timeouts = self.checkouts, self.timeouts
+            total, peak = self.total_wait, self.max_wait
+
+        def pct(q: float) -> float:
+            if not recent:
+                return 0.0
+            return recent[min(len(recent) - 1, int(q * len(recent)))] * 1000
+
+        return {
+            "checkouts": checkouts,
+            "timeouts": timeouts,
+            "wait_ms_avg": total / checkouts * 1000 if checkouts else 0.0,
+            "wait_ms_p95": pct(0.95),
+            "wait_ms_max": peak * 1000,
+        }
+
+
+class _TimedPoolMixin:
+    stats: PoolStats
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+
+    def recreate(self):
+        # dispose()/invalidation builds a fresh pool; keep counting into it
+        new = super().recreate()
+        new.stats = self.stats
+        return new
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except PoolTimeoutError:
+            self.stats.record_timeout()
+            logger.warning("connection pool exhausted: %s", self.status())
+            raise
+        self.stats.record(time.perf_counter() - start)
+        return conn
+
+
+class TimedQueuePool(_TimedPoolMixin, QueuePool):
+    pass
+
+
+class TimedAsyncQueuePool(_TimedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def pool_metrics(pool: Pool) -> Dict[str, Any]:
+    """Current counts plus checkout wait statistics for a pool."""
+    metrics: Dict[str, Any] = {"pool": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        metrics.update(
+            size=pool.size(),
+            checked_out=pool.checkedout(),
+            idle=pool.checkedin(),
+            overflow=max(pool.overflow(), 0),
+            max_overflow=pool._max_overflow,
+        )
+    stats = getattr(pool, "stats", None)
+    if stats is not None:
+        metrics.update(stats.snapshot())
+    return metrics
@@ -1,19 +1,51 @@
-from typing import List, Tuple, Optional
+from typing import Any, List, Tuple, Optional
+from uuid import UUID
 
-from sqlalchemy import select, func
+from sqlalchemy import (
+    BigInteger,
+    Text,
+    and_,
+    any_,
+    delete,
+    func,
+    literal,
+    literal_column,
+    select,
+)
+from sqlalchemy.dialects.postgresql import ARRAY, UUID as PG_UUID, insert
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.db.models import Bookmark
+from app.db.models import Bookmark, Record
+from app.domain.repositories.record_repo import project_payload
 
 
-def list_bookmarks_for_user(
-    db: Session,
+def _bookmarks_page(
     user_id: str,
     dataset_id: Optional[str],
     page: int,
     limit: int,
-) -> Tuple[List[Bookmark], int]:
-    base = select(Bookmark).where(Bookmark.user_id == user_id)
+    include_record: bool,
+    fields: Optional[List[str]],
+):
+    """(count statement, page statement) of a bookmark listing."""
+    if include_record:
+        payload = Record.payload if fields is None else project_payload(fields)
+        base = (
+            select(Bookmark, payload)
+            # dataset_id too: on a partitioned table it prunes to one
+            # partition and matches its (dataset_id, id) key
+            .join(
+                Record,
+                and_(
+                    Record.dataset_id == Bookmark.dataset_id,
+                    Record.id == Bookmark.record_id,
+                ),
+            )
+            .where(Bookmark.user_id == user_id)
+        )
+    else:
+        base = select(Bookmark).where(Bookmark.user_id == user_id)
     count_base = select(func.count()).select_from(Bookmark).where(
         Bookmark.user_id == user_id
     )
@@ -22,16 +54,56 @@ def list_bookmarks_for_user(
         base = base.where(Bookmark.dataset_id == dataset_id)
         count_base = count_base.where(Bookmark.dataset_id == dataset_id)
 
-    total: int = db.scalar(count_base) or 0
-
     query = (
         base.order_by(Bookmark.created_at.desc())
         .offset((page - 1) * limit)
         .limit(limit)
     )
+    return count_base, query
+
+
+def list_bookmarks_for_user(
+    db: Session,
+    user_id: str,
+    dataset_id: Optional[str],
+    page: int,
+    limit: int,
+    include_record: bool = False,
+    fields: Optional[List[str]] = None,
+) -> Tuple[List[Any], int]:
+    """
+    A page of the user's bookmarks, newest first, and their total.
+
+    With include_record the items are (Bookmark, payload) pairs: the
+    record payload (projected to `fields` when given) is joined in by the
+    same query instead of being loaded per bookmark.
+    """
+    count_query, query = _bookmarks_page(
+        user_id, dataset_id, page, limit, include_record, fields
+    )
+    total: int = db.scalar(count_query) or 0
+    if include_record:
+        return [tuple(row) for row in db.execute(query)], total
+    return db.scalars(query).all(), total
+
 
-    items = db.scalars(query).all()
-    return items, total
+async def list_bookmarks_for_user_async(
+    db: AsyncSession,
+    user_id: str,
+    dataset_id: Optional[str],
+    page: int,
+    limit: int,
+    include_record: bool = False,
+    fields: Optional[List[str]] = None,
+) -> Tuple[List[Any], int]:
+    """list_bookmarks_for_user on the async engine (DB_ASYNC request path)."""
+    count_query, query = _bookmarks_page(
+        user_id, dataset_id, page, limit, include_record, fields
+    )
+    total: int = await db.scalar(count_query) or 0
+    if include_record:
+        return [tuple(row) for row in await db.execute(query)], total
+    return (await db.scalars(query)).all(), total
 
 
 def get_bookmark_by_id(
@@ -46,13 +118,94 @@ def get_bookmark_by_id(
     return db.scalars(stmt).first()
 
 
-def get_bookmark_by_user_and_record(
+def get_bookmarks_by_records(
     db: Session,
     user_id: str,
-    record_id: int,
-) -> Optional[Bookmark]:
+    record_ids: List[int],
+) -> List[Bookmark]:
     stmt = select(Bookmark).where(
         Bookmark.user_id == user_id,
-        Bookmark.record_id == record_id,
+        Bookmark.record_id == any_(literal(record_ids, ARRAY(BigInteger))),
     )
-    return db.scalars(stmt).first()
+    return list(db.scalars(stmt))
+
+
+def _is_uuid(value: str) -> bool:
+    try:
+        UUID(value)
+    except ValueError:
+        return False
+    return True
+
+
+def upsert_bookmarks(
+    db: Session,
+    user_id: str,
+    entries: List[Tuple[str, int, str]],
+    update: bool = True,
+) -> List[Tuple[Bookmark, bool]]:
+    """
+    Insert (dataset_id, record_id, note) bookmarks for a user in one
+    statement:
+
+      INSERT INTO bookmarks ... SELECT ... FROM unnest(...) JOIN records
+      ON CONFLICT (user_id, record_id) DO UPDATE SET note | DO NOTHING
+
+    Entries whose record does not exist in the given dataset are skipped
+    by the join instead of failing the statement. record_ids must be
+    unique. Returns (bookmark, inserted) for every written row: all
+    matched entries with update, only the new ones without.
+    """
+    # malformed dataset ids match no record; dropped here so the uuid[]
+    # cast below cannot fail
+    entries = [e for e in entries if _is_uuid(e[0])]
+    if not entries:
+        return []
+    dataset_ids, record_ids, notes = (list(column) for column in zip(*entries))
+    v = (
+        func.unnest(
+            literal(dataset_ids, ARRAY(PG_UUID(as_uuid=False))),
+            literal(record_ids, ARRAY(BigInteger)),
+            literal(notes, ARRAY(Text)),
+        )
+        .table_valued("dataset_id", "record_id", "note")
+        .render_derived(name="v")
+    )
+    rows = (
+        select(literal(user_id, Text), Record.dataset_id, Record.id, v.c.note, func.now())
+        .select_from(v)
+        .join(
+            Record,
+            and_(
+                Record.dataset_id == v.c.dataset_id,
+                Record.id == v.c.record_id,
+            ),
+        )
+    )
+    stmt = insert(Bookmark).from_select(
+        ["user_id", "dataset_id", "record_id", "note", "created_at"], rows
+    )
+    if update:
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["user_id", "record_id"],
+            set_={"note": stmt.excluded.note},
+        )
+    else:
+        stmt = stmt.on_conflict_do_nothing(index_elements=["user_id", "record_id"])
+
+    # xmax is 0 on a freshly inserted row version, set on an updated one
+    stmt = stmt.returning(Bookmark, literal_column("xmax = 0").label("inserted"))
+    return [(bm, inserted) for bm, inserted in db.execute(stmt)]
+
+
+def delete_bookmarks(db: Session, user_id: str, bookmark_ids: List[int]) -> List[int]:
+    """Delete the user's bookmarks among bookmark_ids; returns the deleted ids."""
+    stmt = (
+        delete(Bookmark)
+        .where(
+            Bookmark.user_id == user_id,
+            Bookmark.id == any_(literal(bookmark_ids, ARRAY(BigInteger))),
+        )
+        .returning(Bookmark.id)
+    )
+    return list(db.scalars(stmt))
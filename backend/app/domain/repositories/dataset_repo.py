@@ -1,9 +1,11 @@
-from typing import Optional, Tuple, List
+from typing import Optional, Tuple, List, Dict
 
-from sqlalchemy import select, func
+from sqlalchemy import delete, select, func
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session, selectinload
 
-from app.db.models import Dataset
+from app.db.models import Bookmark, Dataset, DatasetField
+from app.db.partitioning import drop_partition, is_partitioned
 
 
 def list_datasets(
@@ -34,10 +36,63 @@ def list_datasets(
     items = db.scalars(query).all()
     return items, total
 
-def get_dataset_with_fields(db: Session, dataset_id: str) -> Optional[Dataset]:
-    stmt = (
+def _dataset(dataset_id: str):
+    return select(Dataset).where(Dataset.id == dataset_id)
+
+
+def _dataset_with_fields(dataset_id: str):
+    return (
         select(Dataset)
         .options(selectinload(Dataset.fields))
         .where(Dataset.id == dataset_id)
     )
-    return db.scalars(stmt).first()
+
+
+def _field_types(dataset_id: str):
+    return select(DatasetField.name, DatasetField.type).where(
+        DatasetField.dataset_id == dataset_id
+    )
+
+
+def get_dataset_with_fields(db: Session, dataset_id: str) -> Optional[Dataset]:
+    return db.scalars(_dataset_with_fields(dataset_id)).first()
+
+
+def get_field_types(db: Session, dataset_id: str) -> Dict[str, str]:
+    """Map of payload field name -> DatasetField.type for a dataset."""
+    return {name: field_type for name, field_type in db.execute(_field_types(dataset_id))}
+
+
+def get_dataset(db: Session, dataset_id: str) -> Optional[Dataset]:
+    return db.scalars(_dataset(dataset_id)).first()
+
+
+# ---- Async (DB_ASYNC request path), same statements ---- #
+
+async def get_dataset_with_fields_async(
+    db: AsyncSession, dataset_id: str
+) -> Optional[Dataset]:
+    return (await db.scalars(_dataset_with_fields(dataset_id))).first()
+
+
+async def get_field_types_async(db: AsyncSession, dataset_id: str) -> Dict[str, str]:
+    rows = await db.execute(_field_types(dataset_id))
+    return {name: field_type for name, field_type in rows}
+
+
+async def get_dataset_async(db: AsyncSession, dataset_id: str) -> Optional[Dataset]:
+    return (await db.scalars(_dataset(dataset_id))).first()
+
+
+def delete_dataset(db: Session, dataset_id: str) -> None:
+    """
+    Delete a dataset and everything in it. Fields, jobs, bookmarks and
+    records go by ON DELETE CASCADE; when records is partitioned, the
+    dataset's partition is dropped first so its rows are not deleted one
+    by one (its bookmarks go before, detaching checks nothing references
+    the partition).
+    """
+    if is_partitioned(db):
+        db.execute(delete(Bookmark).where(Bookmark.dataset_id == dataset_id))
+        drop_partition(db, dataset_id)
+    db.execute(delete(Dataset).where(Dataset.id == dataset_id))
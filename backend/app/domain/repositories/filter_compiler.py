@@ -0,0 +1,207 @@
+"""
+Compile record filters and sort keys into SQL.
+
+Field names are checked against DatasetField by the service layer
+(record_service.parse_filters) and rendered by payload_expr as escaped
+literal keys, so the predicates are exactly the expressions the per-field
+indexes are declared on. Every filter value is a bound parameter.
+
+The SQL of a records query therefore depends only on its shape (fields,
+operators, field types, number of eq candidates, sort), never on the
+values. Statements executed with CACHED are compiled once per shape
+into a dedicated LRU, and psycopg prepares a statement server-side once
+it has been run db_prepare_threshold times on a connection, after which
+Postgres stops re-planning it. The key is deliberately not a parameter
+(payload->>$1): a generic plan of such a statement could not use the
+expression indexes.
+"""
+
+import math
+from decimal import Decimal, InvalidOperation
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import Numeric, Text, and_, any_, false, func, literal, not_, or_
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.util import LRUCache
+
+from app.core.config import settings
+from app.db.models import Record
+from app.db.payload_expr import payload_numeric, payload_text, payload_typed
+from app.domain.schemas.filters import Filter, FilterClause, FilterGroup
+
+
+RANGE_OPS = {
+    "gt": lambda col, v: col > v,
+    "ge": lambda col, v: col >= v,
+    "lt": lambda col, v: col < v,
+    "le": lambda col, v: col <= v,
+}
+
+# Compiled SQL of record queries, keyed by SQLAlchemy's statement cache key
+# (the query shape; bound values are not part of it)
+statement_cache = LRUCache(settings.filter_statement_cache_size)
+
+
+# execution_options of record queries (Session.execute / scalar)
+CACHED = {"compiled_cache": statement_cache}
+
+
+def numeric_range(f: FilterClause, field_type: Optional[str]) -> bool:
+    """
+    Whether a gt/ge/lt/le filter compares numerically: always on number
+    fields and fields without stats, otherwise when its value is a number
+    (e.g. length:lt:10 on a field with a stray "NA"). The remaining ones,
+    such as date:ge:2024-01-01 on a string field, compare as text.
+    """
+    if field_type in (None, "number"):
+        return True
+    values = f.value if isinstance(f.value, list) else [f.value]
+    return all(isinstance(v, float) for v in values)
+
+
+def eq_candidates(f: FilterClause) -> List[Any]:
+    """
+    JSON values an eq filter may equal. The filter string is untyped, so
+    "1000" has to match both the number 1000 and the string "1000", and
+    "true" both the boolean and the string. The raw text is always a
+    candidate, so non-canonical spellings such as "02139" or "1000.50"
+    still match strings stored exactly like that.
+    """
+    raw = f.raw if f.raw is not None else str(f.value)
+    candidates: List[Any] = [raw]
+
+    if isinstance(f.value, float) and math.isfinite(f.value):
+        # ints are kept exact (floats lose precision past 2**53); jsonb
+        # compares numbers numerically, so 1000.0 also matches 1000
+        try:
+            candidates.append(int(raw))
+        except ValueError:
+            candidates.append(f.value)
+    elif raw in ("true", "false"):
+        candidates.append(raw == "true")
+    return candidates
+
+
+def _eq_predicate(f: FilterClause):
+    return or_(
+        *(
+            Record.payload.contains({f.name: candidate})
+            for candidate in eq_candidates(f)
+        )
+    )
+
+
+def _numeric_value(value: Any) -> Any:
+    try:
+        return Decimal(str(value))
+    except InvalidOperation:
+        return value
+
+
+def _raw_values(f: FilterClause) -> List[str]:
+    if isinstance(f.raw, list):
+        return f.raw
+    return [str(v) for v in f.value]
+
+
+def _in_predicate(f: FilterClause, field_type: Optional[str]):
+    """
+    field = ANY(:values), with the whole list bound as one array parameter
+    (the SQL is the same for any number of values). Number fields compare
+    numerically, everything else on payload->>'field'; both are the
+    expressions of the per-field btree indexes.
+    """
+    if field_type == "number":
+        values = [_numeric_value(v) for v in _raw_values(f)]
+        return payload_numeric(f.name) == any_(literal(values, ARRAY(Numeric)))
+    return payload_text(f.name) == any_(literal(_raw_values(f), ARRAY(Text)))
+
+
+def compile_filter(f: FilterClause, field_type: Optional[str]):
+    """
+    Predicate for one filter on a field of the given DatasetField.type
+    (None: the dataset has no stats for it). Unknown operators give None.
+
+    - eq: containment (payload @> '{"field": value}'), served by the
+      jsonb_path_ops GIN index; ne is its exact complement (rows lacking
+      the field are included)
+    - in: field = ANY(array), see _in_predicate; nin is its exact
+      complement like ne
+    - like: case-insensitive substring match on payload->>'field'
+    - gt/ge/lt/le/between: numeric comparison (non-numeric payload values
+      never match), or text comparison, see numeric_range
+    - isnull: the field is missing or JSON null (isnull:false: it is set)
+    """
+    if f.op == "eq":
+        return _eq_predicate(f)
+    if f.op == "ne":
+        return not_(_eq_predicate(f))
+    if f.op == "in":
+        return _in_predicate(f, field_type)
+    if f.op == "nin":
+        return not_(func.coalesce(_in_predicate(f, field_type), false()))
+    if f.op == "like":
+        return payload_text(f.name).ilike(f"%{f.value}%")
+    if f.op == "isnull":
+        col = payload_text(f.name)
+        return col.is_(None) if f.value else col.is_not(None)
+    if f.op == "between":
+        if numeric_range(f, field_type):
+            lo, hi = (_numeric_value(v) for v in _raw_values(f))
+            return payload_numeric(f.name).between(lo, hi)
+        lo, hi = _raw_values(f)
+        return payload_text(f.name).between(lo, hi)
+    if f.op in RANGE_OPS:
+        if numeric_range(f, field_type):
+            # bound as numeric (not float8) so the comparison stays on the
+            # numeric expression the per-field indexes are built on
+            return RANGE_OPS[f.op](payload_numeric(f.name), _numeric_value(f.value))
+        raw = f.raw if f.raw is not None else str(f.value)
+        return RANGE_OPS[f.op](payload_text(f.name), raw)
+    return None
+
+
+def _compile(f: Filter, field_types: Dict[str, str]):
+    if isinstance(f, FilterGroup):
+        predicates = [
+            p for p in (_compile(c, field_types) for c in f.clauses) if p is not None
+        ]
+        if not predicates:
+            return None
+        return (or_ if f.op == "or" else and_)(*predicates)
+    return compile_filter(f, field_types.get(f.name))
+
+
+def compile_filters(
+    filters: Optional[List[Filter]],
+    field_types: Optional[Dict[str, str]] = None,
+) -> List[Any]:
+    """Predicates of all filters (clauses and AND/OR groups), to be ANDed."""
+    predicates = []
+    for f in filters or []:
+        predicate = _compile(f, field_types or {})
+        if predicate is not None:
+            predicates.append(predicate)
+    return predicates
+
+
+def iter_clauses(filters: List[Filter]):
+    """All FilterClauses of a filter list, including those inside groups."""
+    for f in filters:
+        if isinstance(f, FilterGroup):
+            yield from iter_clauses(f.clauses)
+        else:
+            yield f
+
+
+def sort_key(field: Optional[str], field_types: Optional[Dict[str, str]] = None):
+    """
+    Column expression the records are ordered by.
+
+    - None -> Record.id
+    - number fields -> (payload->>'field')::numeric
+    - Otherwise -> payload->>'field' as text
+    """
+    if field is None:
+        return Record.id
+    return payload_typed(field, (field_types or {}).get(field))
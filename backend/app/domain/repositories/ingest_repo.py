@@ -0,0 +1,55 @@
+from typing import AsyncIterator, List
+
+from sqlalchemy import func, select, text, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.copy_format import copy_text
+from app.db.models import Dataset
+
+
+COPY_RECORDS = "COPY records (dataset_id, payload) FROM STDIN"
+
+
+async def dataset_exists(db: AsyncSession, dataset_id: str) -> bool:
+    return await db.scalar(select(Dataset.id).where(Dataset.id == dataset_id)) is not None
+
+
+async def copy_records(
+    db: AsyncSession,
+    dataset_id: str,
+    batches: AsyncIterator[List[str]],
+) -> int:
+    """
+    Stream batches of JSON payloads into records with COPY ... FROM STDIN,
+    on the session's connection and inside its transaction. Each batch is
+    written as it arrives, so memory is bounded by one batch. The COPY
+    lasts as long as the upload, so the request statement_timeout is
+    lifted for the rest of the transaction.
+
+    Returns the number of rows copied.
+    """
+    await db.execute(text("SET LOCAL statement_timeout = 0"))
+    conn = await db.connection()
+    raw = await conn.get_raw_connection()
+    pg = raw.driver_connection  # psycopg.AsyncConnection
+
+    prefix = f"{dataset_id}\t"
+    copied = 0
+    async with pg.cursor() as cur:
+        async with cur.copy(COPY_RECORDS) as copy:
+            async for batch in batches:
+                # one write per batch in COPY text format, instead of a
+                # write_row() round through the adapters for every row
+                await copy.write(
+                    "".join(prefix + copy_text(p) + "\n" for p in batch).encode()
+                )
+                copied += len(batch)
+    return copied
+
+
+async def bump_row_count(db: AsyncSession, dataset_id: str, added: int) -> None:
+    await db.execute(
+        update(Dataset)
+        .where(Dataset.id == dataset_id)
+        .values(row_count=Dataset.row_count + added, updated_at=func.now())
+    )
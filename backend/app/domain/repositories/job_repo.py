@@ -0,0 +1,66 @@
+from datetime import timedelta
+from typing import List, Optional
+
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import Session
+
+from app.db.models import Job
+
+
+def create_job(db: Session, kind: str, dataset_id: Optional[str] = None) -> Job:
+    job = Job(kind=kind, dataset_id=dataset_id, status="queued")
+    db.add(job)
+    db.flush()
+    return job
+
+
+def get_job(db: Session, job_id: str) -> Optional[Job]:
+    return db.get(Job, job_id)
+
+
+def claim_job(db: Session, job_id: str) -> Optional[Job]:
+    """
+    Move a queued job to running. Returns None if it was already claimed,
+    so a job submitted twice (e.g. resumed after a restart) runs once.
+    """
+    claimed = db.scalar(
+        update(Job)
+        .where(Job.id == job_id, Job.status == "queued")
+        .values(status="running", started_at=func.now())
+        .returning(Job.id)
+    )
+    db.commit()
+    return db.get(Job, claimed) if claimed else None
+
+
+def finish_job(db: Session, job_id: str, error: Optional[str] = None) -> None:
+    db.execute(
+        update(Job)
+        .where(Job.id == job_id)
+        .values(
+            status="failed" if error else "succeeded",
+            error=error,
+            finished_at=func.now(),
+        )
+    )
+    db.commit()
+
+
+def list_queued_job_ids(db: Session) -> List[str]:
+    stmt = select(Job.id).where(Job.status == "queued").order_by(Job.created_at)
+    return list(db.scalars(stmt).all())
+
+
+def fail_stale_jobs(db: Session, older_than_s: int, error: str) -> List[str]:
+    """Fail jobs running since more than older_than_s; returns their ids."""
+    failed = db.scalars(
+        update(Job)
+        .where(
+            Job.status == "running",
+            Job.started_at < func.now() - timedelta(seconds=older_than_s),
+        )
+        .values(status="failed", error=error, finished_at=func.now())
+        .returning(Job.id)
+    ).all()
+    db.commit()
+    return list(failed)
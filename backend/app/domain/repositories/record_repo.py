@@ -1,111 +1,205 @@
-from dataclasses import dataclass
-from typing import Optional, Tuple, List, Any, Literal
+from decimal import Decimal
+from typing import Optional, Tuple, List, Any, Literal, Iterator, Dict
 
-from sqlalchemy import select, func, Text, cast, text
+from sqlalchemy import select, func, Text, cast, text, tuple_, and_, any_, literal
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app.db.models import Record
+from app.db.payload_expr import payload_numeric, payload_text, payload_typed
+from app.domain.repositories.filter_compiler import (
+    CACHED,
+    compile_filters,
+    sort_key as _sort_key,
+)
+from app.domain.schemas.filters import Filter
 
 
-# ---- Filter model ---- #
+# substring: ILIKE over the whole payload text (keys included, seq scan)
+# fulltext: prefix match of every term against indexed payload values
+SearchMode = Literal["substring", "fulltext"]
 
-Op = Literal["eq", "ne", "lt", "gt", "le", "ge", "like"]
 
+# ---- Helpers ---- #
 
-@dataclass
-class FilterClause:
-    name: str
-    op: Op
-    value: Any
+def _apply_filters(
+    query,
+    filters: Optional[List[Filter]],
+    field_types: Optional[Dict[str, str]] = None,
+):
+    """Apply JSONB-based filters on Record.payload (see filter_compiler)."""
+    for predicate in compile_filters(filters, field_types):
+        query = query.where(predicate)
+    return query
 
 
-# ---- Helpers ---- #
-
-def _apply_filters(query, filters: Optional[List[FilterClause]]):
+def parse_sort(sort: Optional[str]) -> Tuple[Optional[str], bool]:
     """
-    Apply JSONB-based filters on Record.payload.
+    sort: "field:asc" | "field:desc"
 
-    We treat payload as JSON and access fields with payload->>'field'.
+    Returns (field, ascending). field is None when sorting on Record.id,
+    which is also the fallback for a missing/invalid sort string.
     """
-    if not filters:
-        return query
-
-    for f in filters:
-        col = text(f"(payload->>'{f.name}')")
+    if not sort:
+        return None, True
 
-        if f.op == "like":
-            # case-insensitive substring match
-            query = query.where(text(f"{col} ILIKE :v")).params(v=f"%{f.value}%")
-        elif f.op in ("eq", "ne"):
-            sql_op = "=" if f.op == "eq" else "!="
-            query = query.where(text(f"{col} {sql_op} :v")).params(v=str(f.value))
-        elif f.op in ("gt", "ge", "lt", "le"):
-            sql_op = {
-                "gt": ">",
-                "ge": ">=",
-                "lt": "<",
-                "le": "<=",
-            }[f.op]
-            # cast to numeric and compare; if cast fails, Postgres will error (OK for MVP)
-            query = query.where(
-                text(f"({col})::numeric {sql_op} :v")
-            ).params(v=f.value)
+    try:
+        field, direction = sort.split(":", 1)
+    except ValueError:
+        return None, True
 
-    return query
+    asc = direction.lower() == "asc"
+    if field == "id":
+        return None, asc
+    return field, asc
 
 
-def _apply_sort(query, sort: Optional[str]):
+def _apply_sort(query, sort: Optional[str], field_types: Optional[Dict[str, str]] = None):
     """
-    sort: "field:asc" | "field:desc"
+    Order by the sort key, with Record.id as a tie-breaker so the order is
+    total and stable (required for keyset pagination). This is also the
+    column order of the per-field expression indexes.
 
     - If None/invalid -> default ORDER BY id ASC
     - If field == "id" -> sort on Record.id
-    - Otherwise -> sort on payload->>'field' as text
+    - Otherwise -> sort on the typed payload field, then id
     """
-    if not sort:
-        return query.order_by(Record.id.asc())
+    field, asc = parse_sort(sort)
+    if field is None:
+        return query.order_by(Record.id.asc() if asc else Record.id.desc())
 
-    try:
-        field, direction = sort.split(":", 1)
-    except ValueError:
-        return query.order_by(Record.id.asc())
+    key = _sort_key(field, field_types)
+    if asc:
+        return query.order_by(key.asc(), Record.id.asc())
+    return query.order_by(key.desc(), Record.id.desc())
 
-    direction = direction.lower()
-    asc = direction == "asc"
 
-    if field == "id":
-        return query.order_by(Record.id.asc() if asc else Record.id.desc())
+def _keyset_phases(
+    sort: Optional[str],
+    after: Tuple[Any, int],
+    field_types: Optional[Dict[str, str]] = None,
+) -> List[Any]:
+    """
+    Seek predicates for the rows after `after` = (last sort key, last id),
+    in the order they must be read, instead of skipping rows with OFFSET.
+
+    Every predicate is a plain range on (sort key, id), so each one is an
+    ordered index range scan. The NULL block (NULLS LAST for ASC, NULLS
+    FIRST for DESC, matching _apply_sort) is a separate phase rather than an
+    OR, since an OR would prevent the range seek.
+    """
+    field, asc = parse_sort(sort)
+    last_key, last_id = after
+
+    if field is None:
+        return [Record.id > last_id if asc else Record.id < last_id]
 
-    col = text(f"(payload->>'{field}')")
+    key = _sort_key(field, field_types)
     if asc:
-        return query.order_by(text(f"{col} ASC"))
-    else:
-        return query.order_by(text(f"{col} DESC"))
+        if last_key is None:
+            # already inside the trailing NULL block
+            return [and_(key.is_(None), Record.id > last_id)]
+        # row comparison never matches NULL keys; they follow as phase two
+        return [tuple_(key, Record.id) > tuple_(last_key, last_id), key.is_(None)]
+
+    if last_key is None:
+        # leading NULL block: finish it, then start on the non-NULL keys
+        return [and_(key.is_(None), Record.id < last_id), key.is_not(None)]
+    return [tuple_(key, Record.id) < tuple_(last_key, last_id)]
+
+
+def _search_predicate(search: str, search_mode: SearchMode):
+    if search_mode == "fulltext":
+        # Terms are tokenized by the same parser that built search_vector and
+        # every lexeme must match as a prefix, e.g. "tp5 rna" -> 'tp5':* & 'rna':*.
+        # Served by the GIN index on search_vector.
+        return text(
+            "search_vector @@ to_tsquery('simple', ("
+            "SELECT string_agg(quote_literal(lexeme) || ':*', ' & ') "
+            "FROM unnest(to_tsvector('simple', :search_terms))))"
+        ).bindparams(search_terms=search)
+
+    # Simple substring search: cast JSON payload to text
+    return cast(Record.payload, Text).ilike(f"%{search}%")
+
+
+def _filtered_query(
+    dataset_id: str,
+    search: Optional[str],
+    filters: Optional[List[Filter]],
+    *columns,
+    search_mode: SearchMode = "substring",
+    field_types: Optional[Dict[str, str]] = None,
+):
+    """
+    SELECT <columns> (default: the Record entity) for a dataset, narrowed by
+    search + filters. Shared by paging and export so both see the same rows.
+    """
+    base = select(*(columns or (Record,))).where(Record.dataset_id == dataset_id)
+
+    if search:
+        base = base.where(_search_predicate(search, search_mode))
+
+    # Apply field-level filters to the base query
+    return _apply_filters(base, filters, field_types)
 
 
 # ---- Public API ---- #
 
-def list_all_records(
+def iter_all_records(
     db: Session,
     dataset_id: str,
     search: Optional[str],
     sort: Optional[str],
-    filters: Optional[List[FilterClause]] = None,
-) -> List[Record]:
+    filters: Optional[List[Filter]] = None,
+    batch_size: int = 1000,
+    field_types: Optional[Dict[str, str]] = None,
+    search_mode: SearchMode = "substring",
+) -> Iterator[List[Tuple[int, dict]]]:
     """
-    Return ALL records for a dataset matching search + filters,
-    sorted according to 'sort'. No pagination.
+    Yield ALL (id, payload) rows for a dataset matching search + filters,
+    sorted according to 'sort', in lists of at most batch_size rows.
+
+    Rows are read through a server-side cursor (yield_per implies
+    stream_results), so only one batch is held in memory at a time and no
+    ORM objects are built.
+
+    The query is executed and the first batch fetched before this returns,
+    so database errors are raised to the caller instead of surfacing midway
+    through a stream whose response status has already been sent.
     """
-    base = select(Record).where(Record.dataset_id == dataset_id)
+    stmt = _filtered_query(
+        dataset_id,
+        search,
+        filters,
+        Record.id,
+        Record.payload,
+        search_mode=search_mode,
+        field_types=field_types,
+    )
+    stmt = _apply_sort(stmt, sort, field_types).execution_options(yield_per=batch_size)
+
+    result = db.execute(stmt, execution_options=CACHED)
+    try:
+        partitions = result.partitions()
+        first = next(partitions, None)
+    except Exception:
+        result.close()
+        raise
+    return _iter_batches(result, first, partitions)
 
-    if search:
-        pattern = f"%{search}%"
-        base = base.where(cast(Record.payload, Text).ilike(pattern))
 
-    base = _apply_filters(base, filters)
-    stmt = _apply_sort(base, sort)
+def _iter_batches(result, first, partitions) -> Iterator[List[Tuple[int, dict]]]:
+    try:
+        if first is None:
+            return
+        yield [tuple(row) for row in first]
+        for batch in partitions:
+            yield [tuple(row) for row in batch]
+    finally:
+        result.close()
 
-    return db.scalars(stmt).all()
 
 def list_records(
     db: Session,
@@ -114,41 +208,364 @@ def list_records(
     limit: int,
     search: Optional[str],
     sort: Optional[str] = None,
-    filters: Optional[List[FilterClause]] = None,
-) -> Tuple[List[Record], int]:
+    filters: Optional[List[Filter]] = None,
+    after: Optional[Tuple[Any, int]] = None,
+    field_types: Optional[Dict[str, str]] = None,
+    search_mode: SearchMode = "substring",
+    count: bool = True,
+) -> Tuple[List[Record], Optional[int], Optional[Tuple[Any, int]]]:
     """
     List records for a dataset with:
-      - optional full-text search over payload (existing behavior)
-      - optional field-based filters (FilterClause)
+      - optional search over payload (substring or indexed fulltext)
+      - optional field-based filters (FilterClause / FilterGroup)
       - optional sort "field:asc|desc"
+      - either OFFSET paging (page) or keyset paging (after)
+
+    `after` is the (sort key, id) of the last row of the previous page; when
+    given, `page` is ignored and the query seeks directly past that row, so
+    every page costs the same regardless of depth.
+
+    `field_types` maps payload field names to their DatasetField.type and
+    decides how a payload sort key is typed.
 
-    Returns (items, total_after_filters).
+    With count=False the exact count(*) is skipped and total is None (see
+    count_records / estimate_records for the standalone variants).
+
+    Returns (items, total_after_filters, last_key), where last_key is the
+    (sort key, id) of the last returned row if another page may follow,
+    otherwise None.
     """
 
-    # Base query for this dataset
-    base = select(Record).where(Record.dataset_id == dataset_id)
+    base = _filtered_query(
+        dataset_id, search, filters, search_mode=search_mode, field_types=field_types
+    )
 
-    # Simple full-text search: cast JSON payload to text
-    if search:
-        pattern = f"%{search}%"
-        base = base.where(cast(Record.payload, Text).ilike(pattern))
+    # Count after search + filters (skipped when the caller has a total)
+    total: Optional[int] = None
+    if count:
+        total = db.scalar(
+            select(func.count()).select_from(base.subquery()), execution_options=CACHED
+        ) or 0
 
-    # Apply field-level filters to the base query
-    base = _apply_filters(base, filters)
+    rows, last_key = _fetch_page(db, base, page, limit, sort, after, field_types)
+    return [row[0] for row in rows], total, last_key
+
+
+def _raw_query(
+    dataset_id: str,
+    search: Optional[str],
+    filters: Optional[List[Filter]],
+    search_mode: SearchMode,
+    field_types: Optional[Dict[str, str]],
+):
+    return _filtered_query(
+        dataset_id,
+        search,
+        filters,
+        Record.id,
+        cast(Record.payload, Text),
+        search_mode=search_mode,
+        field_types=field_types,
+    )
+
+
+def list_records_raw(
+    db: Session,
+    dataset_id: str,
+    page: int,
+    limit: int,
+    search: Optional[str],
+    sort: Optional[str] = None,
+    filters: Optional[List[Filter]] = None,
+    after: Optional[Tuple[Any, int]] = None,
+    field_types: Optional[Dict[str, str]] = None,
+    search_mode: SearchMode = "substring",
+) -> Tuple[List[Tuple[int, str]], Optional[Tuple[Any, int]]]:
+    """
+    Same page as list_records, but as (id, payload::text) pairs: the JSON
+    text Postgres produces is returned undecoded (no dict, no ORM object),
+    for callers that splice it straight into a response.
+
+    Returns (rows, last_key); the total is left to count_records & co.
+    """
+    base = _raw_query(dataset_id, search, filters, search_mode, field_types)
+    rows, last_key = _fetch_page(db, base, page, limit, sort, after, field_types)
+    return [(row[0], row[1]) for row in rows], last_key
+
+
+def _page_statements(
+    base,
+    page: int,
+    sort: Optional[str],
+    after: Optional[Tuple[Any, int]],
+    field_types: Optional[Dict[str, str]],
+    limit: int,
+) -> List[Any]:
+    """
+    Sorted `base` (whose first column is the Record entity or Record.id)
+    with the sort key selected as the last column, so the next cursor holds
+    exactly the value Postgres compared on. One statement for an OFFSET
+    page, one per keyset phase for a cursor; each is run with LIMIT of the
+    rows still missing until the page is full.
+    """
+    field, _ = parse_sort(sort)
+    query = base.add_columns(_sort_key(field, field_types).label("sort_key"))
+    query = _apply_sort(query, sort, field_types)
+    if after is None:
+        return [query.offset((page - 1) * limit)]
+    return [query.where(predicate) for predicate in _keyset_phases(sort, after, field_types)]
+
+
+def _last_key(rows: List[Any], limit: int) -> Optional[Tuple[Any, int]]:
+    if len(rows) < limit:
+        return None
+    first, last_sort_key = rows[-1][0], rows[-1][-1]
+    return (last_sort_key, first if isinstance(first, int) else first.id)
+
+
+def _fetch_page(
+    db: Session,
+    base,
+    page: int,
+    limit: int,
+    sort: Optional[str],
+    after: Optional[Tuple[Any, int]],
+    field_types: Optional[Dict[str, str]],
+):
+    """Sort + paginate `base` (see _page_statements). Returns (rows, last_key)."""
+    rows: List[Any] = []
+    for stmt in _page_statements(base, page, sort, after, field_types, limit):
+        rows += db.execute(stmt.limit(limit - len(rows)), execution_options=CACHED).all()
+        if len(rows) == limit:
+            break
+    return rows, _last_key(rows, limit)
+
+
+def _count_statement(
+    dataset_id: str,
+    search: Optional[str],
+    filters: Optional[List[Filter]],
+    search_mode: SearchMode,
+    field_types: Optional[Dict[str, str]],
+):
+    base = _filtered_query(
+        dataset_id, search, filters, Record.id, search_mode=search_mode, field_types=field_types
+    )
+    return select(func.count()).select_from(base.subquery())
+
+
+def count_records(
+    db: Session,
+    dataset_id: str,
+    search: Optional[str],
+    filters: Optional[List[Filter]] = None,
+    search_mode: SearchMode = "substring",
+    field_types: Optional[Dict[str, str]] = None,
+) -> int:
+    """Exact number of records matching search + filters."""
+    stmt = _count_statement(dataset_id, search, filters, search_mode, field_types)
+    return db.scalar(stmt, execution_options=CACHED) or 0
+
+
+def _explain(stmt, dialect) -> Tuple[str, Any]:
+    compiled = stmt.compile(dialect=dialect)
+    return "EXPLAIN (FORMAT JSON) " + str(compiled), compiled.params
+
+
+def estimate_records(
+    db: Session,
+    dataset_id: str,
+    search: Optional[str],
+    filters: Optional[List[Filter]] = None,
+    search_mode: SearchMode = "substring",
+    field_types: Optional[Dict[str, str]] = None,
+) -> int:
+    """
+    Planner's row estimate for search + filters, from EXPLAIN. Costs a plan,
+    not a scan, but is only as good as the table statistics.
+    """
+    stmt = _filtered_query(
+        dataset_id, search, filters, Record.id, search_mode=search_mode, field_types=field_types
+    )
+    conn = db.connection()
+    plan = conn.exec_driver_sql(*_explain(stmt, conn.dialect)).scalar()
+    return int(plan[0]["Plan"]["Plan Rows"])
 
-    # Count after search + filters
-    count_query = select(func.count()).select_from(base.subquery())
-    total: int = db.scalar(count_query) or 0
 
-    # Sort + paginate
-    query = _apply_sort(base, sort)
-    query = (
-        query.offset((page - 1) * limit)
-        .limit(limit)
+def numeric_summary(
+    db: Session,
+    dataset_id: str,
+    field: str,
+    search: Optional[str],
+    filters: Optional[List[Filter]] = None,
+    search_mode: SearchMode = "substring",
+    field_types: Optional[Dict[str, str]] = None,
+) -> Dict[str, Any]:
+    """
+    count / non-null count / min / max / mean / p50 / p90 / p99 of a numeric
+    payload field over the records matching search + filters, in one scan.
+    Non-numeric values count as null.
+    """
+    x = payload_numeric(field)
+    sub = _filtered_query(
+        dataset_id,
+        search,
+        filters,
+        x.label("x"),
+        search_mode=search_mode,
+        field_types=field_types,
+    ).subquery()
+    col = sub.c.x
+    stmt = select(
+        func.count().label("count"),
+        func.count(col).label("non_null"),
+        func.min(col).label("min"),
+        func.max(col).label("max"),
+        func.avg(col).label("mean"),
+        func.percentile_cont(0.5).within_group(col).label("p50"),
+        func.percentile_cont(0.9).within_group(col).label("p90"),
+        func.percentile_cont(0.99).within_group(col).label("p99"),
     )
+    return dict(db.execute(stmt, execution_options=CACHED).mappings().one())
 
-    items = db.scalars(query).all()
-    return items, total
+
+def numeric_histogram(
+    db: Session,
+    dataset_id: str,
+    field: str,
+    lo: Decimal,
+    hi: Decimal,
+    bins: int,
+    search: Optional[str],
+    filters: Optional[List[Filter]] = None,
+    search_mode: SearchMode = "substring",
+    field_types: Optional[Dict[str, str]] = None,
+) -> Dict[int, int]:
+    """
+    Counts of a numeric field in `bins` equal-width buckets over [lo, hi],
+    keyed by 1-based bucket number (width_bucket puts x == hi into bins + 1;
+    it is folded into the last bucket). Empty buckets are absent.
+    """
+    x = payload_numeric(field)
+    sub = _filtered_query(
+        dataset_id,
+        search,
+        filters,
+        x.label("x"),
+        search_mode=search_mode,
+        field_types=field_types,
+    ).subquery()
+    bucket = func.least(func.width_bucket(sub.c.x, lo, hi, bins), bins).label("bucket")
+    stmt = (
+        select(bucket, func.count())
+        .where(sub.c.x.is_not(None))
+        .group_by(bucket)
+    )
+    return {b: n for b, n in db.execute(stmt, execution_options=CACHED)}
+
+
+def top_values(
+    db: Session,
+    dataset_id: str,
+    field: str,
+    k: int,
+    search: Optional[str],
+    filters: Optional[List[Filter]] = None,
+    search_mode: SearchMode = "substring",
+    field_types: Optional[Dict[str, str]] = None,
+) -> Tuple[Dict[str, int], List[Tuple[str, int]]]:
+    """
+    ({count, non_null, distinct}, [(value, count)] of the k most frequent
+    values) of payload->>'field' over the records matching search + filters.
+    """
+    v = payload_text(field)
+    sub = _filtered_query(
+        dataset_id,
+        search,
+        filters,
+        v.label("v"),
+        search_mode=search_mode,
+        field_types=field_types,
+    ).subquery()
+    totals = db.execute(
+        select(
+            func.count().label("count"),
+            func.count(sub.c.v).label("non_null"),
+            func.count(sub.c.v.distinct()).label("distinct"),
+        ),
+        execution_options=CACHED,
+    ).mappings().one()
+    n = func.count().label("n")
+    top = db.execute(
+        select(sub.c.v, n)
+        .where(sub.c.v.is_not(None))
+        .group_by(sub.c.v)
+        .order_by(n.desc(), sub.c.v)
+        .limit(k),
+        execution_options=CACHED,
+    ).all()
+    return dict(totals), [(value, count) for value, count in top]
+
+
+AggFn = Literal["count", "sum", "mean", "min", "max"]
+
+_AGG_FUNCS = {
+    "count": func.count,
+    "sum": func.sum,
+    "mean": func.avg,
+    "min": func.min,
+    "max": func.max,
+}
+
+
+def aggregate_records(
+    db: Session,
+    dataset_id: str,
+    group_by: List[str],
+    metrics: List[Tuple[AggFn, Optional[str]]],
+    search: Optional[str],
+    filters: Optional[List[Filter]] = None,
+    field_types: Optional[Dict[str, str]] = None,
+    search_mode: SearchMode = "substring",
+    limit: int = 1000,
+) -> List[Tuple[Any, ...]]:
+    """
+    One GROUP BY over the records matching search + filters.
+
+    group_by fields are typed by field_types like sort keys (numeric or
+    text); metrics are (function, field) pairs, with field None only for
+    count(*). Numeric aggregates read the guarded numeric expression, so
+    non-numeric values are ignored rather than failing the query.
+
+    Returns rows of (*group values, *metric values), ordered by the group
+    values (NULLs last), at most `limit` groups.
+    """
+    keys = [
+        payload_typed(name, (field_types or {}).get(name)).label(f"g{i}")
+        for i, name in enumerate(group_by)
+    ]
+    aggregates = []
+    for i, (fn, name) in enumerate(metrics):
+        if name is None:
+            expr = func.count()
+        elif fn == "count":
+            expr = func.count(payload_text(name))
+        else:
+            expr = _AGG_FUNCS[fn](payload_typed(name, (field_types or {}).get(name)))
+        aggregates.append(expr.label(f"m{i}"))
+
+    stmt = _filtered_query(
+        dataset_id,
+        search,
+        filters,
+        *keys,
+        *aggregates,
+        search_mode=search_mode,
+        field_types=field_types,
+    )
+    if keys:
+        stmt = stmt.group_by(*keys).order_by(*(k.asc().nulls_last() for k in keys))
+    return [tuple(row) for row in db.execute(stmt.limit(limit), execution_options=CACHED)]
 
 
 def get_record_by_id(
@@ -161,3 +578,97 @@ def get_record_by_id(
         Record.id == record_id,
     )
     return db.scalars(stmt).first()
+
+
+def project_payload(fields: List[str]):
+    """
+    Record.payload reduced to the given keys, in SQL (keys a payload lacks
+    stay absent). The key list is bound as one array parameter.
+    """
+    each = func.jsonb_each(Record.payload).table_valued("key", "value").alias("e")
+    return (
+        select(
+            func.coalesce(
+                func.jsonb_object_agg(each.c.key, each.c.value),
+                func.jsonb_build_object(),
+                type_=JSONB,
+            )
+        )
+        .where(each.c.key == any_(literal(fields, ARRAY(Text))))
+        .scalar_subquery()
+    )
+
+
+def get_records_by_ids(
+    db: Session,
+    dataset_id: str,
+    record_ids: List[int],
+    fields: Optional[List[str]] = None,
+) -> List[Tuple[int, dict]]:
+    """
+    (id, payload) of the dataset's records among record_ids, in one
+    primary-key lookup (id = ANY(:ids)); payloads projected to `fields`
+    when given. Unknown ids are skipped; rows come in id order.
+    """
+    payload = Record.payload if fields is None else project_payload(fields)
+    stmt = (
+        select(Record.id, payload)
+        .where(
+            Record.dataset_id == dataset_id,
+            Record.id == any_(literal(record_ids, ARRAY(Record.id.type))),
+        )
+        .order_by(Record.id)
+    )
+    return [tuple(row) for row in db.execute(stmt)]
+
+
+# ---- Async (DB_ASYNC request path), same statements ---- #
+
+async def list_records_raw_async(
+    db: AsyncSession,
+    dataset_id: str,
+    page: int,
+    limit: int,
+    search: Optional[str],
+    sort: Optional[str] = None,
+    filters: Optional[List[Filter]] = None,
+    after: Optional[Tuple[Any, int]] = None,
+    field_types: Optional[Dict[str, str]] = None,
+    search_mode: SearchMode = "substring",
+) -> Tuple[List[Tuple[int, str]], Optional[Tuple[Any, int]]]:
+    base = _raw_query(dataset_id, search, filters, search_mode, field_types)
+    rows: List[Any] = []
+    for stmt in _page_statements(base, page, sort, after, field_types, limit):
+        result = await db.execute(stmt.limit(limit - len(rows)), execution_options=CACHED)
+        rows += result.all()
+        if len(rows) == limit:
+            break
+    return [(row[0], row[1]) for row in rows], _last_key(rows, limit)
+
+
+async def count_records_async(
+    db: AsyncSession,
+    dataset_id: str,
+    search: Optional[str],
+    filters: Optional[List[Filter]] = None,
+    search_mode: SearchMode = "substring",
+    field_types: Optional[Dict[str, str]] = None,
+) -> int:
+    stmt = _count_statement(dataset_id, search, filters, search_mode, field_types)
+    return await db.scalar(stmt, execution_options=CACHED) or 0
+
+
+async def estimate_records_async(
+    db: AsyncSession,
+    dataset_id: str,
+    search: Optional[str],
+    filters: Optional[List[Filter]] = None,
+    search_mode: SearchMode = "substring",
+    field_types: Optional[Dict[str, str]] = None,
+) -> int:
+    stmt = _filtered_query(
+        dataset_id, search, filters, Record.id, search_mode=search_mode, field_types=field_types
+    )
+    conn = await db.connection()
+    plan = (await conn.exec_driver_sql(*_explain(stmt, conn.dialect))).scalar()
+    return int(plan[0]["Plan"]["Plan Rows"])
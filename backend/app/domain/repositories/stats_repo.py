@@ -0,0 +1,67 @@
+from typing import Any, Dict, List
+
+from sqlalchemy import delete, func, insert, select, text
+from sqlalchemy.orm import Session
+
+from app.db.models import DatasetField, Record
+
+
+# One pass over a dataset's records: every top-level (key, value) pair of
+# each payload, aggregated per key. Postgres spills the GROUP BY and
+# count(DISTINCT) sorts to disk, so memory stays bounded by work_mem
+# whatever the dataset size.
+_FIELD_STATS = text(
+    """
+    SELECT e.key AS name,
+           count(*) FILTER (WHERE jsonb_typeof(e.value) <> 'null') AS non_null,
+           count(DISTINCT e.value) FILTER (WHERE jsonb_typeof(e.value) <> 'null')
+               AS distinct_count,
+           count(*) FILTER (WHERE jsonb_typeof(e.value) = 'number') AS numbers,
+           count(*) FILTER (WHERE jsonb_typeof(e.value) = 'string') AS strings,
+           count(*) FILTER (WHERE jsonb_typeof(e.value) = 'boolean') AS booleans,
+           min(r.id) FILTER (WHERE jsonb_typeof(e.value) <> 'null') AS example_id
+    FROM records r
+    CROSS JOIN LATERAL jsonb_each(r.payload) AS e
+    WHERE r.dataset_id = :dataset_id
+      AND jsonb_typeof(r.payload) = 'object'
+    GROUP BY e.key
+    ORDER BY e.key
+    """
+)
+
+
+def count_dataset_records(db: Session, dataset_id: str) -> int:
+    stmt = select(func.count()).select_from(Record).where(Record.dataset_id == dataset_id)
+    return db.scalar(stmt) or 0
+
+
+def aggregate_field_stats(db: Session, dataset_id: str) -> List[Dict[str, Any]]:
+    """Per-key counts over all payloads of a dataset (see _FIELD_STATS)."""
+    rows = db.execute(_FIELD_STATS, {"dataset_id": dataset_id}).mappings()
+    return [dict(row) for row in rows]
+
+
+def get_example_values(
+    db: Session, dataset_id: str, examples: Dict[str, int]
+) -> Dict[str, Any]:
+    """field name -> payload[field] of the given record id of the dataset."""
+    if not examples:
+        return {}
+    stmt = text(
+        "SELECT f.name, r.payload -> f.name "
+        "FROM unnest(CAST(:names AS text[]), CAST(:ids AS bigint[])) AS f(name, id) "
+        "JOIN records r ON r.dataset_id = :dataset_id AND r.id = f.id"
+    )
+    rows = db.execute(
+        stmt,
+        {"dataset_id": dataset_id, "names": list(examples), "ids": list(examples.values())},
+    )
+    return {name: value for name, value in rows}
+
+
+def replace_dataset_fields(
+    db: Session, dataset_id: str, fields: List[Dict[str, Any]]
+) -> None:
+    db.execute(delete(DatasetField).where(DatasetField.dataset_id == dataset_id))
+    if fields:
+        db.execute(insert(DatasetField), [{"dataset_id": dataset_id, **f} for f in fields])
@@ -0,0 +1,46 @@
+from typing import List, Optional
+
+from pydantic import BaseModel, ConfigDict
+
+
+class PayloadIndex(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    name: str
+    field: str
+    kind: str
+    ddl: str
+
+
+class IndexPlan(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    dataset_id: str
+    create: List[PayloadIndex]
+    keep: List[str]
+    drop: List[str]
+    # Existing but INVALID indexes (a concurrent build failed); rebuilt on apply
+    rebuild: List[str]
+
+
+class IndexRequest(BaseModel):
+    # Fields to index regardless of their stats
+    hot_fields: List[str] = []
+    # Also drop managed indexes that are no longer wanted
+    drop_stale: bool = False
+
+
+class PoolMetrics(BaseModel):
+    pool: str
+    # Counts at the time of the request (QueuePool-based pools only)
+    size: Optional[int] = None
+    checked_out: Optional[int] = None
+    idle: Optional[int] = None
+    overflow: Optional[int] = None
+    max_overflow: Optional[int] = None
+    # Checkout waits since startup
+    checkouts: int = 0
+    timeouts: int = 0
+    wait_ms_avg: float = 0.0
+    wait_ms_p95: float = 0.0
+    wait_ms_max: float = 0.0
@@ -1,7 +1,13 @@
 from datetime import datetime
-from typing import List, Optional
+from typing import List, Literal, Optional
 
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field
+
+from app.domain.schemas.record import RecordSummary
+
+
+# Most bookmarks one bulk create / delete may carry
+MAX_BULK_BOOKMARKS = 1000
 
 
 class Bookmark(BaseModel):
@@ -15,6 +21,11 @@ class Bookmark(BaseModel):
     created_at: datetime
 
 
+class BookmarkWithRecord(Bookmark):
+    # the bookmarked record, with include=record (payload possibly projected)
+    record: Optional[RecordSummary] = None
+
+
 class BookmarkCreate(BaseModel):
     dataset_id: str
     record_id: int
@@ -22,7 +33,40 @@ class BookmarkCreate(BaseModel):
 
 
 class PaginatedBookmarks(BaseModel):
-    items: List[Bookmark]
+    items: List[BookmarkWithRecord]
     page: int
     limit: int
     total: int
+
+
+class BookmarkBulkCreate(BaseModel):
+    items: List[BookmarkCreate] = Field(..., min_length=1, max_length=MAX_BULK_BOOKMARKS)
+    # existing bookmark of the same record: overwrite its note, or keep it
+    on_conflict: Literal["update", "ignore"] = "update"
+
+
+class BookmarkBulkItem(BaseModel):
+    record_id: int
+    # not_found: no such record in the given dataset
+    status: Literal["created", "updated", "exists", "not_found"]
+    # the stored bookmark (None for exists with on_conflict=ignore, not_found)
+    bookmark: Optional[Bookmark] = None
+
+
+class BookmarkBulkResult(BaseModel):
+    # one per request item, in request order
+    items: List[BookmarkBulkItem]
+
+
+class BookmarkBulkDelete(BaseModel):
+    ids: List[int] = Field(..., min_length=1, max_length=MAX_BULK_BOOKMARKS)
+
+
+class BookmarkDeleteItem(BaseModel):
+    id: int
+    # False when the user has no bookmark with this id
+    deleted: bool
+
+
+class BookmarkBulkDeleteResult(BaseModel):
+    items: List[BookmarkDeleteItem]
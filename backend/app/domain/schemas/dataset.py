@@ -42,3 +42,33 @@ class DatasetDetail(BaseModel):
     row_count: int
     updated_at: datetime
     fields: List[DatasetFieldSummary]
+
+
+class HistogramBin(BaseModel):
+    lower: float
+    upper: float
+    count: int
+
+
+class TopValue(BaseModel):
+    value: str
+    count: int
+
+
+class FieldHistogram(BaseModel):
+    field: str
+    type: str
+    # records matching search + filters, and those with a value for the field
+    count: int
+    non_null: int
+    # numeric fields only
+    min: Optional[float] = None
+    max: Optional[float] = None
+    mean: Optional[float] = None
+    p50: Optional[float] = None
+    p90: Optional[float] = None
+    p99: Optional[float] = None
+    bins: List[HistogramBin] = []
+    # non-numeric fields only
+    distinct_count: Optional[int] = None
+    top_values: List[TopValue] = []
@@ -1,14 +1,34 @@
 # app/domain/schemas/filters.py
 
 from dataclasses import dataclass
-from typing import Literal, Any
+from typing import Literal, Any, List, Optional, Union
 
 
-Op = Literal["eq", "ne", "lt", "gt", "le", "ge", "like"]
+Op = Literal[
+    "eq", "ne", "lt", "gt", "le", "ge", "like", "in", "nin", "between", "isnull"
+]
+
+# ops whose value is a list of values ("a|b|c")
+LIST_OPS = ("in", "nin", "between")
 
 
 @dataclass
 class FilterClause:
     name: str
     op: Op
+    # in/nin/between: list of values; isnull: bool
     value: Any
+    # value exactly as written in the filter string, before number parsing
+    # (a list of the written values for in/nin/between)
+    raw: Optional[Union[str, List[str]]] = None
+
+
+@dataclass
+class FilterGroup:
+    """Filters combined with AND / OR; a filter list itself is an AND."""
+
+    op: Literal["and", "or"]
+    clauses: List["Filter"]
+
+
+Filter = Union[FilterClause, FilterGroup]
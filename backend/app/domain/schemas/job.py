@@ -0,0 +1,23 @@
+from datetime import datetime
+from typing import List, Optional
+
+from pydantic import BaseModel, ConfigDict
+
+
+class Job(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: str
+    kind: str
+    dataset_id: Optional[str] = None
+    # queued | running | succeeded | failed
+    status: str
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+
+class StatsRefreshRequest(BaseModel):
+    # Datasets to refresh; empty => all datasets
+    dataset_ids: List[str] = []
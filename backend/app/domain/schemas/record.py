@@ -1,6 +1,10 @@
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field
+
+
+# Most record ids one batch fetch may ask for
+MAX_BATCH_IDS = 5000
 
 
 class RecordSummary(BaseModel):
@@ -15,6 +19,10 @@ class PaginatedRecords(BaseModel):
     page: int
     limit: int
     total: int
+    # True when total is a planner estimate / Dataset.row_count (count_mode=estimated)
+    total_estimated: bool = False
+    # Opaque keyset cursor for the page after this one (None on the last page)
+    next_cursor: Optional[str] = None
 
 
 class RecordDetail(BaseModel):
@@ -23,3 +31,36 @@ class RecordDetail(BaseModel):
     id: int
     dataset_id: str
     payload: Dict[str, Any]
+
+
+class RecordBatchRequest(BaseModel):
+    ids: List[int] = Field(..., min_length=1, max_length=MAX_BATCH_IDS)
+    # payload fields to return (all when omitted)
+    fields: Optional[List[str]] = None
+
+
+class RecordBatch(BaseModel):
+    # found records, in request order (duplicates once)
+    items: List[RecordSummary]
+    # requested ids that are not records of the dataset
+    missing: List[int]
+
+
+class IngestResult(BaseModel):
+    dataset_id: str
+    rows_ingested: int
+
+
+class AggregateGroup(BaseModel):
+    # group_by field -> value of this group
+    key: Dict[str, Any]
+    # metric spec (e.g. "mean:value", "count") -> aggregate
+    values: Dict[str, Any]
+
+
+class AggregateResult(BaseModel):
+    group_by: List[str]
+    metrics: List[str]
+    groups: List[AggregateGroup]
+    # True when there were more groups than the limit
+    truncated: bool = False
@@ -0,0 +1,123 @@
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy.orm import Session
+
+from app.domain.repositories.dataset_repo import (
+    get_field_types as repo_get_field_types,
+)
+from app.domain.repositories.record_repo import (
+    AggFn,
+    SearchMode,
+    aggregate_records as repo_aggregate_records,
+)
+from app.domain.services.record_service import parse_filters
+
+
+AGG_FUNCS = ("count", "sum", "mean", "min", "max")
+# functions that only make sense on number fields
+NUMERIC_ONLY = ("sum", "mean")
+
+MAX_GROUP_BY = 5
+MAX_METRICS = 20
+
+
+def _bad_request(detail: str) -> HTTPException:
+    return HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=detail)
+
+
+def _split(value: Optional[str]) -> List[str]:
+    return [part.strip() for part in (value or "").split(",") if part.strip()]
+
+
+def parse_metrics(
+    metrics_str: Optional[str], field_types: Dict[str, str]
+) -> List[Tuple[str, AggFn, Optional[str]]]:
+    """
+    "count,mean:value,max:pvalue" -> [(spec, fn, field)]; a bare "count"
+    counts rows. Defaults to count.
+    """
+    parsed: List[Tuple[str, AggFn, Optional[str]]] = []
+    for spec in _split(metrics_str) or ["count"]:
+        fn, _, field = spec.partition(":")
+        if fn not in AGG_FUNCS:
+            raise _bad_request(
+                f"Unknown aggregate '{fn}' in '{spec}' (use {', '.join(AGG_FUNCS)})"
+            )
+        if not field:
+            if fn != "count":
+                raise _bad_request(f"Aggregate '{spec}' needs a field, e.g. '{fn}:value'")
+            parsed.append((spec, fn, None))
+            continue
+        if field not in field_types:
+            raise _bad_request(f"Unknown field '{field}' in '{spec}'")
+        if fn in NUMERIC_ONLY and field_types[field] != "number":
+            raise _bad_request(f"'{fn}' needs a number field, '{field}' is {field_types[field]}")
+        parsed.append((spec, fn, field))
+
+    if len(parsed) > MAX_METRICS:
+        raise _bad_request(f"At most {MAX_METRICS} aggregates per request")
+    return parsed
+
+
+def _json_value(value: Any) -> Any:
+    if isinstance(value, Decimal):
+        return int(value) if value == value.to_integral_value() else float(value)
+    return value
+
+
+def aggregate_records(
+    db: Session,
+    dataset_id: str,
+    group_by_str: Optional[str],
+    metrics_str: Optional[str],
+    search: Optional[str],
+    filter_str: Optional[str],
+    search_mode: SearchMode = "substring",
+    limit: int = 1000,
+) -> Dict[str, Any]:
+    """
+    Group the records matching search + filters by payload fields and
+    aggregate other fields per group, e.g. group_by="condition" with
+    metrics="count,mean:value". Compiled to a single GROUP BY query.
+    """
+    field_types = repo_get_field_types(db, dataset_id)
+    group_by = _split(group_by_str)
+    for name in group_by:
+        if name not in field_types:
+            raise _bad_request(f"Unknown group_by field '{name}'")
+    if len(group_by) > MAX_GROUP_BY or len(set(group_by)) != len(group_by):
+        raise _bad_request(f"group_by takes up to {MAX_GROUP_BY} distinct fields")
+
+    metrics = parse_metrics(metrics_str, field_types)
+    filters = parse_filters(filter_str, field_types)
+
+    rows = repo_aggregate_records(
+        db,
+        dataset_id,
+        group_by,
+        [(fn, field) for _, fn, field in metrics],
+        search,
+        filters=filters,
+        field_types=field_types,
+        search_mode=search_mode,
+        limit=limit + 1,
+    )
+
+    n_keys = len(group_by)
+    groups = [
+        {
+            "key": {name: _json_value(v) for name, v in zip(group_by, row[:n_keys])},
+            "values": {
+                spec: _json_value(v) for (spec, _, _), v in zip(metrics, row[n_keys:])
+            },
+        }
+        for row in rows[:limit]
+    ]
+    return {
+        "group_by": group_by,
+        "metrics": [spec for spec, _, _ in metrics],
+        "groups": groups,
+        "truncated": len(rows) > limit,
+    }
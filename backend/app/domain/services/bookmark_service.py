@@ -1,14 +1,21 @@
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Tuple
 
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from fastapi import HTTPException, status
 
-from app.db.models import Bookmark
-from app.domain.schemas.bookmark import BookmarkCreate
+from app.domain.schemas.bookmark import (
+    Bookmark as BookmarkSchema,
+    BookmarkBulkCreate,
+    BookmarkCreate,
+)
 from app.domain.repositories.bookmark_repo import (
     list_bookmarks_for_user as repo_list_bookmarks_for_user,
+    list_bookmarks_for_user_async as repo_list_bookmarks_for_user_async,
     get_bookmark_by_id as repo_get_bookmark_by_id,
-    get_bookmark_by_user_and_record as repo_get_bookmark_by_user_and_record,
+    get_bookmarks_by_records as repo_get_bookmarks_by_records,
+    upsert_bookmarks as repo_upsert_bookmarks,
+    delete_bookmarks as repo_delete_bookmarks,
 )
 
 
@@ -18,14 +25,62 @@ def list_bookmarks(
     dataset_id: Optional[str],
     page: int,
     limit: int,
+    include_record: bool = False,
+    fields: Optional[List[str]] = None,
 ) -> Dict[str, Any]:
+    """
+    include_record adds each bookmark's record ({id, payload}, the payload
+    projected to `fields` when given), loaded by the listing query itself.
+    """
     items, total = repo_list_bookmarks_for_user(
         db=db,
         user_id=user_id,
         dataset_id=dataset_id,
         page=page,
         limit=limit,
+        include_record=include_record,
+        fields=fields,
     )
+    return _bookmark_page(items, total, page, limit, include_record)
+
+
+async def list_bookmarks_async(
+    db: AsyncSession,
+    user_id: str,
+    dataset_id: Optional[str],
+    page: int,
+    limit: int,
+    include_record: bool = False,
+    fields: Optional[List[str]] = None,
+) -> Dict[str, Any]:
+    """list_bookmarks on the async engine."""
+    items, total = await repo_list_bookmarks_for_user_async(
+        db=db,
+        user_id=user_id,
+        dataset_id=dataset_id,
+        page=page,
+        limit=limit,
+        include_record=include_record,
+        fields=fields,
+    )
+    return _bookmark_page(items, total, page, limit, include_record)
+
+
+def _bookmark_page(
+    items: List[Any], total: int, page: int, limit: int, include_record: bool
+) -> Dict[str, Any]:
+    # plain dicts: validating the ORM rows against BookmarkWithRecord would
+    # lazy-load Bookmark.record one by one
+    if include_record:
+        items = [
+            {
+                **BookmarkSchema.model_validate(bm).model_dump(),
+                "record": {"id": bm.record_id, "payload": payload},
+            }
+            for bm, payload in items
+        ]
+    else:
+        items = [BookmarkSchema.model_validate(bm).model_dump() for bm in items]
     return {
         "items": items,
         "page": page,
@@ -34,35 +89,82 @@ def list_bookmarks(
     }
 
 
+def _upsert(
+    db: Session,
+    user_id: str,
+    items: List[BookmarkCreate],
+    update: bool,
+) -> Dict[int, Tuple[str, Optional[BookmarkSchema]]]:
+    """
+    Write bookmarks with one INSERT ... ON CONFLICT and commit. Returns
+    record_id -> (status, bookmark) for every distinct record.
+
+    Entries the insert did not return are either existing bookmarks (only
+    possible without update) or records missing from their dataset; those
+    are told apart by one lookup, needed only when there are any.
+    """
+    # ON CONFLICT cannot touch a row twice: one entry per record, last wins
+    entries = {item.record_id: (item.dataset_id, item.record_id, item.note or "") for item in items}
+    results: Dict[int, Tuple[str, Optional[BookmarkSchema]]] = {}
+    for bm, inserted in repo_upsert_bookmarks(db, user_id, list(entries.values()), update):
+        status_ = "created" if inserted else "updated"
+        results[bm.record_id] = (status_, BookmarkSchema.model_validate(bm))
+
+    leftover = [record_id for record_id in entries if record_id not in results]
+    if leftover and not update:
+        for bm in repo_get_bookmarks_by_records(db, user_id, leftover):
+            results[bm.record_id] = ("exists", BookmarkSchema.model_validate(bm))
+    db.commit()
+
+    for record_id in leftover:
+        results.setdefault(record_id, ("not_found", None))
+    return results
+
+
 def create_bookmark(
     db: Session,
     user_id: str,
     payload: BookmarkCreate,
-) -> Bookmark:
-    # Enforce uniqueness per (user, record)
-    existing = repo_get_bookmark_by_user_and_record(
-        db=db,
-        user_id=user_id,
-        record_id=payload.record_id,
-    )
-    if existing:
+) -> BookmarkSchema:
+    # Uniqueness per (user, record) is enforced by the insert itself
+    # (ON CONFLICT DO NOTHING), so concurrent creates cannot race
+    status_, bm = _upsert(db, user_id, [payload], update=False)[payload.record_id]
+    if status_ == "exists":
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
             detail="Bookmark already exists for this record",
         )
-
-    bm = Bookmark(
-        user_id=user_id,
-        dataset_id=payload.dataset_id,
-        record_id=payload.record_id,
-        note=payload.note or "",
-    )
-    db.add(bm)
-    db.commit()
-    db.refresh(bm)
+    if status_ == "not_found":
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Record {payload.record_id} not found in dataset {payload.dataset_id}",
+        )
     return bm
 
 
+def create_bookmarks(
+    db: Session,
+    user_id: str,
+    payload: BookmarkBulkCreate,
+) -> Dict[str, Any]:
+    """
+    Create many bookmarks in one statement. Existing bookmarks of the same
+    records get the new note (on_conflict="update") or are left as they
+    are (on_conflict="ignore"). One result per request item.
+    """
+    results = _upsert(db, user_id, payload.items, update=payload.on_conflict == "update")
+    return {
+        "items": [
+            {
+                "record_id": item.record_id,
+                "status": results[item.record_id][0],
+                "bookmark": results[item.record_id][1],
+            }
+            for item in payload.items
+        ]
+    }
+
+
 def delete_bookmark(
     db: Session,
     user_id: str,
@@ -76,3 +178,19 @@ def delete_bookmark(
         )
     db.delete(bm)
     db.commit()
+
+
+def delete_bookmarks(
+    db: Session,
+    user_id: str,
+    bookmark_ids: List[int],
+) -> Dict[str, Any]:
+    """Delete many of the user's bookmarks in one statement."""
+    deleted = set(repo_delete_bookmarks(db, user_id, bookmark_ids))
+    db.commit()
+    return {
+        "items": [
+            {"id": bookmark_id, "deleted": bookmark_id in deleted}
+            for bookmark_id in bookmark_ids
+        ]
+    }
@@ -0,0 +1,377 @@
+"""
+In-process columnar cache of hot datasets (opt-in: COLUMNAR_CACHE_ENABLED).
+
+A cached dataset is held as NumPy arrays: the record ids, the encoded
+payloads, and per DatasetField a value-kind code, a float64 column and a
+text column. Filters and sorts of a records listing are then evaluated as
+vector operations over those arrays, and only the rows of the requested
+page are decoded.
+
+Semantics follow the SQL path in record_repo (eq/ne containment
+candidates, numeric ranges that never match non-numbers, NULLS LAST for
+ascending sorts, id as tie-breaker), so a cursor issued by either path
+continues on the other.
+
+Entries are built by one request at a time, invalidated when
+Dataset.updated_at changes and evicted LRU under a byte budget.
+list_records returns None whenever the request has to go to SQL instead:
+search, a filter/sort on a field without stats, a LIKE pattern with
+wildcards, a range filter or sort comparing text (both in the database
+collation), or a dataset above the row limit.
+"""
+
+import json
+import math
+import threading
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from numpy.dtypes import StringDType
+from sqlalchemy.orm import Session
+
+from app.core.cache import LRUCache
+from app.core.config import settings
+from app.domain.repositories.dataset_repo import (
+    get_dataset as repo_get_dataset,
+    get_field_types as repo_get_field_types,
+)
+from app.domain.repositories.filter_compiler import eq_candidates, numeric_range
+from app.domain.repositories.record_repo import (
+    iter_all_records as repo_iter_all_records,
+    parse_sort,
+)
+from app.domain.schemas.filters import Filter, FilterClause, FilterGroup
+
+
+# value kinds, per row and field
+MISSING, STRING, NUMBER, BOOLEAN, OTHER = range(5)
+
+BUILD_BATCH_SIZE = 10_000
+
+
+@dataclass
+class Column:
+    kind: np.ndarray  # int8, one of the kinds above
+    num: np.ndarray  # float64, NaN unless kind == NUMBER
+    text: np.ndarray  # StringDType, payload->>'field' ("" when MISSING)
+    # lower-cased text, for case-insensitive LIKE
+    folded: np.ndarray
+
+    @property
+    def nbytes(self) -> int:
+        text_heap = int(np.strings.str_len(self.text).sum()) * 2
+        return (
+            self.kind.nbytes
+            + self.num.nbytes
+            + self.text.nbytes
+            + self.folded.nbytes
+            + text_heap
+        )
+
+
+@dataclass
+class ColumnarDataset:
+    updated_at: datetime
+    field_types: Dict[str, str]
+    ids: np.ndarray  # int64, ascending
+    payloads: np.ndarray  # object array of JSON-encoded bytes
+    columns: Dict[str, Column]
+    nbytes: int = 0
+
+
+# dataset_id -> ColumnarDataset
+_cache = LRUCache(
+    maxsize=1024,
+    max_weight=settings.columnar_cache_max_bytes,
+    weigh=lambda entry: entry.nbytes,
+)
+
+# dataset_id -> lock held while building it, so concurrent misses on a
+# dataset wait for one build instead of each scanning it
+_build_locks: Dict[str, threading.Lock] = defaultdict(threading.Lock)
+_build_locks_guard = threading.Lock()
+
+
+# ---- Building ---- #
+
+def _text_of(value: Any) -> str:
+    """Python equivalent of payload->>'field' for a non-null value."""
+    if isinstance(value, str):
+        return value
+    return json.dumps(value)
+
+
+def _build_column(values: List[Any]) -> Column:
+    n = len(values)
+    kind = np.zeros(n, dtype=np.int8)
+    num = np.full(n, np.nan)
+    texts = [""] * n
+
+    for i, v in enumerate(values):
+        if v is None:
+            continue
+        if isinstance(v, bool):
+            kind[i] = BOOLEAN
+        elif isinstance(v, (int, float)):
+            kind[i] = NUMBER
+            num[i] = v
+        elif isinstance(v, str):
+            kind[i] = STRING
+        else:
+            kind[i] = OTHER
+        texts[i] = _text_of(v)
+
+    text = np.array(texts, dtype=StringDType())
+    return Column(kind=kind, num=num, text=text, folded=np.strings.lower(text))
+
+
+def build_dataset(
+    db: Session,
+    dataset_id: str,
+    updated_at: datetime,
+    max_rows: int,
+) -> Optional[ColumnarDataset]:
+    """
+    Materialize a dataset from a streamed scan. Returns None if it has more
+    than max_rows records.
+    """
+    field_types = repo_get_field_types(db, dataset_id)
+    names = sorted(field_types)
+
+    ids: List[int] = []
+    payloads: List[bytes] = []
+    values: Dict[str, List[Any]] = {name: [] for name in names}
+
+    for batch in repo_iter_all_records(
+        db, dataset_id, None, None, batch_size=BUILD_BATCH_SIZE
+    ):
+        if len(ids) + len(batch) > max_rows:
+            return None
+        for record_id, payload in batch:
+            ids.append(record_id)
+            payloads.append(json.dumps(payload).encode())
+            get = payload.get if isinstance(payload, dict) else {}.get
+            for name in names:
+                values[name].append(get(name))
+
+    columns = {name: _build_column(values.pop(name)) for name in names}
+    entry = ColumnarDataset(
+        updated_at=updated_at,
+        field_types=field_types,
+        ids=np.array(ids, dtype=np.int64),
+        payloads=np.array(payloads, dtype=object),
+        columns=columns,
+    )
+    entry.nbytes = (
+        entry.ids.nbytes
+        + entry.payloads.nbytes
+        + sum(len(p) for p in payloads)
+        + sum(c.nbytes for c in columns.values())
+    )
+    return entry
+
+
+def get_dataset_columns(db: Session, dataset_id: str) -> Optional[ColumnarDataset]:
+    """Cached columns of a dataset, (re)built if missing or stale."""
+    dataset = repo_get_dataset(db, dataset_id)
+    if dataset is None or dataset.row_count > settings.columnar_cache_max_rows:
+        return None
+
+    entry = _cache.get(dataset_id)
+    if entry is not None and entry.updated_at == dataset.updated_at:
+        return entry
+
+    with _build_locks_guard:
+        lock = _build_locks[dataset_id]
+    with lock:
+        # built by the request we waited for
+        entry = _cache.get(dataset_id)
+        if entry is not None and entry.updated_at == dataset.updated_at:
+            return entry
+
+        entry = build_dataset(
+            db, dataset_id, dataset.updated_at, settings.columnar_cache_max_rows
+        )
+        if entry is None:
+            _cache.pop(dataset_id)
+            return None
+        _cache.set(dataset_id, entry)
+        return entry
+
+
+# ---- Querying ---- #
+
+class Unsupported(Exception):
+    """The request needs the SQL path."""
+
+
+def _eq_mask(col: Column, f: FilterClause) -> np.ndarray:
+    mask = np.zeros(len(col.kind), dtype=bool)
+    for candidate in eq_candidates(f):
+        if isinstance(candidate, bool):
+            mask |= (col.kind == BOOLEAN) & (col.text == ("true" if candidate else "false"))
+        elif isinstance(candidate, (int, float)):
+            mask |= (col.kind == NUMBER) & (col.num == float(candidate))
+        else:
+            mask |= (col.kind == STRING) & (col.text == candidate)
+    return mask
+
+
+def _in_mask(col: Column, f: FilterClause, field_type: Optional[str]) -> np.ndarray:
+    if field_type == "number":
+        return (col.kind == NUMBER) & np.isin(col.num, [float(v) for v in f.value])
+    if np.any((col.kind == NUMBER) | (col.kind == OTHER)):
+        # payload->>'field' of numbers/objects is Postgres' rendering
+        raise Unsupported(f.name)
+    raw = f.raw if isinstance(f.raw, list) else [str(v) for v in f.value]
+    return (col.kind != MISSING) & np.isin(col.text, raw)
+
+
+def _clause_mask(entry: ColumnarDataset, f: FilterClause) -> Optional[np.ndarray]:
+    """Rows matching one clause; None for operators the SQL path ignores."""
+    if f.op not in (
+        "like", "eq", "ne", "gt", "ge", "lt", "le", "in", "nin", "between", "isnull"
+    ):
+        return None
+    col = entry.columns.get(f.name)
+    if col is None:
+        raise Unsupported(f.name)
+    field_type = entry.field_types.get(f.name)
+
+    if f.op == "like":
+        pattern = str(f.value)
+        if any(c in pattern for c in "%_\\"):
+            raise Unsupported(pattern)
+        return (col.kind != MISSING) & (
+            np.strings.find(col.folded, pattern.lower()) >= 0
+        )
+    if f.op == "eq":
+        return _eq_mask(col, f)
+    if f.op == "ne":
+        return ~_eq_mask(col, f)
+    if f.op == "in":
+        return _in_mask(col, f, field_type)
+    if f.op == "nin":
+        return ~_in_mask(col, f, field_type)
+    if f.op == "isnull":
+        return (col.kind == MISSING) if f.value else (col.kind != MISSING)
+
+    if not numeric_range(f, field_type):
+        # text comparison, in the database collation
+        raise Unsupported(f.name)
+    if f.op == "between":
+        lo, hi = (float(v) for v in f.value)
+        return (col.num >= lo) & (col.num <= hi)
+    v = float(f.value)
+    return {
+        "gt": col.num > v,
+        "ge": col.num >= v,
+        "lt": col.num < v,
+        "le": col.num <= v,
+    }[f.op]
+
+
+def _mask(entry: ColumnarDataset, f: Filter) -> Optional[np.ndarray]:
+    if not isinstance(f, FilterGroup):
+        return _clause_mask(entry, f)
+    masks = [m for m in (_mask(entry, c) for c in f.clauses) if m is not None]
+    if not masks:
+        return None
+    combine = np.logical_or if f.op == "or" else np.logical_and
+    return combine.reduce(masks)
+
+
+def _filter_mask(entry: ColumnarDataset, filters: List[Filter]) -> np.ndarray:
+    mask = np.ones(len(entry.ids), dtype=bool)
+    for f in filters:
+        m = _mask(entry, f)
+        if m is not None:
+            mask &= m
+    return mask
+
+
+def _ordered(entry: ColumnarDataset, rows: np.ndarray, sort: Optional[str]):
+    """
+    rows (indexes into the entry) in sort order, plus a function giving the
+    SQL sort key of a row for cursors.
+    """
+    field, asc = parse_sort(sort)
+    ids = entry.ids[rows]
+
+    if field is None:
+        order = rows if asc else rows[::-1]
+        return order, lambda i: int(entry.ids[i])
+
+    col = entry.columns.get(field)
+    if col is None or entry.field_types.get(field) != "number":
+        # text sorts follow the database collation
+        raise Unsupported(field)
+
+    key = col.num[rows]
+    nulls = np.isnan(key)
+
+    def sort_key(i: int) -> Any:
+        v = col.num[i]
+        return None if math.isnan(v) else Decimal(repr(float(v)))
+
+    # ascending, NULLS LAST, id tie-breaker; DESC is exactly the reverse
+    order = rows[np.lexsort((ids, key, nulls))]
+    return (order if asc else order[::-1]), sort_key
+
+
+def list_records(
+    db: Session,
+    dataset_id: str,
+    page: int,
+    limit: int,
+    search: Optional[str],
+    sort: Optional[str],
+    filters: List[Filter],
+    after: Optional[Tuple[Any, int]] = None,
+) -> Optional[Tuple[List[Tuple[int, str]], int, Optional[Tuple[Any, int]]]]:
+    """
+    Serve a records listing from the columnar cache.
+
+    Returns (rows, total, last_key), rows being (id, payload JSON text)
+    pairs like record_repo.list_records_raw (total is always exact), or
+    None when the request has to be answered by SQL.
+    """
+    if search:
+        return None
+    entry = get_dataset_columns(db, dataset_id)
+    if entry is None:
+        return None
+
+    try:
+        rows = np.flatnonzero(_filter_mask(entry, filters))
+        order, sort_key = _ordered(entry, rows, sort)
+    except Unsupported:
+        return None
+
+    if after is None:
+        start = (page - 1) * limit
+    else:
+        # the cursor row is in the result unless the data changed, which
+        # also changes updated_at; resolve anything else in SQL
+        hits = np.flatnonzero(entry.ids[order] == after[1])
+        if len(hits) == 0:
+            return None
+        start = int(hits[0]) + 1
+
+    page_rows = order[start:start + limit]
+    items = [(int(entry.ids[i]), entry.payloads[i].decode()) for i in page_rows]
+
+    last_key: Optional[Tuple[Any, int]] = None
+    if len(page_rows) == limit:
+        last = int(page_rows[-1])
+        last_key = (sort_key(last), int(entry.ids[last]))
+
+    return items, len(rows), last_key
+
+
+def clear() -> None:
+    _cache.clear()
@@ -1,10 +1,14 @@
 from typing import Optional, Dict, Any
 
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app.domain.repositories.dataset_repo import (
     list_datasets as repo_list_datasets,
     get_dataset_with_fields as repo_get_dataset_with_fields,
+    get_dataset_with_fields_async as repo_get_dataset_with_fields_async,
+    get_dataset as repo_get_dataset,
+    delete_dataset as repo_delete_dataset,
 )
 
 from fastapi import HTTPException, status
@@ -30,4 +34,24 @@ def get_dataset_detail(db: Session, dataset_id: str) -> Any:
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Dataset {dataset_id} not found",
         )
-    return dataset
\ No newline at end of file
+    return dataset
+
+
+async def get_dataset_detail_async(db: AsyncSession, dataset_id: str) -> Any:
+    dataset = await repo_get_dataset_with_fields_async(db, dataset_id)
+    if dataset is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Dataset {dataset_id} not found",
+        )
+    return dataset
+
+
+def delete_dataset(db: Session, dataset_id: str) -> None:
+    if repo_get_dataset(db, dataset_id) is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Dataset {dataset_id} not found",
+        )
+    repo_delete_dataset(db, dataset_id)
+    db.commit()
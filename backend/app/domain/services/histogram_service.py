@@ -0,0 +1,91 @@
+from typing import Any, Dict, List, Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy.orm import Session
+
+from app.domain.repositories.dataset_repo import (
+    get_field_types as repo_get_field_types,
+)
+from app.domain.repositories.record_repo import (
+    SearchMode,
+    numeric_histogram as repo_numeric_histogram,
+    numeric_summary as repo_numeric_summary,
+    top_values as repo_top_values,
+)
+from app.domain.services.record_service import parse_filters
+
+
+def _float(value: Any) -> Optional[float]:
+    return None if value is None else float(value)
+
+
+def field_histogram(
+    db: Session,
+    dataset_id: str,
+    field: str,
+    bins: int,
+    top: int,
+    search: Optional[str],
+    filter_str: Optional[str],
+    search_mode: SearchMode = "substring",
+) -> Dict[str, Any]:
+    """
+    Distribution of one payload field over the records matching the same
+    search/filter parameters as the records endpoint.
+
+    number fields: min/max/mean, p50/p90/p99 (percentile_cont) and `bins`
+    equal-width buckets (width_bucket). Other fields: distinct count and the
+    `top` most frequent values. All aggregation happens in SQL.
+    """
+    field_types = repo_get_field_types(db, dataset_id)
+    if field not in field_types:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Field {field} not found in dataset {dataset_id}",
+        )
+    filters = parse_filters(filter_str, field_types)
+    field_type = field_types[field]
+    query = dict(
+        search=search, filters=filters, search_mode=search_mode, field_types=field_types
+    )
+
+    if field_type != "number":
+        totals, values = repo_top_values(db, dataset_id, field, top, **query)
+        return {
+            "field": field,
+            "type": field_type,
+            "count": totals["count"],
+            "non_null": totals["non_null"],
+            "distinct_count": totals["distinct"],
+            "top_values": [{"value": v, "count": n} for v, n in values],
+        }
+
+    summary = repo_numeric_summary(db, dataset_id, field, **query)
+    result = {
+        "field": field,
+        "type": field_type,
+        "count": summary["count"],
+        "non_null": summary["non_null"],
+        **{
+            key: _float(summary[key])
+            for key in ("min", "max", "mean", "p50", "p90", "p99")
+        },
+        "bins": [],
+    }
+    lo, hi = summary["min"], summary["max"]
+    if lo is None:
+        return result
+
+    if lo == hi:
+        # width_bucket needs a non-empty range
+        result["bins"] = [{"lower": lo, "upper": hi, "count": summary["non_null"]}]
+        return result
+
+    counts = repo_numeric_histogram(db, dataset_id, field, lo, hi, bins, **query)
+    width = (hi - lo) / bins
+    edges: List[float] = [float(lo + width * i) for i in range(bins)] + [float(hi)]
+    result["bins"] = [
+        {"lower": edges[i], "upper": edges[i + 1], "count": counts.get(i + 1, 0)}
+        for i in range(bins)
+    ]
+    return result
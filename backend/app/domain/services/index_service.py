@@ -0,0 +1,23 @@
+from typing import List
+
+from sqlalchemy.orm import Session
+from fastapi import HTTPException, status
+
+from app.db.index_manager import IndexPlan, plan_indexes
+from app.domain.repositories.dataset_repo import (
+    get_dataset_with_fields as repo_get_dataset_with_fields,
+)
+
+
+def plan_dataset_indexes(
+    db: Session,
+    dataset_id: str,
+    hot_fields: List[str],
+) -> IndexPlan:
+    dataset = repo_get_dataset_with_fields(db, dataset_id)
+    if dataset is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Dataset {dataset_id} not found",
+        )
+    return plan_indexes(db, dataset, hot_fields)
@@ -0,0 +1,220 @@
+import codecs
+import csv
+import json
+import math
+import re
+from typing import Any, AsyncIterator, Dict, List, Literal, Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.domain.repositories.ingest_repo import (
+    bump_row_count as repo_bump_row_count,
+    copy_records as repo_copy_records,
+    dataset_exists as repo_dataset_exists,
+)
+
+
+IngestFormat = Literal["csv", "ndjson"]
+
+INGEST_BATCH_SIZE = 5000
+
+# JSON number syntax; CSV cells spelled like this become numbers, anything
+# else (e.g. "02139", "1e", " 5") stays a string
+_NUMBER = re.compile(r"-?(?:0|[1-9]\d*)(\.\d+)?([eE][+-]?\d+)?")
+
+
+class IngestError(ValueError):
+    """Malformed upload; `line` is 1-based within the body."""
+
+    def __init__(self, line: int, message: str):
+        super().__init__(f"line {line}: {message}")
+
+
+# Content-Type -> format, for uploads that don't pass ?format=
+CONTENT_TYPES: Dict[str, IngestFormat] = {
+    "text/csv": "csv",
+    "application/x-ndjson": "ndjson",
+    "application/ndjson": "ndjson",
+    "application/jsonl": "ndjson",
+}
+
+
+def resolve_format(fmt: Optional[IngestFormat], content_type: Optional[str]) -> IngestFormat:
+    if fmt is not None:
+        return fmt
+    media_type = (content_type or "").split(";", 1)[0].strip().lower()
+    if media_type not in CONTENT_TYPES:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail="Send text/csv or application/x-ndjson, or pass ?format=csv|ndjson",
+        )
+    return CONTENT_TYPES[media_type]
+
+
+async def _lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Split a byte stream into decoded lines (without the line break)."""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    tail = ""
+    async for chunk in chunks:
+        text = tail + decoder.decode(chunk)
+        lines = text.split("\n")
+        tail = lines.pop()
+        for line in lines:
+            yield line.removesuffix("\r")
+    tail += decoder.decode(b"", final=True)
+    if tail:
+        yield tail.removesuffix("\r")
+
+
+def _reject_constant(name: str) -> Any:
+    raise ValueError(f"{name} is not valid JSON")
+
+
+def _finite_float(value: str) -> float:
+    number = float(value)
+    if not math.isfinite(number):
+        raise ValueError(f"{value} is out of range")
+    return number
+
+
+def _has_nul(value: Any) -> bool:
+    if isinstance(value, str):
+        return "\x00" in value
+    if isinstance(value, dict):
+        return any(_has_nul(k) or _has_nul(v) for k, v in value.items())
+    if isinstance(value, list):
+        return any(_has_nul(v) for v in value)
+    return False
+
+
+async def _ndjson_payloads(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    lineno = 0
+    async for line in _lines(chunks):
+        lineno += 1
+        if not line.strip():
+            continue
+        # jsonb has no NaN / Infinity and no NUL in strings: rejected here
+        # rather than failing the COPY
+        try:
+            obj = json.loads(
+                line, parse_constant=_reject_constant, parse_float=_finite_float
+            )
+        except json.JSONDecodeError as exc:
+            raise IngestError(lineno, f"invalid JSON ({exc.msg})") from None
+        except ValueError as exc:
+            raise IngestError(lineno, f"invalid JSON ({exc})") from None
+        if not isinstance(obj, dict):
+            raise IngestError(lineno, "each line must be a JSON object")
+        if "\\u0000" in line and _has_nul(obj):
+            raise IngestError(lineno, "strings must not contain \\u0000")
+        yield json.dumps(obj)
+
+
+def coerce_csv_value(value: str) -> Any:
+    """CSV cell -> JSON value: numbers, true/false, "" -> null, else string."""
+    if value == "":
+        return None
+    match = _NUMBER.fullmatch(value)
+    if match:
+        if not (match.group(1) or match.group(2)):
+            return int(value)
+        number = float(value)
+        # e.g. 1e999: out of float range, kept as written
+        return number if math.isfinite(number) else value
+    if value in ("true", "false"):
+        return value == "true"
+    return value
+
+
+async def _csv_payloads(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    header: Optional[List[str]] = None
+    pending: List[str] = []
+    start = lineno = 0
+
+    async for line in _lines(chunks):
+        lineno += 1
+        if not pending:
+            start = lineno
+        pending.append(line)
+        # a quoted cell may contain line breaks: the record is complete once
+        # its quotes balance ("" escapes keep the count even)
+        if sum(part.count('"') for part in pending) % 2:
+            continue
+        text, pending = "\n".join(pending), []
+        if not text.strip():
+            continue
+
+        if "\x00" in text:
+            raise IngestError(start, "NUL characters are not allowed")
+        try:
+            cells = next(csv.reader([text], strict=True))
+        except csv.Error as exc:
+            raise IngestError(start, f"invalid CSV ({exc})") from None
+
+        if header is None:
+            header = cells
+            if len(set(header)) != len(header) or "" in header:
+                raise IngestError(start, "header must have unique, non-empty names")
+            continue
+        if len(cells) != len(header):
+            raise IngestError(
+                start, f"expected {len(header)} fields, got {len(cells)}"
+            )
+        payload: Dict[str, Any] = {
+            name: coerce_csv_value(cell) for name, cell in zip(header, cells)
+        }
+        yield json.dumps(payload)
+
+    if pending:
+        raise IngestError(start, "unterminated quoted field")
+
+
+async def _batched(payloads: AsyncIterator[str], size: int) -> AsyncIterator[List[str]]:
+    batch: List[str] = []
+    async for payload in payloads:
+        batch.append(payload)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+async def ingest_records(
+    db: AsyncSession,
+    dataset_id: str,
+    chunks: AsyncIterator[bytes],
+    fmt: IngestFormat,
+    batch_size: int = INGEST_BATCH_SIZE,
+) -> Dict[str, Any]:
+    """
+    Append the records of a streamed CSV (header row + one record per row)
+    or NDJSON (one JSON object per line) upload to a dataset.
+
+    The upload is parsed incrementally and COPY'd in batches, all in one
+    transaction: either every row is ingested or, on a malformed row, none.
+    Dataset.row_count and updated_at are bumped; field stats are not
+    recomputed here.
+    """
+    if not await repo_dataset_exists(db, dataset_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Dataset {dataset_id} not found",
+        )
+
+    payloads = _csv_payloads(chunks) if fmt == "csv" else _ndjson_payloads(chunks)
+    try:
+        ingested = await repo_copy_records(
+            db, dataset_id, _batched(payloads, batch_size)
+        )
+    except IngestError as exc:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid {fmt} upload: {exc}",
+        )
+
+    await repo_bump_row_count(db, dataset_id, ingested)
+    await db.commit()
+    return {"dataset_id": dataset_id, "rows_ingested": ingested}
@@ -0,0 +1,179 @@
+"""
+Background jobs: a Postgres `jobs` table as the queue and a process pool
+as the workers, no external broker.
+
+Request handlers only insert a job row and hand its id to the pool; the
+work (e.g. a stats scan over millions of records) runs in a separate
+process with its own database connection, so API workers and the GIL are
+never tied up by it. Every job is tracked in the table, which is also
+what GET /api/v1/jobs/{id} reads.
+"""
+
+import logging
+import multiprocessing
+import traceback
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.core.config import settings
+from app.db.models import Dataset, Job
+from app.domain.repositories.job_repo import (
+    claim_job as repo_claim_job,
+    create_job as repo_create_job,
+    fail_stale_jobs as repo_fail_stale_jobs,
+    finish_job as repo_finish_job,
+    get_job as repo_get_job,
+    list_queued_job_ids as repo_list_queued_job_ids,
+)
+from app.domain.services.stats_service import compute_schema_stats
+
+
+logger = logging.getLogger(__name__)
+
+STATS_REFRESH = "stats_refresh"
+
+_executor: Optional[ProcessPoolExecutor] = None
+
+
+# ---- Worker side (runs in the pool's processes) ---- #
+
+# database url -> sessionmaker, one engine per worker process
+_worker_sessions: Dict[str, sessionmaker] = {}
+
+
+def _refresh_stats(db: Session, job: Job) -> None:
+    dataset = db.get(Dataset, job.dataset_id)
+    if dataset is None:
+        raise LookupError(f"Dataset {job.dataset_id} no longer exists")
+    compute_schema_stats(db, dataset)
+    db.commit()
+
+
+JOB_HANDLERS: Dict[str, Callable[[Session, Job], None]] = {
+    STATS_REFRESH: _refresh_stats,
+}
+
+
+def run_job(database_url: str, job_id: str) -> None:
+    """Pool entry point: claim, run and record the outcome of one job."""
+    if database_url not in _worker_sessions:
+        _worker_sessions[database_url] = sessionmaker(
+            bind=create_engine(database_url, pool_size=1, max_overflow=0),
+            autoflush=False,
+        )
+
+    with _worker_sessions[database_url]() as db:
+        job = repo_claim_job(db, job_id)
+        if job is None:
+            return
+        try:
+            JOB_HANDLERS[job.kind](db, job)
+        except Exception:
+            db.rollback()
+            repo_finish_job(db, job_id, error=traceback.format_exc(limit=5))
+        else:
+            repo_finish_job(db, job_id)
+
+
+# ---- API side ---- #
+
+def get_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        # spawn: workers must not inherit the parent's sockets or threads
+        _executor = ProcessPoolExecutor(
+            max_workers=settings.job_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _executor
+
+
+def shutdown_executor() -> None:
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+def _log_failure(job_id: str) -> Callable[[Future], None]:
+    def callback(future: Future) -> None:
+        exc = future.exception()
+        if exc is not None:
+            # the job row stays queued (or running, if the worker died
+            # mid-job) and is picked up by resume_queued_jobs
+            logger.error("job %s could not run: %r", job_id, exc)
+
+    return callback
+
+
+def submit_job(db: Session, job_id: str) -> None:
+    database_url = db.get_bind().url.render_as_string(hide_password=False)
+    future = get_executor().submit(run_job, database_url, job_id)
+    future.add_done_callback(_log_failure(job_id))
+
+
+def refresh_dataset_stats(db: Session, dataset_ids: List[str]) -> List[Job]:
+    """
+    Queue one stats refresh job per dataset (all datasets when dataset_ids
+    is empty). The jobs run in parallel, up to settings.job_workers at a
+    time.
+    """
+    stmt = select(Dataset.id).order_by(Dataset.name)
+    if dataset_ids:
+        stmt = stmt.where(Dataset.id.in_(dataset_ids))
+    found = list(db.scalars(stmt).all())
+
+    missing = sorted(set(dataset_ids) - set(found))
+    if missing:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Dataset {missing[0]} not found",
+        )
+
+    jobs = [repo_create_job(db, STATS_REFRESH, dataset_id) for dataset_id in found]
+    # workers read the rows from their own connections
+    db.commit()
+    for job in jobs:
+        submit_job(db, job.id)
+    return jobs
+
+
+def refresh_single_dataset_stats(db: Session, dataset_id: str) -> Job:
+    return refresh_dataset_stats(db, [dataset_id])[0]
+
+
+def get_job(db: Session, job_id: str) -> Job:
+    job = repo_get_job(db, job_id)
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Job {job_id} not found",
+        )
+    return job
+
+
+def resume_queued_jobs(db: Session) -> int:
+    """
+    Resubmit jobs left queued by a previous process (e.g. a restart).
+
+    Jobs left running by a killed worker or process would otherwise stay
+    running forever; those started more than settings.job_stale_after_s
+    ago are failed instead. They are not requeued: a job that kills its
+    worker would be retried on every start.
+    """
+    stale = repo_fail_stale_jobs(
+        db,
+        settings.job_stale_after_s,
+        error="Interrupted: the worker or server stopped while the job was running",
+    )
+    if stale:
+        logger.warning("failed %d job(s) left running: %s", len(stale), stale)
+
+    job_ids = repo_list_queued_job_ids(db)
+    for job_id in job_ids:
+        submit_job(db, job_id)
+    return len(job_ids)
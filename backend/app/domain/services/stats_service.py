@@ -0,0 +1,64 @@
+from datetime import datetime
+from typing import Any, Dict, List
+
+from sqlalchemy.orm import Session
+
+from app.db.models import Dataset
+from app.domain.repositories.stats_repo import (
+    aggregate_field_stats as repo_aggregate_field_stats,
+    count_dataset_records as repo_count_dataset_records,
+    get_example_values as repo_get_example_values,
+    replace_dataset_fields as repo_replace_dataset_fields,
+)
+
+
+_TYPE_COUNTS = (("numbers", "number"), ("strings", "string"), ("booleans", "boolean"))
+
+
+def field_type(stats: Dict[str, Any]) -> str:
+    """
+    DatasetField.type from the per-type value counts: the single JSON type
+    of all non-null values, "string" when they are mixed (or objects /
+    arrays), "unknown" when there are none.
+    """
+    if not stats["non_null"]:
+        return "unknown"
+    for column, name in _TYPE_COUNTS:
+        if stats[column] == stats["non_null"]:
+            return name
+    return "string"
+
+
+def compute_schema_stats(db: Session, dataset: Dataset) -> None:
+    """
+    Recompute dataset_fields and row_count for a dataset.
+
+    The per-field aggregates (null fraction, exact distinct count, type)
+    are computed by Postgres in a single scan over jsonb_each(payload);
+    nothing per-record is loaded into Python. The example value of a field
+    is its value in the lowest-id record that has it set.
+
+    Changes are flushed, not committed.
+    """
+    row_count = repo_count_dataset_records(db, dataset.id)
+    dataset.row_count = row_count
+    dataset.updated_at = datetime.utcnow()
+
+    stats = repo_aggregate_field_stats(db, dataset.id) if row_count else []
+    examples = repo_get_example_values(
+        db, dataset.id, {s["name"]: s["example_id"] for s in stats if s["example_id"] is not None}
+    )
+
+    fields: List[Dict[str, Any]] = [
+        {
+            "name": s["name"],
+            "type": field_type(s),
+            # rows without the key count as null
+            "null_frac": 1.0 - s["non_null"] / row_count,
+            "distinct_count": s["distinct_count"],
+            "example_value": examples.get(s["name"]),
+        }
+        for s in stats
+    ]
+    repo_replace_dataset_fields(db, dataset.id, fields)
+    db.flush()
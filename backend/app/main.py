@@ -1,12 +1,34 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.api.routers import datasets as datasets_router
 from app.api.routers import bookmarks as bookmarks_router
+from app.api.routers import admin as admin_router
+from app.api.routers import jobs as jobs_router
+from app.db.base import SessionLocal
+from app.domain.services.job_service import resume_queued_jobs, shutdown_executor
+
+
+def _resume_jobs() -> None:
+    with SessionLocal() as db:
+        resume_queued_jobs(db)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await run_in_threadpool(_resume_jobs)
+    yield
+    shutdown_executor()
+
 
-app = FastAPI(title="Data Explorer API", version="0.1.0")
+app = FastAPI(title="Data Explorer API", version="0.1.0", lifespan=lifespan)
 app.include_router(datasets_router.router)
 app.include_router(bookmarks_router.router)
+app.include_router(admin_router.router)
+app.include_router(jobs_router.router)
 
 origins = [
     "http://localhost:5173",
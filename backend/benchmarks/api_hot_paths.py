@@ -0,0 +1,488 @@
+# benchmarks/api_hot_paths.py
+
+"""
+Latency and throughput of the API hot paths, against a running server.
+
+Each scenario sends --requests requests (after --warmup unmeasured ones)
+from --concurrency threads, and reports p50/p95/p99/mean/max latency,
+requests per second and the number of non-2xx responses. The targets
+(dataset, fields, filter values, record ids) are discovered through the
+API: the largest dataset by default, its first number and string fields,
+and the p90 of the number field as a range filter threshold.
+
+Scenarios: dataset listing and search, record pages (shallow, deep by
+OFFSET and deep by keyset cursor), substring and full-text search, range
+and equality filters, sort, CSV export, and bookmark create / list /
+bulk upsert / delete (as --user, whose bookmarks are removed before and
+after the run).
+
+Results are written as JSON (--output, default
+benchmarks/results/api_hot_paths-<UTC time>.json) together with the git
+commit and the run parameters; --compare prints the change against an
+earlier result file.
+
+Usage (from backend/, with the API on localhost:8000):
+    python -m benchmarks.api_hot_paths
+    python -m benchmarks.api_hot_paths --requests 500 --concurrency 16
+    python -m benchmarks.api_hot_paths --only records. --compare old.json
+
+    # (re)seed the database in DATABASE_URL first; this wipes it
+    python -m benchmarks.api_hot_paths --seed-datasets 10 --seed-rows 5000000
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field as dc_field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import httpx
+
+from app.domain.schemas.bookmark import MAX_BULK_BOOKMARKS
+
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+PAGE_LIMIT = 50
+# position of the "deep" page, as a fraction of the dataset
+DEEP_FRACTION = 0.9
+BULK_SIZE = 100
+
+# (method, path, query params, JSON body)
+Call = Tuple[str, str, Dict[str, Any], Optional[Any]]
+
+
+@dataclass
+class Scenario:
+    name: str
+    # the i-th request of the scenario
+    make: Callable[[int], Call]
+    # share of --requests this scenario sends (exports are heavy)
+    weight: float = 1.0
+    # run once before the warmup with the number of requests to come
+    # (warmup included), e.g. to create what they act on
+    setup: Optional[Callable[[int], None]] = None
+
+
+@dataclass
+class Target:
+    dataset: Dict[str, Any]
+    number_field: Optional[str] = None
+    number_threshold: Optional[float] = None
+    text_field: Optional[str] = None
+    text_value: Optional[str] = None
+    deep_cursor: Optional[str] = None
+    record_ids: List[int] = dc_field(default_factory=list)
+
+
+# ---- Discovery ---- #
+
+def _get(client: httpx.Client, path: str, **params: Any) -> Any:
+    response = client.get(path, params=params)
+    response.raise_for_status()
+    return response.json()
+
+
+def discover(client: httpx.Client, dataset_id: Optional[str], n_ids: int) -> Target:
+    """Pick the dataset, fields, filter values and record ids to exercise."""
+    if dataset_id is None:
+        page, datasets = 1, []
+        while True:
+            body = _get(client, "/api/v1/datasets", page=page, limit=100)
+            datasets += body["items"]
+            if page * 100 >= body["total"]:
+                break
+            page += 1
+        if not datasets:
+            raise SystemExit("No datasets; seed the database first (--seed-rows).")
+        dataset_id = max(datasets, key=lambda d: d["row_count"])["id"]
+
+    dataset = _get(client, f"/api/v1/datasets/{dataset_id}")
+    target = Target(dataset=dataset)
+    records = f"/api/v1/datasets/{dataset_id}/records"
+
+    for f in dataset["fields"]:
+        if f["type"] == "number" and target.number_field is None:
+            target.number_field = f["name"]
+        if f["type"] == "string" and target.text_field is None and f["example_value"]:
+            target.text_field, target.text_value = f["name"], f["example_value"]
+    if target.number_field:
+        histogram = _get(
+            client, f"/api/v1/datasets/{dataset_id}/fields/{target.number_field}/histogram"
+        )
+        target.number_threshold = histogram["p90"]
+
+    deep_page = max(1, int(dataset["row_count"] * DEEP_FRACTION) // PAGE_LIMIT)
+    body = _get(
+        client, records, page=deep_page, limit=PAGE_LIMIT, count_mode="estimated"
+    )
+    target.deep_cursor = body.get("next_cursor")
+
+    cursor = None
+    while len(target.record_ids) < n_ids:
+        params: Dict[str, Any] = {"limit": 100, "count_mode": "estimated"}
+        if cursor:
+            params["cursor"] = cursor
+        body = _get(client, records, **params)
+        target.record_ids += [item["id"] for item in body["items"]]
+        cursor = body.get("next_cursor")
+        if not cursor or not body["items"]:
+            break
+    return target
+
+
+# ---- Bookmarks of the benchmark user ---- #
+
+def _user_bookmark_ids(client: httpx.Client) -> List[int]:
+    ids, page = [], 1
+    while True:
+        body = _get(client, "/api/v1/bookmarks", page=page, limit=100)
+        ids += [item["id"] for item in body["items"]]
+        if page * 100 >= body["total"]:
+            return ids
+        page += 1
+
+
+def _clear_bookmarks(client: httpx.Client) -> None:
+    ids = _user_bookmark_ids(client)
+    for start in range(0, len(ids), MAX_BULK_BOOKMARKS):
+        response = client.request(
+            "DELETE",
+            "/api/v1/bookmarks/bulk",
+            json={"ids": ids[start:start + MAX_BULK_BOOKMARKS]},
+        )
+        response.raise_for_status()
+
+
+def _bookmark_records(client: httpx.Client, dataset_id: str, record_ids: List[int]) -> None:
+    for start in range(0, len(record_ids), MAX_BULK_BOOKMARKS):
+        response = client.post(
+            "/api/v1/bookmarks/bulk",
+            json={
+                "items": [
+                    {"dataset_id": dataset_id, "record_id": r}
+                    for r in record_ids[start:start + MAX_BULK_BOOKMARKS]
+                ],
+                "on_conflict": "ignore",
+            },
+        )
+        response.raise_for_status()
+
+
+# ---- Scenarios ---- #
+
+def scenarios(target: Target, client: httpx.Client) -> List[Scenario]:
+    ds = target.dataset["id"]
+    records = f"/api/v1/datasets/{ds}/records"
+    ids = target.record_ids or [0]
+    page = {"limit": PAGE_LIMIT}
+
+    found = [
+        Scenario("datasets.list", lambda i: ("GET", "/api/v1/datasets", {"limit": 20}, None)),
+        Scenario(
+            "datasets.search",
+            lambda i: ("GET", "/api/v1/datasets", {"search": target.dataset["name"][:3]}, None),
+        ),
+        Scenario("datasets.detail", lambda i: ("GET", f"/api/v1/datasets/{ds}", {}, None)),
+        Scenario("records.page_shallow", lambda i: ("GET", records, dict(page), None)),
+        Scenario(
+            "records.page_shallow_estimated",
+            lambda i: ("GET", records, {**page, "count_mode": "estimated"}, None),
+        ),
+        Scenario(
+            "records.page_deep_offset",
+            lambda i: (
+                "GET",
+                records,
+                {
+                    **page,
+                    "page": max(
+                        1, int(target.dataset["row_count"] * DEEP_FRACTION) // PAGE_LIMIT
+                    ),
+                    "count_mode": "estimated",
+                },
+                None,
+            ),
+        ),
+    ]
+    if target.deep_cursor:
+        found.append(
+            Scenario(
+                "records.page_deep_cursor",
+                lambda i: (
+                    "GET",
+                    records,
+                    {**page, "cursor": target.deep_cursor, "count_mode": "estimated"},
+                    None,
+                ),
+            )
+        )
+    if target.text_field:
+        term = str(target.text_value)
+        eq = f"{target.text_field}:eq:{term}"
+        found += [
+            Scenario("records.search_substring", lambda i: ("GET", records, {**page, "search": term}, None)),
+            Scenario(
+                "records.search_fulltext",
+                lambda i: ("GET", records, {**page, "search": term, "search_mode": "fulltext"}, None),
+            ),
+            Scenario("records.filter_eq", lambda i: ("GET", records, {**page, "filter": eq}, None)),
+        ]
+    if target.number_field:
+        rng = f"{target.number_field}:gt:{target.number_threshold}"
+        sort = f"{target.number_field}:desc"
+        found += [
+            Scenario("records.filter_range", lambda i: ("GET", records, {**page, "filter": rng}, None)),
+            Scenario("records.sort", lambda i: ("GET", records, {**page, "sort": sort}, None)),
+            Scenario(
+                "records.sort_filtered",
+                lambda i: ("GET", records, {**page, "sort": sort, "filter": rng}, None),
+            ),
+            # everything above the p90: a tenth of the dataset per request
+            Scenario(
+                "records.export_csv",
+                lambda i: ("GET", f"{records}/export", {"filter": rng, "format": "csv"}, None),
+                weight=0.1,
+            ),
+        ]
+
+    # one existing bookmark per request
+    deletable: List[int] = []
+
+    def delete_setup(n: int) -> None:
+        _bookmark_records(client, ds, ids[:n])
+        deletable[:] = _user_bookmark_ids(client)
+
+    def delete_call(i: int) -> Call:
+        bookmark_id = deletable[i] if i < len(deletable) else 0
+        return ("DELETE", f"/api/v1/bookmarks/{bookmark_id}", {}, None)
+
+    found += [
+        Scenario(
+            "bookmarks.create",
+            lambda i: (
+                "POST",
+                "/api/v1/bookmarks",
+                {},
+                {"dataset_id": ds, "record_id": ids[i % len(ids)], "note": "bench"},
+            ),
+        ),
+        Scenario("bookmarks.list", lambda i: ("GET", "/api/v1/bookmarks", {"dataset_id": ds}, None)),
+        Scenario(
+            "bookmarks.list_with_records",
+            lambda i: ("GET", "/api/v1/bookmarks", {"dataset_id": ds, "include": "record"}, None),
+        ),
+        Scenario(
+            "bookmarks.bulk_upsert",
+            lambda i: (
+                "POST",
+                "/api/v1/bookmarks/bulk",
+                {},
+                {
+                    "items": [
+                        {"dataset_id": ds, "record_id": r, "note": f"bench {i}"}
+                        for r in ids[:BULK_SIZE]
+                    ]
+                },
+            ),
+        ),
+        Scenario(
+            "bookmarks.delete",
+            delete_call,
+            setup=delete_setup,
+        ),
+    ]
+    return found
+
+
+# ---- Measuring ---- #
+
+def _percentile(sorted_ms: List[float], q: float) -> float:
+    if len(sorted_ms) == 1:
+        return sorted_ms[0]
+    return statistics.quantiles(sorted_ms, n=100, method="inclusive")[int(q) - 1]
+
+
+def run_scenario(
+    client: httpx.Client,
+    scenario: Scenario,
+    requests: int,
+    concurrency: int,
+    warmup: int,
+) -> Dict[str, Any]:
+    requests = max(1, int(requests * scenario.weight))
+    warmup = int(warmup * scenario.weight)
+
+    if scenario.setup:
+        scenario.setup(warmup + requests)
+
+    def send(i: int) -> Tuple[float, int]:
+        method, path, params, body = scenario.make(i)
+        started = time.perf_counter()
+        response = client.request(method, path, params=params, json=body)
+        return time.perf_counter() - started, response.status_code
+
+    for i in range(warmup):
+        send(i)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        results = list(pool.map(send, range(warmup, warmup + requests)))
+    wall = time.perf_counter() - started
+
+    latencies = sorted(latency * 1000 for latency, _ in results)
+    statuses: Dict[str, int] = {}
+    for _, status_code in results:
+        statuses[str(status_code)] = statuses.get(str(status_code), 0) + 1
+    method, path, params, _ = scenario.make(warmup)
+    return {
+        "name": scenario.name,
+        "method": method,
+        "path": path,
+        "params": params,
+        "requests": requests,
+        "concurrency": concurrency,
+        "errors": sum(n for code, n in statuses.items() if not code.startswith("2")),
+        "statuses": statuses,
+        "rps": round(requests / wall, 2),
+        "latency_ms": {
+            "p50": round(_percentile(latencies, 50), 3),
+            "p95": round(_percentile(latencies, 95), 3),
+            "p99": round(_percentile(latencies, 99), 3),
+            "mean": round(statistics.fmean(latencies), 3),
+            "max": round(latencies[-1], 3),
+        },
+    }
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any]) -> None:
+    before = {s["name"]: s for s in baseline["scenarios"]}
+    print(f"\nvs {baseline.get('git_commit') or 'baseline'} ({baseline['started_at']}):")
+    print(f"{'scenario':<32} {'p95 ms':>20} {'rps':>20}")
+    for s in results["scenarios"]:
+        old = before.get(s["name"])
+        if old is None:
+            continue
+        p95, old_p95 = s["latency_ms"]["p95"], old["latency_ms"]["p95"]
+        print(
+            f"{s['name']:<32} {old_p95:>8.1f} -> {p95:<8.1f} "
+            f"{old['rps']:>8.1f} -> {s['rps']:<8.1f} "
+            f"{(p95 / old_p95 - 1) * 100 if old_p95 else 0:+6.0f}% p95"
+        )
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--dataset", help="dataset id (default: the largest)")
+    parser.add_argument("--user", default="bench-user", help="X-User-Id for bookmarks")
+    parser.add_argument("--requests", type=int, default=200, help="per scenario")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--warmup", type=int, default=10, help="per scenario")
+    parser.add_argument("--timeout", type=float, default=120)
+    parser.add_argument(
+        "--only", action="append", default=[], help="scenario name prefix (repeatable)"
+    )
+    parser.add_argument("--output", type=Path)
+    parser.add_argument("--compare", type=Path, help="earlier result file")
+    parser.add_argument("--seed-datasets", type=int, help="reseed DATABASE_URL first")
+    parser.add_argument("--seed-rows", type=int, help="records per seeded dataset")
+    parser.add_argument("--seed-workers", type=int)
+    args = parser.parse_args(argv)
+
+    if args.seed_datasets or args.seed_rows:
+        from app.db import init_seed
+
+        seed_argv = ["--datasets", str(args.seed_datasets or len(init_seed.KINDS))]
+        if args.seed_rows:
+            seed_argv += ["--rows", str(args.seed_rows)]
+        if args.seed_workers:
+            seed_argv += ["--workers", str(args.seed_workers)]
+        init_seed.main(seed_argv)
+
+    client = httpx.Client(
+        base_url=args.base_url,
+        headers={"X-User-Id": args.user},
+        timeout=args.timeout,
+        limits=httpx.Limits(max_connections=args.concurrency * 2),
+    )
+    started_at = datetime.now(timezone.utc)
+    with client:
+        _clear_bookmarks(client)
+        target = discover(client, args.dataset, args.requests + args.warmup)
+        selected = [
+            s
+            for s in scenarios(target, client)
+            if not args.only or s.name.startswith(tuple(args.only))
+        ]
+
+        print(
+            f"{target.dataset['name']} ({target.dataset['row_count']:,} records), "
+            f"{args.requests} requests x {args.concurrency} threads per scenario"
+        )
+        print(f"{'scenario':<32} {'p50':>9} {'p95':>9} {'p99':>9} {'rps':>9} {'errors':>7}")
+        reports = []
+        try:
+            for scenario in selected:
+                report = run_scenario(
+                    client, scenario, args.requests, args.concurrency, args.warmup
+                )
+                reports.append(report)
+                ms = report["latency_ms"]
+                print(
+                    f"{report['name']:<32} {ms['p50']:>9.1f} {ms['p95']:>9.1f} "
+                    f"{ms['p99']:>9.1f} {report['rps']:>9.1f} {report['errors']:>7}"
+                )
+        finally:
+            _clear_bookmarks(client)
+
+    results = {
+        "started_at": started_at.isoformat(),
+        "git_commit": _git_commit(),
+        "base_url": args.base_url,
+        "config": {
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "warmup": args.warmup,
+            "page_limit": PAGE_LIMIT,
+            # None: run against whatever the database already held
+            "seed": {"datasets": args.seed_datasets, "rows": args.seed_rows}
+            if args.seed_datasets or args.seed_rows
+            else None,
+        },
+        "dataset": {
+            "id": target.dataset["id"],
+            "name": target.dataset["name"],
+            "row_count": target.dataset["row_count"],
+            "number_field": target.number_field,
+            "text_field": target.text_field,
+        },
+        "scenarios": reports,
+    }
+    output = args.output or RESULTS_DIR / (
+        f"api_hot_paths-{started_at.strftime('%Y%m%dT%H%M%SZ')}.json"
+    )
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, indent=2) + "\n")
+    print(f"Results written to {output}")
+
+    if args.compare:
+        compare(results, json.loads(args.compare.read_text()))
+
+
+if __name__ == "__main__":
+    main()
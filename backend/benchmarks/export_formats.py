@@ -0,0 +1,113 @@
+# benchmarks/export_formats.py
+
+"""
+Compare the export formats: encoded size, encode time on the server, and
+load time on the consumer side.
+
+Records are generated with the demo payload generators and pushed through
+the same encoders /records/export uses, in export-sized batches, so no
+database is needed.
+
+Usage (from backend/):
+    python -m benchmarks.export_formats
+    python -m benchmarks.export_formats --rows 1000000 --dataset genes
+"""
+
+import argparse
+import io
+import random
+import time
+from typing import Callable, Dict, Iterator, List, Tuple
+
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+
+from app.db.init_seed import (
+    random_assay_payload,
+    random_experiment_payload,
+    random_gene_payload,
+)
+from app.domain.services.arrow_export import iter_columnar_chunks
+from app.domain.services.record_service import EXPORT_BATCH_SIZE, _iter_csv_chunks
+from app.domain.services.stats_service import field_type
+
+
+GENERATORS: Dict[str, Callable[[], dict]] = {
+    "genes": random_gene_payload,
+    "assays": random_assay_payload,
+    "experiments": random_experiment_payload,
+}
+
+LOADERS: Dict[str, Callable[[bytes], pa.Table]] = {
+    "csv": lambda data: pa_csv.read_csv(io.BytesIO(data)),
+    "parquet": lambda data: pq.read_table(io.BytesIO(data)),
+    "arrow": lambda data: pa.ipc.open_stream(data).read_all(),
+}
+
+
+def _batches(payloads: List[dict]) -> Iterator[List[Tuple[int, dict]]]:
+    for start in range(0, len(payloads), EXPORT_BATCH_SIZE):
+        yield [
+            (start + i + 1, p)
+            for i, p in enumerate(payloads[start:start + EXPORT_BATCH_SIZE])
+        ]
+
+
+def _field_types(payloads: List[dict]) -> Dict[str, str]:
+    # what compute_schema_stats would record for these payloads
+    types: Dict[str, str] = {}
+    for name in payloads[0]:
+        values = [p.get(name) for p in payloads if p.get(name) is not None]
+        stats = {
+            "non_null": len(values),
+            "numbers": sum(isinstance(v, (int, float)) and not isinstance(v, bool) for v in values),
+            "strings": sum(isinstance(v, str) for v in values),
+            "booleans": sum(isinstance(v, bool) for v in values),
+        }
+        types[name] = field_type(stats)
+    return types
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--dataset", choices=sorted(GENERATORS), default="experiments")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    payloads = [GENERATORS[args.dataset]() for _ in range(args.rows)]
+    field_types = _field_types(payloads)
+
+    encoders = {
+        "csv": lambda: _iter_csv_chunks(_batches(payloads)),
+        "parquet": lambda: iter_columnar_chunks(_batches(payloads), field_types, "parquet"),
+        "arrow": lambda: iter_columnar_chunks(_batches(payloads), field_types, "arrow"),
+    }
+
+    print(f"{args.rows:,} {args.dataset} records")
+    print(f"{'format':<8} {'size':>12} {'vs csv':>7} {'encode s':>9} {'load s':>8}")
+    csv_size = None
+    for fmt, encode in encoders.items():
+        started = time.perf_counter()
+        data = b"".join(encode())
+        encode_s = time.perf_counter() - started
+
+        # best of 3, so one-off imports/warm-up don't count
+        load_s = float("inf")
+        for _ in range(3):
+            started = time.perf_counter()
+            table = LOADERS[fmt](data)
+            load_s = min(load_s, time.perf_counter() - started)
+        assert table.num_rows == args.rows
+
+        csv_size = csv_size or len(data)
+        print(
+            f"{fmt:<8} {len(data):>12,} {len(data) / csv_size:>6.2f}x "
+            f"{encode_s:>9.2f} {load_s:>8.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
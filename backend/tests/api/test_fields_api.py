@@ -0,0 +1,69 @@
+# tests/api/test_fields_api.py
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app.db.models import Dataset, Record
+from app.domain.services.stats_service import compute_schema_stats
+from tests.conftest import TestingSessionLocal
+
+
+def test_field_histogram(client: TestClient):
+    db: Session = TestingSessionLocal()
+    ds = Dataset(
+        id="ffffffff-ffff-ffff-ffff-ffffffffffff",
+        name="histogram_test",
+        description="Histogram test dataset",
+    )
+    db.add(ds)
+    db.flush()
+    dataset_id = ds.id
+    db.add_all(
+        [
+            Record(
+                dataset_id=dataset_id,
+                payload={"length": i, "symbol": "TP53" if i % 3 else "MYC"},
+            )
+            for i in range(1, 101)
+        ]
+        + [Record(dataset_id=dataset_id, payload={"length": "NA", "symbol": "EGFR"})]
+    )
+    db.flush()
+    compute_schema_stats(db, ds)
+    db.commit()
+    db.close()
+    url = f"/api/v1/datasets/{dataset_id}/fields"
+
+    resp = client.get(f"{url}/length/histogram?bins=4")
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data["type"] == "string"  # mixed values -> not numeric
+    # a numeric histogram once "NA" is filtered out and stats are redone
+    db = TestingSessionLocal()
+    db.query(Record).filter(Record.payload["length"].astext == "NA").delete(
+        synchronize_session=False
+    )
+    compute_schema_stats(db, db.get(Dataset, dataset_id))
+    db.commit()
+    db.close()
+
+    data = client.get(f"{url}/length/histogram?bins=4").json()
+    assert data["type"] == "number"
+    assert (data["count"], data["non_null"]) == (100, 100)
+    assert (data["min"], data["max"], data["mean"]) == (1, 100, 50.5)
+    assert data["p50"] == 50.5
+    assert round(data["p90"], 2) == 90.1
+    assert [b["count"] for b in data["bins"]] == [25, 25, 25, 25]
+    assert data["bins"][0]["lower"] == 1 and data["bins"][-1]["upper"] == 100
+
+    # honors the records endpoint's filter parameter
+    data = client.get(
+        f"{url}/length/histogram?bins=2&filter=symbol:eq:MYC,length:le:30"
+    ).json()
+    assert (data["count"], data["min"], data["max"]) == (10, 3, 30)
+    assert sum(b["count"] for b in data["bins"]) == 10
+
+    data = client.get(f"{url}/symbol/histogram?top=1").json()
+    assert data["distinct_count"] == 2
+    assert data["top_values"] == [{"value": "TP53", "count": 67}]
+
+    assert client.get(f"{url}/nope/histogram").status_code == 404
@@ -0,0 +1,87 @@
+# tests/api/test_jobs_api.py
+import time
+from datetime import datetime, timedelta, timezone
+
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.db.models import Dataset, DatasetField, Job, Record
+from app.domain.services import job_service
+from tests.conftest import TestingSessionLocal
+
+
+def _wait_for_job(client: TestClient, job_id: str, timeout: float = 60) -> dict:
+    deadline = time.monotonic() + timeout
+    while True:
+        job = client.get(f"/api/v1/jobs/{job_id}").json()
+        if job["status"] in ("succeeded", "failed") or time.monotonic() > deadline:
+            return job
+        time.sleep(0.1)
+
+
+def test_stats_refresh_job(client: TestClient):
+    db: Session = TestingSessionLocal()
+    ds = Dataset(
+        id="dddddddd-dddd-dddd-dddd-dddddddddddd",
+        name="jobs_test",
+        description="Stats refresh job test dataset",
+        row_count=0,
+    )
+    db.add(ds)
+    db.flush()
+    dataset_id = ds.id
+    db.add_all(
+        [
+            Record(dataset_id=dataset_id, payload={"symbol": "TP53", "length": 10}),
+            Record(dataset_id=dataset_id, payload={"symbol": "MYC"}),
+        ]
+    )
+    db.commit()
+    db.close()
+
+    resp = client.post(f"/api/v1/datasets/{dataset_id}/stats:refresh")
+    assert resp.status_code == 202
+    job = resp.json()
+    assert (job["kind"], job["dataset_id"], job["status"]) == (
+        "stats_refresh",
+        dataset_id,
+        "queued",
+    )
+
+    job = _wait_for_job(client, job["id"])
+    assert job["status"] == "succeeded", job["error"]
+    assert job["started_at"] and job["finished_at"]
+
+    db = TestingSessionLocal()
+    assert db.get(Dataset, dataset_id).row_count == 2
+    fields = db.scalars(
+        select(DatasetField).where(DatasetField.dataset_id == dataset_id)
+    ).all()
+    assert {f.name: f.null_frac for f in fields} == {"length": 0.5, "symbol": 0.0}
+    db.close()
+
+    missing = "dededede-dede-dede-dede-dededededede"
+    assert client.post(f"/api/v1/datasets/{missing}/stats:refresh").status_code == 404
+    assert client.get(f"/api/v1/jobs/{missing}").status_code == 404
+
+
+def test_resume_fails_stale_running_jobs(client: TestClient, monkeypatch):
+    db: Session = TestingSessionLocal()
+    now = datetime.now(timezone.utc)
+    stale = Job(kind="stats_refresh", status="running", started_at=now - timedelta(hours=2))
+    fresh = Job(kind="stats_refresh", status="running", started_at=now)
+    db.add_all([stale, fresh])
+    db.commit()
+    stale_id, fresh_id = stale.id, fresh.id
+
+    monkeypatch.setattr(job_service.settings, "job_stale_after_s", 3600)
+    monkeypatch.setattr(job_service, "submit_job", lambda db, job_id: None)
+    job_service.resume_queued_jobs(db)
+    db.close()
+
+    job = client.get(f"/api/v1/jobs/{stale_id}").json()
+    assert job["status"] == "failed"
+    assert job["error"].startswith("Interrupted") and job["finished_at"]
+    # may still be running in another process
+    assert client.get(f"/api/v1/jobs/{fresh_id}").json()["status"] == "running"
@@ -1,4 +1,7 @@
 # tests/api/test_records_api.py
+import base64
+import json
+
 from fastapi.testclient import TestClient
 from sqlalchemy.orm import Session
 
@@ -45,3 +48,624 @@ def test_list_records_basic(client: TestClient):
 
     payloads = [item["payload"]["name"] for item in data["items"]]
     assert "A1" in payloads and "A2" in payloads
+
+
+def test_list_records_cursor_pagination(client: TestClient):
+    db: Session = TestingSessionLocal()
+    ds = Dataset(
+        id="44444444-4444-4444-4444-444444444444",
+        name="cursor_test",
+        description="Keyset pagination test dataset",
+        row_count=5,
+    )
+    db.add(ds)
+    db.flush()
+    dataset_id = ds.id
+    db.add_all(
+        [
+            Record(dataset_id=dataset_id, payload={"name": "b"}),
+            Record(dataset_id=dataset_id, payload={"name": "a"}),
+            Record(dataset_id=dataset_id, payload={"other": 1}),
+            Record(dataset_id=dataset_id, payload={"name": "b"}),
+            Record(dataset_id=dataset_id, payload={"name": "c"}),
+        ]
+    )
+    db.commit()
+    db.close()
+
+    for sort, expected in (
+        ("name:asc", ["a", "b", "b", "c", None]),
+        ("name:desc", [None, "c", "b", "b", "a"]),
+    ):
+        seen = []
+        cursor = None
+        while True:
+            params = {"limit": 2, "sort": sort}
+            if cursor:
+                params["cursor"] = cursor
+            resp = client.get(f"/api/v1/datasets/{dataset_id}/records", params=params)
+            assert resp.status_code == 200
+            data = resp.json()
+            assert data["total"] == 5
+            seen.extend(item["payload"].get("name") for item in data["items"])
+            cursor = data["next_cursor"]
+            if cursor is None:
+                break
+        assert seen == expected
+
+    resp = client.get(
+        f"/api/v1/datasets/{dataset_id}/records",
+        params={"cursor": "not-a-cursor"},
+    )
+    assert resp.status_code == 400
+
+    # well-formed but tampered: the key must be a scalar
+    tampered = base64.urlsafe_b64encode(
+        json.dumps({"s": "name:asc", "k": {}, "id": 1}).encode()
+    ).decode()
+    resp = client.get(
+        f"/api/v1/datasets/{dataset_id}/records",
+        params={"sort": "name:asc", "cursor": tampered},
+    )
+    assert resp.status_code == 400
+
+
+def test_export_records_csv_streams_all_batches(client: TestClient, monkeypatch):
+    from app.domain.services import record_service
+
+    db: Session = TestingSessionLocal()
+    ds = Dataset(
+        id="55555555-5555-5555-5555-555555555555",
+        name="export_test",
+        description="CSV export test dataset",
+        row_count=3,
+    )
+    db.add(ds)
+    db.flush()
+    dataset_id = ds.id
+    db.add_all(
+        [
+            Record(dataset_id=dataset_id, payload={"name": "x", "value": 3}),
+            Record(dataset_id=dataset_id, payload={"name": "y", "value": 1}),
+            Record(dataset_id=dataset_id, payload={"name": "z"}),
+        ]
+    )
+    db.commit()
+    db.close()
+
+    # Force one chunk per row to exercise the batching
+    monkeypatch.setattr(record_service, "EXPORT_BATCH_SIZE", 1)
+
+    resp = client.get(
+        f"/api/v1/datasets/{dataset_id}/records/export",
+        params={"sort": "name:asc"},
+    )
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/csv")
+
+    lines = resp.text.strip().splitlines()
+    assert lines[0] == "id,name,value"
+    assert [line.split(",")[1] for line in lines[1:]] == ["x", "y", "z"]
+
+    resp = client.get(
+        f"/api/v1/datasets/{dataset_id}/records/export",
+        params={"filter": "value:gt:abc"},
+    )
+    assert resp.status_code == 400
+
+
+def test_list_records_fulltext_search_matches_values_only(client: TestClient):
+    db: Session = TestingSessionLocal()
+    ds = Dataset(
+        id="88888888-8888-8888-8888-888888888888",
+        name="fulltext_test",
+        description="Full-text search test dataset",
+        row_count=3,
+    )
+    db.add(ds)
+    db.flush()
+    dataset_id = ds.id
+    db.add_all(
+        [
+            Record(dataset_id=dataset_id, payload={"name": "RNA-seq", "platform": "Illumina"}),
+            Record(dataset_id=dataset_id, payload={"name": "WGS", "platform": "Nanopore"}),
+            Record(dataset_id=dataset_id, payload={"name": "ChIP-seq", "coverage": 35.5}),
+        ]
+    )
+    db.commit()
+    db.close()
+
+    def names(search: str, mode: str) -> list:
+        resp = client.get(
+            f"/api/v1/datasets/{dataset_id}/records",
+            params={"search": search, "search_mode": mode},
+        )
+        assert resp.status_code == 200
+        return [item["payload"]["name"] for item in resp.json()["items"]]
+
+    # substring search also hits key names
+    assert names("platform", "substring") == ["RNA-seq", "WGS"]
+    assert names("platform", "fulltext") == []
+    # prefix match on every term, case-insensitive
+    assert names("illu rna", "fulltext") == ["RNA-seq"]
+    assert names("seq", "fulltext") == ["RNA-seq", "ChIP-seq"]
+    assert names("35.5", "fulltext") == ["ChIP-seq"]
+
+
+def test_async_request_path(client: TestClient, monkeypatch):
+    from app.api.routers import bookmarks as bookmarks_router, datasets as datasets_router
+    from app.core.config import settings
+
+    monkeypatch.setattr(settings, "db_async", True)
+
+    # the hot read paths must not fall back to the threadpool services
+    def threadpool_service(**kwargs):
+        raise AssertionError("sync service used with db_async")
+
+    for router, name in [
+        (datasets_router, "svc_get_dataset_detail"),
+        (datasets_router, "svc_list_records_json"),
+        (bookmarks_router, "svc_list_bookmarks"),
+    ]:
+        monkeypatch.setattr(router, name, threadpool_service)
+
+    db: Session = TestingSessionLocal()
+    ds = Dataset(
+        id="aaaaaaaa-aaaa-aaaa-aaaa-aaaaaaaaaaaa",
+        name="async_test",
+        description="Async engine test dataset",
+        row_count=3,
+    )
+    db.add(ds)
+    db.flush()
+    dataset_id = ds.id
+    db.add_all(
+        [Record(dataset_id=dataset_id, payload={"name": f"r{i}", "n": i}) for i in range(3)]
+    )
+    db.commit()
+    db.close()
+
+    resp = client.get(f"/api/v1/datasets/{dataset_id}")
+    assert resp.status_code == 200
+    assert resp.json()["name"] == "async_test"
+    assert client.get("/api/v1/datasets/abababab-abab-abab-abab-abababababab").status_code == 404
+
+    resp = client.get(
+        f"/api/v1/datasets/{dataset_id}/records?limit=2&sort=name:desc"
+    )
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data["total"] == 3
+    assert [i["payload"]["name"] for i in data["items"]] == ["r2", "r1"]
+
+    resp = client.get(
+        f"/api/v1/datasets/{dataset_id}/records",
+        params={"limit": 2, "sort": "name:desc", "cursor": data["next_cursor"]},
+    )
+    assert [i["payload"]["name"] for i in resp.json()["items"]] == ["r0"]
+    resp = client.get(
+        f"/api/v1/datasets/{dataset_id}/records",
+        params={"filter": "n:ge:1", "count_mode": "estimated"},
+    )
+    assert resp.json()["total_estimated"] is True
+    assert len(resp.json()["items"]) == 2
+
+    record_id = data["items"][0]["id"]
+    resp = client.get(f"/api/v1/datasets/{dataset_id}/records/{record_id}")
+    assert resp.status_code == 200
+    assert resp.json()["payload"]["n"] == 2
+
+    headers = {"X-User-Id": "async-user"}
+    body = {"dataset_id": dataset_id, "record_id": record_id, "note": "hi"}
+    resp = client.post("/api/v1/bookmarks", json=body, headers=headers)
+    assert resp.status_code == 201
+    bookmark_id = resp.json()["id"]
+    assert client.post("/api/v1/bookmarks", json=body, headers=headers).status_code == 409
+
+    resp = client.get("/api/v1/bookmarks", headers=headers)
+    assert [b["id"] for b in resp.json()["items"]] == [bookmark_id]
+    resp = client.get(
+        "/api/v1/bookmarks", params={"include": "record", "fields": "n"}, headers=headers
+    )
+    assert resp.json()["items"][0]["record"] == {"id": record_id, "payload": {"n": 2}}
+    resp = client.delete(f"/api/v1/bookmarks/{bookmark_id}", headers=headers)
+    assert resp.status_code == 204
+
+
+def test_ingest_csv_and_ndjson(client: TestClient):
+    db: Session = TestingSessionLocal()
+    ds = Dataset(
+        id="bbbbbbbb-bbbb-bbbb-bbbb-bbbbbbbbbbbb",
+        name="ingest_test",
+        description="COPY ingestion test dataset",
+        row_count=0,
+    )
+    db.add(ds)
+    db.commit()
+    dataset_id = ds.id
+    db.close()
+    url = f"/api/v1/datasets/{dataset_id}/records/ingest"
+
+    csv_body = (
+        'name,zip,length,ok,note\r\n'
+        'a,02139,1500,true,"two\nlines, ""quoted"""\r\n'
+        'b,10001,2.5,false,\r\n'
+    ).encode()
+    # sent in small pieces so rows and quoted cells straddle chunks
+    chunks = (csv_body[i:i + 7] for i in range(0, len(csv_body), 7))
+    resp = client.post(url, content=chunks, headers={"Content-Type": "text/csv"})
+    assert resp.status_code == 200
+    assert resp.json() == {"dataset_id": dataset_id, "rows_ingested": 2}
+
+    ndjson = b'{"name": "c", "tags": ["x"], "path": "C:\\\\tmp"}\n\n{"name": "d"}'
+    resp = client.post(f"{url}?format=ndjson", content=ndjson)
+    assert resp.json()["rows_ingested"] == 2
+
+    # a bad row rejects the whole upload
+    resp = client.post(
+        url,
+        content=b'{"name": "e"}\n[1, 2]\n',
+        headers={"Content-Type": "application/x-ndjson"},
+    )
+    assert resp.status_code == 400
+    assert "line 2" in resp.json()["detail"]
+    assert client.post(url, content=b"x", headers={"Content-Type": "text/plain"}).status_code == 415
+    # values jsonb cannot store
+    for bad in (b'{"x": NaN}', b'{"x": -Infinity}', b'{"x": 1e999}', b'{"x": "a\\u0000"}'):
+        resp = client.post(f"{url}?format=ndjson", content=bad)
+        assert resp.status_code == 400, bad
+    resp = client.post(f"{url}?format=csv", content=b"name\na\x00b\n")
+    assert resp.status_code == 400
+    assert "line 2" in resp.json()["detail"]
+
+    resp = client.get(f"/api/v1/datasets/{dataset_id}/records?sort=name:asc")
+    data = resp.json()
+    assert data["total"] == 4
+    assert [i["payload"] for i in data["items"]] == [
+        {"name": "a", "zip": "02139", "length": 1500, "ok": True, "note": 'two\nlines, "quoted"'},
+        {"name": "b", "zip": 10001, "length": 2.5, "ok": False, "note": None},
+        {"name": "c", "tags": ["x"], "path": "C:\\tmp"},
+        {"name": "d"},
+    ]
+    assert client.get(f"/api/v1/datasets/{dataset_id}").json()["row_count"] == 4
+
+
+def test_aggregate_records(client: TestClient):
+    from app.domain.services.stats_service import compute_schema_stats
+
+    db: Session = TestingSessionLocal()
+    ds = Dataset(
+        id="abcdabcd-abcd-abcd-abcd-abcdabcdabcd",
+        name="aggregate_test",
+        description="Group-by aggregation test dataset",
+    )
+    db.add(ds)
+    db.flush()
+    dataset_id = ds.id
+    rows = [
+        ("control", "TP53", 1.0),
+        ("control", "MYC", 3.0),
+        ("treated", "TP53", -2.0),
+        ("treated", "TP53", 4.0),
+        ("treated", "EGFR", "NA"),
+    ]
+    db.add_all(
+        [
+            Record(dataset_id=dataset_id, payload={"condition": c, "gene": g, "value": v})
+            for c, g, v in rows
+        ]
+        + [Record(dataset_id=dataset_id, payload={"gene": "KRAS", "value": 10})]
+    )
+    db.flush()
+    compute_schema_stats(db, ds)
+    db.commit()
+    db.close()
+    url = f"/api/v1/datasets/{dataset_id}/records/aggregate"
+
+    # "value" holds a string once, so it is typed string: no mean on it
+    resp = client.get(f"{url}?group_by=condition&metrics=mean:value")
+    assert resp.status_code == 400
+
+    resp = client.get(
+        f"{url}?group_by=condition&metrics=count,count:value,min:gene,max:gene"
+    )
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data["metrics"] == ["count", "count:value", "min:gene", "max:gene"]
+    assert data["groups"] == [
+        {"key": {"condition": "control"}, "values": {"count": 2, "count:value": 2, "min:gene": "MYC", "max:gene": "TP53"}},
+        {"key": {"condition": "treated"}, "values": {"count": 3, "count:value": 3, "min:gene": "EGFR", "max:gene": "TP53"}},
+        {"key": {"condition": None}, "values": {"count": 1, "count:value": 1, "min:gene": "KRAS", "max:gene": "KRAS"}},
+    ]
+    assert data["truncated"] is False
+
+    db = TestingSessionLocal()
+    db.query(Record).filter(Record.payload["value"].astext == "NA").delete(
+        synchronize_session=False
+    )
+    compute_schema_stats(db, db.get(Dataset, dataset_id))
+    db.commit()
+    db.close()
+
+    resp = client.get(
+        f"{url}?group_by=condition,gene&metrics=sum:value,mean:value"
+        "&filter=gene:eq:TP53&limit=1"
+    )
+    data = resp.json()
+    assert data["groups"] == [
+        {"key": {"condition": "control", "gene": "TP53"}, "values": {"sum:value": 1, "mean:value": 1}},
+    ]
+    assert data["truncated"] is True
+
+    # no group_by: one row over everything
+    data = client.get(f"{url}?metrics=count,max:value").json()
+    assert data["groups"] == [{"key": {}, "values": {"count": 5, "max:value": 10}}]
+
+    assert client.get(f"{url}?group_by=nope").status_code == 400
+    assert client.get(f"{url}?metrics=median:value").status_code == 400
+
+
+def test_export_parquet_and_arrow(client: TestClient):
+    import io
+
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    from app.domain.services.stats_service import compute_schema_stats
+
+    db: Session = TestingSessionLocal()
+    ds = Dataset(
+        id="acacacac-acac-acac-acac-acacacacacac",
+        name="parquet_test",
+        description="Columnar export test dataset",
+    )
+    db.add(ds)
+    db.flush()
+    dataset_id = ds.id
+    db.add_all(
+        [
+            Record(dataset_id=dataset_id, payload={"symbol": "TP53", "length": 1500, "ok": True, "tags": ["a"]}),
+            Record(dataset_id=dataset_id, payload={"symbol": "MYC", "length": 2.5, "ok": False}),
+            Record(dataset_id=dataset_id, payload={"symbol": "EGFR"}),
+        ]
+    )
+    db.flush()
+    compute_schema_stats(db, ds)
+    db.commit()
+    db.close()
+    url = f"/api/v1/datasets/{dataset_id}/records/export"
+
+    resp = client.get(f"{url}?format=parquet&sort=symbol:asc&filter=symbol:ne:MYC")
+    assert resp.status_code == 200
+    assert resp.headers["content-type"] == "application/vnd.apache.parquet"
+    assert resp.headers["content-disposition"].endswith('.parquet"')
+    table = pq.read_table(io.BytesIO(resp.content))
+    assert table.schema.field("length").type == pa.float64()
+    assert table.schema.field("ok").type == pa.bool_()
+    assert table.drop(["id"]).to_pylist() == [
+        {"length": None, "ok": None, "symbol": "EGFR", "tags": None},
+        {"length": 1500.0, "ok": True, "symbol": "TP53", "tags": '["a"]'},
+    ]
+
+    resp = client.get(f"{url}?format=arrow&sort=length:desc")
+    assert resp.status_code == 200
+    table = pa.ipc.open_stream(resp.content).read_all()
+    assert table.column("length").to_pylist() == [None, 1500.0, 2.5]
+
+    # keys added since the stats were computed are exported as text
+    db = TestingSessionLocal()
+    db.add(Record(dataset_id=dataset_id, payload={"symbol": "KRAS", "chrom": 12}))
+    db.commit()
+    db.close()
+    resp = client.get(f"{url}?format=parquet&filter=symbol:eq:KRAS")
+    table = pq.read_table(io.BytesIO(resp.content))
+    assert table.schema.field("chrom").type == pa.large_string()
+    assert table.drop(["id"]).to_pylist() == [
+        {"length": None, "ok": None, "symbol": "KRAS", "tags": None, "chrom": "12"},
+    ]
+
+    assert client.get(f"{url}?format=xlsx").status_code == 422
+
+
+def test_filter_lists_ranges_and_groups(client: TestClient):
+    from app.domain.services.stats_service import compute_schema_stats
+
+    db: Session = TestingSessionLocal()
+    ds = Dataset(
+        id="afafafaf-afaf-afaf-afaf-afafafafafaf",
+        name="filter_language_test",
+        description="IN / BETWEEN / isnull / OR filter test dataset",
+    )
+    db.add(ds)
+    db.flush()
+    dataset_id = ds.id
+    db.add_all(
+        [
+            Record(dataset_id=dataset_id, payload={"symbol": "TP53", "length": 1200, "note": "x"}),
+            Record(dataset_id=dataset_id, payload={"symbol": "BRCA1", "length": 80}),
+            Record(dataset_id=dataset_id, payload={"symbol": "EGFR", "length": 2000.0, "note": None}),
+            Record(dataset_id=dataset_id, payload={"symbol": "MYC", "length": 450}),
+        ]
+    )
+    db.flush()
+    compute_schema_stats(db, ds)
+    db.commit()
+    db.close()
+    url = f"/api/v1/datasets/{dataset_id}/records"
+
+    def symbols(filter_str: str) -> list:
+        resp = client.get(url, params={"filter": filter_str, "sort": "symbol:asc"})
+        assert resp.status_code == 200, resp.text
+        data = resp.json()
+        assert data["total"] == len(data["items"])
+        return [item["payload"]["symbol"] for item in data["items"]]
+
+    assert symbols("symbol:in:TP53|BRCA1|EGFR") == ["BRCA1", "EGFR", "TP53"]
+    assert symbols("symbol:nin:TP53|BRCA1") == ["EGFR", "MYC"]
+    assert symbols("length:in:2000|80") == ["BRCA1", "EGFR"]
+    assert symbols("length:between:100|1200") == ["MYC", "TP53"]
+    assert symbols("note:isnull:true") == ["BRCA1", "EGFR", "MYC"]
+    assert symbols("note:isnull:false") == ["TP53"]
+    assert symbols("or(symbol:eq:MYC,length:gt:1500)") == ["EGFR", "MYC"]
+    assert symbols(
+        "symbol:ne:EGFR,or(symbol:eq:MYC,and(symbol:like:p5,length:ge:1000))"
+    ) == ["MYC", "TP53"]
+
+    for bad in (
+        "length:between:1",
+        "length:in:1|abc",
+        "note:isnull:maybe",
+        "or(symbol:eq:MYC",
+        "or()",
+        "or(nope:eq:1)",
+    ):
+        assert client.get(url, params={"filter": bad}).status_code == 400, bad
+
+
+def test_batch_record_fetch(client: TestClient):
+    db: Session = TestingSessionLocal()
+    ds = Dataset(
+        id="bcbcbcbc-bcbc-bcbc-bcbc-bcbcbcbcbcbc",
+        name="batch_fetch_test",
+        description="Batch record fetch test dataset",
+    )
+    db.add(ds)
+    db.flush()
+    dataset_id = ds.id
+    records = [
+        Record(dataset_id=dataset_id, payload={"symbol": "TP53", "length": 1200, "note": None}),
+        Record(dataset_id=dataset_id, payload={"symbol": "MYC"}),
+        Record(dataset_id=dataset_id, payload={"symbol": "EGFR", "length": 80}),
+    ]
+    db.add_all(records)
+    db.commit()
+    ids = [r.id for r in records]
+    db.close()
+    url = f"/api/v1/datasets/{dataset_id}/records/batch"
+
+    resp = client.post(url, json={"ids": [ids[2], 999_999_999, ids[0], ids[2]]})
+    assert resp.status_code == 200
+    assert resp.json() == {
+        "items": [
+            {"id": ids[2], "payload": {"symbol": "EGFR", "length": 80}},
+            {"id": ids[0], "payload": {"symbol": "TP53", "length": 1200, "note": None}},
+        ],
+        "missing": [999_999_999],
+    }
+
+    resp = client.post(url, json={"ids": ids, "fields": ["length", "note"]})
+    assert [item["payload"] for item in resp.json()["items"]] == [
+        {"length": 1200, "note": None},
+        {},
+        {"length": 80},
+    ]
+
+    assert client.post(url, json={"ids": []}).status_code == 422
+    assert client.post(url, json={"ids": list(range(5001))}).status_code == 422
+    missing_ds = "/api/v1/datasets/abababab-abab-abab-abab-abababababab/records/batch"
+    assert client.post(missing_ds, json={"ids": ids}).status_code == 404
+
+
+def test_bookmarks_include_record(client: TestClient):
+    from sqlalchemy import event
+
+    db: Session = TestingSessionLocal()
+    ds = Dataset(
+        id="bdbdbdbd-bdbd-bdbd-bdbd-bdbdbdbdbdbd",
+        name="bookmark_join_test",
+        description="Bookmarks with records test dataset",
+    )
+    db.add(ds)
+    db.flush()
+    records = [
+        Record(dataset_id=ds.id, payload={"symbol": f"G{i}", "length": i}) for i in range(5)
+    ]
+    db.add_all(records)
+    db.commit()
+    dataset_id, ids = ds.id, [r.id for r in records]
+    engine = db.get_bind()
+    db.close()
+
+    headers = {"X-User-Id": "join-user"}
+    for record_id in ids:
+        body = {"dataset_id": dataset_id, "record_id": record_id}
+        assert client.post("/api/v1/bookmarks", json=body, headers=headers).status_code == 201
+
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        resp = client.get(
+            "/api/v1/bookmarks",
+            params={"include": "record", "fields": "symbol", "limit": 100},
+            headers=headers,
+        )
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+    assert resp.status_code == 200
+    items = resp.json()["items"]
+    assert sorted(item["record"]["payload"]["symbol"] for item in items) == [
+        f"G{i}" for i in range(5)
+    ]
+    assert all(item["record"]["id"] == item["record_id"] for item in items)
+    # the count and the page; no per-bookmark record loads
+    assert len(statements) == 2
+
+    resp = client.get("/api/v1/bookmarks", params={"include": "record"}, headers=headers)
+    assert {"symbol", "length"} == set(resp.json()["items"][0]["record"]["payload"])
+    resp = client.get("/api/v1/bookmarks", headers=headers)
+    assert resp.json()["items"][0]["record"] is None
+
+
+def test_bulk_bookmarks(client: TestClient):
+    db: Session = TestingSessionLocal()
+    ds = Dataset(
+        id="bebebebe-bebe-bebe-bebe-bebebebebebe",
+        name="bulk_bookmark_test",
+        description="Bulk bookmark test dataset",
+    )
+    db.add(ds)
+    db.flush()
+    records = [Record(dataset_id=ds.id, payload={"n": i}) for i in range(3)]
+    db.add_all(records)
+    db.commit()
+    dataset_id, ids = ds.id, [r.id for r in records]
+    db.close()
+
+    headers = {"X-User-Id": "bulk-user"}
+    url = "/api/v1/bookmarks/bulk"
+    body = {"dataset_id": dataset_id, "record_id": ids[0], "note": "first"}
+    assert client.post("/api/v1/bookmarks", json=body, headers=headers).status_code == 201
+    assert client.post("/api/v1/bookmarks", json=body, headers=headers).status_code == 409
+    missing = {"dataset_id": dataset_id, "record_id": 999_999_999}
+    assert client.post("/api/v1/bookmarks", json=missing, headers=headers).status_code == 404
+
+    items = [
+        {"dataset_id": dataset_id, "record_id": ids[0], "note": "again"},
+        {"dataset_id": dataset_id, "record_id": ids[1], "note": "new"},
+        missing,
+    ]
+    resp = client.post(url, json={"items": items, "on_conflict": "ignore"}, headers=headers)
+    assert resp.status_code == 200
+    result = resp.json()["items"]
+    assert [(r["record_id"], r["status"]) for r in result] == [
+        (ids[0], "exists"), (ids[1], "created"), (999_999_999, "not_found"),
+    ]
+    assert result[0]["bookmark"]["note"] == "first"
+
+    items[0]["note"] = "updated"
+    items.append({"dataset_id": dataset_id, "record_id": ids[2]})
+    result = client.post(url, json={"items": items}, headers=headers).json()["items"]
+    assert [r["status"] for r in result] == ["updated", "updated", "not_found", "created"]
+    assert result[0]["bookmark"]["note"] == "updated"
+
+    bookmark_ids = [r["bookmark"]["id"] for r in result if r["bookmark"]]
+    resp = client.request(
+        "DELETE", url, json={"ids": bookmark_ids + [999_999_999]}, headers=headers
+    )
+    assert resp.status_code == 200
+    assert [r["deleted"] for r in resp.json()["items"]] == [True, True, True, False]
+    assert client.get("/api/v1/bookmarks", headers=headers).json()["total"] == 0
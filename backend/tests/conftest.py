@@ -7,7 +7,9 @@ from typing import Generator
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
 
 # Make sure backend root (where app/ lives) is on sys.path
 ROOT = Path(__file__).resolve().parents[1]  # backend/
@@ -15,7 +17,7 @@ if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
 from app.main import app as fastapi_app
-from app.db.base import Base, get_db
+from app.db.base import Base, get_async_db, get_db, get_export_db
 import app.db.models  # noqa: F401  # ensure all models are registered
 
 
@@ -36,6 +38,17 @@ TestingSessionLocal = sessionmaker(
     bind=engine,
 )
 
+# TestClient may run each request on a fresh event loop, so async
+# connections are not pooled across requests
+async_engine = create_async_engine(TEST_DATABASE_URL, poolclass=NullPool)
+
+TestingAsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    autoflush=False,
+    expire_on_commit=False,
+    class_=AsyncSession,
+)
+
 # Create a clean schema for the test run
 Base.metadata.drop_all(bind=engine)
 Base.metadata.create_all(bind=engine)
@@ -49,8 +62,15 @@ def override_get_db() -> Generator:
         db.close()
 
 
-# Override FastAPI dependency to use the test DB
+async def override_get_async_db():
+    async with TestingAsyncSessionLocal() as db:
+        yield db
+
+
+# Override FastAPI dependencies to use the test DB
 fastapi_app.dependency_overrides[get_db] = override_get_db
+fastapi_app.dependency_overrides[get_export_db] = override_get_db
+fastapi_app.dependency_overrides[get_async_db] = override_get_async_db
 
 
 @pytest.fixture()
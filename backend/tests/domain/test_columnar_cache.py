@@ -0,0 +1,138 @@
+# tests/domain/test_columnar_cache.py
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.models import Dataset, Record
+from app.domain.services import columnar_cache
+from app.domain.services.record_service import list_records
+from app.domain.services.stats_service import compute_schema_stats
+from tests.conftest import TestingSessionLocal
+
+
+def _pages(db, dataset_id, sort, filter_str, limit=3):
+    """All pages of a listing via cursors, as (ids, totals)."""
+    ids, totals, cursor = [], [], None
+    while True:
+        result = list_records(
+            db=db,
+            dataset_id=dataset_id,
+            page=1,
+            limit=limit,
+            search=None,
+            sort=sort,
+            filter_str=filter_str,
+            cursor=cursor,
+        )
+        ids += [item["id"] for item in result["items"]]
+        totals.append(result["total"])
+        cursor = result["next_cursor"]
+        if cursor is None:
+            return ids, totals
+
+
+def test_columnar_cache_matches_sql(monkeypatch):
+    db: Session = TestingSessionLocal()
+    ds = Dataset(
+        id="eeeeeeee-eeee-eeee-eeee-eeeeeeeeeeee",
+        name="columnar_test",
+        description="Columnar cache test dataset",
+    )
+    db.add(ds)
+    db.flush()
+    payloads = [
+        {"symbol": "TP53", "length": 1500, "zip": "02139", "ok": True},
+        {"symbol": "tp53-like", "length": 2.5, "zip": 2139, "ok": False},
+        {"symbol": "BRCA1", "length": None, "ok": "true"},
+        {"symbol": "EGFR", "length": 1500.0, "zip": "1000"},
+        {"length": "NA", "zip": 1000},
+        {"symbol": "MYC", "length": -3},
+        {"symbol": "BRCA1", "length": 20000, "zip": "02139"},
+    ]
+    db.add_all([Record(dataset_id=ds.id, payload=p) for p in payloads])
+    db.flush()
+    compute_schema_stats(db, ds)
+    db.commit()
+
+    cases = [
+        (None, None),
+        ("id:desc", None),
+        ("symbol:asc", None),
+        ("symbol:desc", None),
+        ("length:asc", None),
+        ("length:desc", "symbol:ne:MYC"),
+        ("symbol:asc", "symbol:like:tp"),
+        ("length:asc", "length:ge:1500"),
+        (None, "length:lt:1500,length:gt:-5"),
+        ("zip:asc", "zip:eq:02139"),
+        ("zip:desc", "zip:eq:1000"),
+        (None, "ok:eq:true"),
+        (None, "ok:ne:true"),
+        ("symbol:asc", "symbol:in:TP53|MYC|KRAS"),
+        (None, "symbol:nin:BRCA1|EGFR"),
+        ("length:asc", "length:in:1500|-3"),
+        (None, "length:between:0|1500"),
+        (None, "zip:isnull:true"),
+        (None, "or(symbol:eq:MYC,and(length:gt:1000,zip:eq:02139))"),
+    ]
+    for sort, filter_str in cases:
+        monkeypatch.setattr(settings, "columnar_cache_enabled", False)
+        expected = _pages(db, ds.id, sort, filter_str)
+        monkeypatch.setattr(settings, "columnar_cache_enabled", True)
+        assert _pages(db, ds.id, sort, filter_str) == expected, (sort, filter_str)
+
+    entry = columnar_cache.get_dataset_columns(db, ds.id)
+    assert entry is not None and entry.nbytes > 0
+    # served from the cache, not rebuilt
+    assert columnar_cache.get_dataset_columns(db, ds.id) is entry
+
+    # text sorts (length is mixed, so text too) are left to SQL, whose
+    # collation decides their order
+    args = dict(db=db, dataset_id=ds.id, page=1, limit=3, search=None, filters=[])
+    assert columnar_cache.list_records(sort="symbol:asc", **args) is None
+    assert columnar_cache.list_records(sort="length:asc", **args) is None
+    assert columnar_cache.list_records(sort="id:desc", **args) is not None
+
+    # concurrent misses wait for a single build
+    builds = []
+    build = columnar_cache.build_dataset
+    started = threading.Event()
+
+    def slow_build(*a, **kw):
+        builds.append(1)
+        started.wait(1)
+        return build(*a, **kw)
+
+    def lookup(_):
+        session = TestingSessionLocal()
+        try:
+            return columnar_cache.get_dataset_columns(session, ds.id)
+        finally:
+            session.close()
+
+    columnar_cache.clear()
+    monkeypatch.setattr(columnar_cache, "build_dataset", slow_build)
+    with ThreadPoolExecutor(4) as pool:
+        futures = [pool.submit(lookup, i) for i in range(4)]
+        started.set()
+        entries = [f.result() for f in futures]
+    monkeypatch.setattr(columnar_cache, "build_dataset", build)
+    assert len(builds) == 1 and all(e is entries[0] for e in entries)
+
+    # updated_at changes invalidate the entry
+    db.add(Record(dataset_id=ds.id, payload={"symbol": "KRAS", "length": 7}))
+    db.flush()
+    compute_schema_stats(db, ds)
+    db.commit()
+    result = list_records(
+        db=db, dataset_id=ds.id, page=1, limit=10, search=None,
+        sort="length:asc", filter_str="length:lt:10",
+    )
+    assert [item["payload"]["symbol"] for item in result["items"]] == ["MYC", "tp53-like", "KRAS"]
+
+    # too large for the cache -> SQL path
+    monkeypatch.setattr(settings, "columnar_cache_max_rows", 3)
+    assert columnar_cache.get_dataset_columns(db, ds.id) is None
+    db.close()
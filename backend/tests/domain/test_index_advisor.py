@@ -0,0 +1,55 @@
+# tests/domain/test_index_advisor.py
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.db.index_advisor import advise, load_context, run_probe
+from app.db.models import Bookmark, Dataset, DatasetField, Record
+from tests.conftest import TestingSessionLocal
+
+
+def test_every_repository_query_is_served_by_an_index():
+    db: Session = TestingSessionLocal()
+
+    ds = Dataset(
+        id="bfbfbfbf-bfbf-bfbf-bfbf-bfbfbfbfbfbf",
+        name="index_advisor_test",
+        description="Index advisor",
+        row_count=2,
+    )
+    db.add(ds)
+    db.flush()
+    db.add_all(
+        [
+            DatasetField(dataset_id=ds.id, name="length", type="number", null_frac=0.0),
+            DatasetField(dataset_id=ds.id, name="symbol", type="string", null_frac=0.0),
+            Record(dataset_id=ds.id, payload={"length": 1, "symbol": "TP53"}),
+            Record(dataset_id=ds.id, payload={"length": 2, "symbol": "EGFR"}),
+        ]
+    )
+    db.commit()
+
+    ctx = load_context(db, ds.id, "advisor-user")
+    assert (ctx.number_field, ctx.text_field) == ("length", "symbol")
+
+    # with sequential scans disabled, a Seq Scan means no index fits at all
+    reports = advise(db, ctx, min_rows=0, strict=True)
+    assert not [r.error for r in reports if r.error]
+    assert [(r.probe, r.seq_scans) for r in reports if r.seq_scans] == []
+    probed = {r.probe.split(" ")[0] for r in reports}
+    assert {"record_repo.list_records", "bookmark_repo.list_bookmarks_for_user"} <= probed
+
+    # ... which is what an unindexed predicate gets
+    unindexed = run_probe(
+        db,
+        ctx,
+        "bookmarks by note",
+        lambda db, c: db.scalars(select(Bookmark).where(Bookmark.note == "x")).all(),
+        {"bookmarks": 0},
+        min_rows=0,
+        strict=True,
+    )
+    assert [r.seq_scans for r in unindexed] == [[("bookmarks", 0)]]
+
+    # probes roll back their writes
+    assert db.scalars(select(Bookmark).where(Bookmark.user_id == "advisor-user")).all() == []
+    db.close()
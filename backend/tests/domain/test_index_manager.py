@@ -0,0 +1,90 @@
+# tests/domain/test_index_manager.py
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.db.index_manager import apply_plan, plan_indexes
+from app.db.models import Dataset, DatasetField, Record
+from app.domain.repositories.record_repo import list_records
+from tests.conftest import TestingSessionLocal, engine
+
+
+def test_plan_and_build_payload_indexes():
+    db: Session = TestingSessionLocal()
+
+    ds = Dataset(
+        id="77777777-7777-7777-7777-777777777777",
+        name="index_test",
+        description="Index manager",
+        row_count=50_000,
+    )
+    db.add(ds)
+    db.flush()
+    db.add_all(
+        [
+            DatasetField(dataset_id=ds.id, name="length", type="number", null_frac=0.0, distinct_count=40_000),
+            DatasetField(dataset_id=ds.id, name="symbol", type="string", null_frac=0.0, distinct_count=5),
+            DatasetField(dataset_id=ds.id, name="flag", type="boolean", null_frac=0.0, distinct_count=2),
+            DatasetField(dataset_id=ds.id, name="sparse", type="number", null_frac=0.9, distinct_count=5_000),
+        ]
+    )
+    db.add_all(
+        [Record(dataset_id=ds.id, payload={"length": i, "symbol": "TP53"}) for i in range(20)]
+        # a stray non-numeric value in a number field must not break the sort
+        + [Record(dataset_id=ds.id, payload={"length": "NA", "symbol": "TP53"})]
+    )
+    db.commit()
+    db.refresh(ds)
+
+    # length is selective; symbol only because it is requested as hot
+    plan = plan_indexes(db, ds, hot_fields=["symbol", "flag"])
+    assert sorted(idx.field for idx in plan.create) == ["length", "symbol"]
+    assert plan.keep == [] and plan.drop == [] and plan.rebuild == []
+    # CREATE INDEX CONCURRENTLY waits for open transactions, including ours
+    db.commit()
+
+    assert apply_plan(engine, plan) == []
+
+    plan_again = plan_indexes(db, ds)
+    assert plan_again.create == []
+    assert len(plan_again.keep) == 1
+    # symbol is no longer hot -> its index is reported stale
+    assert len(plan_again.drop) == 1
+    db.commit()
+
+    # Capture the page query exactly as the repository sends it (dataset_id
+    # and friends as bound parameters) and check its plan uses the index.
+    captured = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if "LIMIT" in statement:
+            captured.append((statement, parameters))
+
+    conn = db.connection()
+    event.listen(conn, "before_cursor_execute", capture)
+    items, _, _ = list_records(
+        db,
+        dataset_id=ds.id,
+        page=2,
+        limit=5,
+        search=None,
+        sort="length:desc",
+        field_types={"length": "number"},
+    )
+    event.remove(conn, "before_cursor_execute", capture)
+    # NULL ("NA") sorts first for DESC; page 2 is 15..11
+    assert [r.payload["length"] for r in items] == [15, 14, 13, 12, 11]
+
+    statement, parameters = captured[-1]
+    conn.exec_driver_sql("SET enable_seqscan = off")
+    # records (dataset_id, id) plus a sort is the other way to run it
+    conn.exec_driver_sql("SET enable_sort = off")
+    explain = "\n".join(
+        row[0] for row in conn.exec_driver_sql("EXPLAIN " + statement, parameters)
+    )
+    db.rollback()
+    db.close()
+
+    length_index = next(idx.name for idx in plan.create if idx.field == "length")
+    assert length_index in explain
+
+    assert apply_plan(engine, plan_again, drop_stale=True) == []
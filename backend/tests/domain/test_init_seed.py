@@ -0,0 +1,28 @@
+# tests/domain/test_init_seed.py
+import json
+
+from app.db.init_seed import generate_chunk, plan_chunks, plan_datasets
+
+
+def test_generator_is_deterministic_and_chunked():
+    specs = plan_datasets(4, 120, seed=7)
+    assert [s.name for s in specs] == ["genes", "assays", "experiments", "genes_2"]
+    assert specs == plan_datasets(4, 120, seed=7)
+    assert specs[0].id != plan_datasets(1, 120, seed=8)[0].id
+    assert [s.rows for s in plan_datasets(3, None, seed=7)] == [3000, 2000, 2500]
+
+    chunks = plan_chunks(specs, first_id=10, seed=7, chunk_rows=50)
+    # 120 rows -> 50 + 50 + 20 per dataset, ids contiguous in plan order
+    assert [c.rows for c in chunks[:3]] == [50, 50, 20]
+    assert [c.first_id for c in chunks[:4]] == [10, 60, 110, 130]
+    assert sum(c.rows for c in chunks) == 480
+
+    data = generate_chunk(chunks[3])
+    assert data == generate_chunk(chunks[3])
+    assert data != generate_chunk(chunks[4])
+
+    lines = data.decode().splitlines()
+    assert len(lines) == 50
+    record_id, dataset_id, payload = lines[0].split("\t")
+    assert (int(record_id), dataset_id) == (130, specs[1].id)
+    assert set(json.loads(payload)) == {"name", "platform", "read_length", "coverage", "date"}
@@ -0,0 +1,137 @@
+# tests/domain/test_partitioning.py
+from sqlalchemy import create_engine, event, func, select, text
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.db.base import Base
+from app.db.index_manager import apply_plan, plan_indexes
+from app.db.init_seed import reset_demo_data
+from app.db.models import Bookmark, Dataset, DatasetField, Record
+from app.db.partitioning import convert, is_partitioned, list_partitions, partition_name
+from app.domain.repositories.bookmark_repo import list_bookmarks_for_user, upsert_bookmarks
+from app.domain.repositories.dataset_repo import get_dataset_with_fields
+from app.domain.repositories.record_repo import list_records
+from app.domain.services.dataset_service import delete_dataset
+from tests.conftest import TEST_DATABASE_URL
+
+
+# converting the shared schema would change it under the other tests
+SCHEMA = "partition_test"
+
+
+def _rows(db: Session, table: str) -> int:
+    return db.scalar(text(f"SELECT count(*) FROM {table}"))
+
+
+def test_partitioned_records_lifecycle():
+    admin = create_engine(TEST_DATABASE_URL)
+    with admin.begin() as conn:
+        conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+    engine = create_engine(
+        TEST_DATABASE_URL, connect_args={"options": f"-csearch_path={SCHEMA}"}
+    )
+    Base.metadata.create_all(engine)
+    SessionLocal = sessionmaker(bind=engine, expire_on_commit=False)
+
+    try:
+        db = SessionLocal()
+        a = Dataset(id="cdcdcdcd-cdcd-cdcd-cdcd-cdcdcdcdcdcd", name="part_a", row_count=2)
+        b = Dataset(id="cececece-cece-cece-cece-cececececece", name="part_b", row_count=1)
+        db.add_all([a, b])
+        db.flush()
+        db.add_all(
+            [
+                Record(dataset_id=a.id, payload={"symbol": "TP53"}),
+                Record(dataset_id=a.id, payload={"symbol": "EGFR"}),
+                Record(dataset_id=b.id, payload={"symbol": "MYC"}),
+                DatasetField(dataset_id=b.id, name="symbol", type="string", null_frac=0.0),
+            ]
+        )
+        db.flush()
+        first = db.scalar(select(func.min(Record.id)).where(Record.dataset_id == a.id))
+        db.add(Bookmark(user_id="u1", dataset_id=a.id, record_id=first, note="keep"))
+        db.commit()
+        assert not is_partitioned(db)
+        db.close()
+
+        with engine.begin() as conn:
+            assert convert(conn) == 2
+            assert convert(conn) is None
+
+        db = SessionLocal()
+        assert is_partitioned(db)
+        names = {p["name"] for p in list_partitions(db)}
+        assert names == {partition_name(a.id), partition_name(b.id), "records_default"}
+        assert _rows(db, partition_name(a.id)) == 2
+        assert _rows(db, partition_name(b.id)) == 1
+        assert db.scalar(select(Bookmark.note)) == "keep"
+
+        # bookmark joins go through the (dataset_id, id) key
+        items, _ = list_bookmarks_for_user(db, "u1", None, 1, 10, include_record=True)
+        assert [payload for _, payload in items] == [{"symbol": "TP53"}]
+        second = db.scalar(select(func.max(Record.id)).where(Record.dataset_id == a.id))
+        written = upsert_bookmarks(
+            db, "u1", [(a.id, second, "new"), (b.id, second, "wrong dataset")]
+        )
+        assert [(bm.record_id, inserted) for bm, inserted in written] == [(second, True)]
+        db.rollback()
+
+        # a dataset-scoped query reads only that dataset's partition, also
+        # as a generic (prepared) plan
+        captured = []
+
+        def capture(conn, cursor, statement, parameters, context, executemany):
+            if "LIMIT" in statement:
+                captured.append((statement, parameters))
+
+        conn = db.connection()
+        event.listen(conn, "before_cursor_execute", capture)
+        items, total, _ = list_records(db, a.id, 1, 10, None, sort="id:asc")
+        event.remove(conn, "before_cursor_execute", capture)
+        assert [r.payload["symbol"] for r in items] == ["TP53", "EGFR"] and total == 2
+
+        statement, parameters = captured[-1]
+        for mode in ("force_custom_plan", "force_generic_plan"):
+            conn.exec_driver_sql(f"SET plan_cache_mode = {mode}")
+            explain = "\n".join(
+                row[0] for row in conn.exec_driver_sql("EXPLAIN " + statement, parameters)
+            )
+            assert partition_name(a.id) in explain
+            assert partition_name(b.id) not in explain and "records_default" not in explain
+        db.rollback()
+
+        # new datasets get their partition with the dataset row
+        c = Dataset(id="cfcfcfcf-cfcf-cfcf-cfcf-cfcfcfcfcfcf", name="part_c")
+        db.add(c)
+        db.flush()
+        db.add(Record(dataset_id=c.id, payload={"symbol": "KRAS"}))
+        db.commit()
+        assert _rows(db, partition_name(c.id)) == 1
+        assert _rows(db, "records_default") == 0
+
+        # payload indexes are built on the partition
+        plan = plan_indexes(db, get_dataset_with_fields(db, b.id), hot_fields=["symbol"])
+        assert [f"ON {partition_name(b.id)} " in idx.ddl for idx in plan.create] == [True]
+        db.commit()
+        assert apply_plan(engine, plan) == []
+        assert plan_indexes(db, get_dataset_with_fields(db, b.id), ["symbol"]).create == []
+
+        # deleting a dataset drops its partition and its bookmarks
+        delete_dataset(db, a.id)
+        assert db.scalar(text("SELECT to_regclass(:t)"), {"t": partition_name(a.id)}) is None
+        assert db.scalar(select(func.count()).select_from(Bookmark)) == 0
+        assert db.scalar(select(func.count()).select_from(Record)) == 2
+
+        # reseeding drops the remaining partitions, bookmarked ones included
+        kras = db.scalar(select(Record.id).where(Record.dataset_id == c.id))
+        db.add(Bookmark(user_id="u1", dataset_id=c.id, record_id=kras))
+        db.commit()
+        reset_demo_data(db)
+        assert {p["name"] for p in list_partitions(db)} == {"records_default"}
+        assert db.scalar(select(func.count()).select_from(Dataset)) == 0
+        db.close()
+    finally:
+        engine.dispose()
+        with admin.begin() as conn:
+            conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        admin.dispose()
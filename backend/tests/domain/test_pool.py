@@ -0,0 +1,51 @@
+# tests/domain/test_pool.py
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+from app.core.config import settings
+from app.db.base import engine_options
+from app.db.pool import TimedQueuePool, pool_metrics
+from tests.conftest import TEST_DATABASE_URL
+
+
+def test_pool_metrics_track_waits_and_timeouts(monkeypatch):
+    monkeypatch.setattr(settings, "db_pool_timeout", 0.2)
+    eng = create_engine(
+        TEST_DATABASE_URL,
+        poolclass=TimedQueuePool,
+        **engine_options(pool_size=1, max_overflow=0, statement_timeout_ms=1234),
+    )
+    try:
+        with eng.connect() as conn:
+            assert conn.execute(text("SHOW statement_timeout")).scalar() == "1234ms"
+
+            busy = pool_metrics(eng.pool)
+            assert busy["checked_out"] == 1
+            assert busy["idle"] == 0
+
+            with pytest.raises(PoolTimeoutError):
+                eng.connect()
+
+        metrics = pool_metrics(eng.pool)
+        assert metrics["pool"] == "TimedQueuePool"
+        assert metrics["size"] == 1
+        assert metrics["checked_out"] == 0
+        assert metrics["idle"] == 1
+        assert metrics["checkouts"] == 1
+        assert metrics["timeouts"] == 1
+        assert metrics["wait_ms_max"] >= metrics["wait_ms_avg"] >= 0
+    finally:
+        eng.dispose()
+
+
+def test_pool_endpoint_requires_admin(client: TestClient, monkeypatch):
+    monkeypatch.setattr(settings, "admin_token", "secret")
+
+    assert client.get("/api/v1/admin/pools").status_code == 403
+
+    resp = client.get("/api/v1/admin/pools", headers={"X-Admin-Token": "secret"})
+    assert resp.status_code == 200
+    assert set(resp.json()) == {"api", "export", "async"}
+    assert resp.json()["export"]["size"] == settings.export_pool_size
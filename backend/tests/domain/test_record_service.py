@@ -39,3 +39,195 @@ def test_list_records_service():
 
     assert result["total"] == 3
     assert len(result["items"]) == 3
+
+
+def test_list_records_eq_filters_use_typed_matches():
+    db: Session = TestingSessionLocal()
+
+    ds = Dataset(
+        id="66666666-6666-6666-6666-666666666666",
+        name="eq_filter_test",
+        description="Equality filters",
+        row_count=4,
+    )
+    db.add(ds)
+    db.flush()
+
+    db.add_all(
+        [
+            Record(dataset_id=ds.id, payload={"symbol": "TP53", "length": 1000, "coding": True}),
+            Record(dataset_id=ds.id, payload={"symbol": "EGFR", "length": 1000.5, "coding": False}),
+            Record(dataset_id=ds.id, payload={"symbol": "1000", "length": 7, "coding": "true"}),
+            Record(dataset_id=ds.id, payload={"symbol": "02139", "length": 9007199254740993}),
+        ]
+    )
+    db.commit()
+
+    def symbols(filter_str: str) -> list:
+        result = list_records(
+            db=db,
+            dataset_id=ds.id,
+            page=1,
+            limit=10,
+            search=None,
+            sort="id:asc",
+            filter_str=filter_str,
+        )
+        return [item["payload"]["symbol"] for item in result["items"]]
+
+    assert symbols("symbol:eq:TP53") == ["TP53"]
+    assert symbols("length:eq:1000") == ["TP53"]
+    assert symbols("length:eq:1000.5") == ["EGFR"]
+    assert symbols("symbol:eq:1000") == ["1000"]
+    assert symbols("coding:eq:true") == ["TP53", "1000"]
+    assert symbols("symbol:eq:TP53,coding:eq:true") == ["TP53"]
+    assert symbols("symbol:eq:02139") == ["02139"]
+    assert symbols("length:eq:9007199254740993") == ["02139"]
+    assert symbols("length:ne:1000") == ["EGFR", "1000", "02139"]
+
+
+def test_list_records_count_modes():
+    from datetime import datetime, timedelta
+
+    db: Session = TestingSessionLocal()
+
+    ds = Dataset(
+        id="99999999-9999-9999-9999-999999999999",
+        name="count_mode_test",
+        description="Count modes",
+        row_count=1234,
+    )
+    db.add(ds)
+    db.flush()
+    db.add_all([Record(dataset_id=ds.id, payload={"n": i}) for i in range(4)])
+    db.commit()
+
+    def total(count_mode: str, filter_str=None) -> tuple:
+        result = list_records(
+            db=db,
+            dataset_id=ds.id,
+            page=1,
+            limit=2,
+            search=None,
+            sort=None,
+            filter_str=filter_str,
+            count_mode=count_mode,
+        )
+        return result["total"], result["total_estimated"]
+
+    assert total("exact") == (4, False)
+    # nothing narrows the set -> the stored row_count is the estimate
+    assert total("estimated") == (1234, True)
+    assert total("estimated", "n:gt:1")[1] is True
+
+    assert total("cached", "n:ge:0") == (4, False)
+    db.add(Record(dataset_id=ds.id, payload={"n": 4}))
+    db.commit()
+    # same dataset version -> memoized total
+    assert total("cached", "n:ge:0") == (4, False)
+
+    ds.updated_at = datetime.utcnow() + timedelta(seconds=1)
+    db.commit()
+    assert total("cached", "n:ge:0") == (5, False)
+
+
+def test_list_records_json_matches_model_path():
+    import json
+
+    from app.domain.schemas.record import PaginatedRecords
+    from app.domain.services.record_service import list_records_json
+
+    db: Session = TestingSessionLocal()
+    ds = Dataset(
+        id="adadadad-adad-adad-adad-adadadadadad",
+        name="passthrough_test",
+        description="Raw JSON passthrough test dataset",
+        row_count=3,
+    )
+    db.add(ds)
+    db.flush()
+    db.add_all(
+        [
+            Record(dataset_id=ds.id, payload={"name": "Zoë \"q\" \\ \n", "n": 1.5}),
+            Record(dataset_id=ds.id, payload={"name": "b", "nested": {"a": [1, None]}}),
+            Record(dataset_id=ds.id, payload={"name": "c", "n": -2}),
+        ]
+    )
+    db.commit()
+
+    for params in (
+        dict(page=1, limit=2, sort="name:asc", filter_str=None),
+        dict(page=2, limit=2, sort="name:asc", filter_str=None),
+        dict(page=1, limit=10, sort=None, filter_str="n:gt:0"),
+    ):
+        kwargs = dict(db=db, dataset_id=ds.id, search=None, **params)
+        expected = PaginatedRecords.model_validate(list_records(**kwargs))
+        body = list_records_json(**kwargs)
+        assert json.loads(body) == expected.model_dump(mode="json")
+    db.close()
+
+
+def test_filters_are_validated_typed_and_cached():
+    import pytest
+    from fastapi import HTTPException
+    from sqlalchemy import event
+
+    from app.domain.repositories.filter_compiler import statement_cache
+    from app.domain.services.stats_service import compute_schema_stats
+
+    db: Session = TestingSessionLocal()
+    ds = Dataset(
+        id="aeaeaeae-aeae-aeae-aeae-aeaeaeaeaeae",
+        name="filter_compiler_test",
+        description="Filter compiler test dataset",
+        row_count=3,
+    )
+    db.add(ds)
+    db.flush()
+    db.add_all(
+        [
+            Record(dataset_id=ds.id, payload={"name": "a", "day": "2024-01-05", "n": 1}),
+            Record(dataset_id=ds.id, payload={"name": "b", "day": "2024-02-01", "n": 2}),
+            Record(dataset_id=ds.id, payload={"name": "c", "day": "2023-12-31", "n": 3}),
+        ]
+    )
+    db.flush()
+    compute_schema_stats(db, ds)
+    db.commit()
+
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    def names(filter_str, sort="id:asc"):
+        result = list_records(
+            db=db, dataset_id=ds.id, page=1, limit=10, search=None,
+            sort=sort, filter_str=filter_str,
+        )
+        return [item["payload"]["name"] for item in result["items"]]
+
+    # values are bound, so they cannot break out of the predicate
+    assert names("name:eq:a') OR true --") == []
+    # non-numeric ranges on string fields compare as text
+    assert names("day:ge:2024-01-01") == ["a", "b"]
+    assert names("n:gt:1,day:lt:2024-02-01") == ["c"]
+
+    for bad in ("nope:eq:1", "n:gt:abc", "n') > '0' OR true --:eq:1"):
+        with pytest.raises(HTTPException) as exc:
+            names(bad)
+        assert exc.value.status_code == 400, bad
+    with pytest.raises(HTTPException):
+        names(None, sort="nope:asc")
+
+    # values are bound: one SQL text and one compiled entry per shape
+    event.listen(db.get_bind(), "before_cursor_execute", capture)
+    try:
+        cached_before = len(statement_cache)
+        assert names("n:ge:2") == ["b", "c"]
+        assert names("n:ge:3") == ["c"]
+        assert len(statement_cache) - cached_before <= 2  # count + page
+    finally:
+        event.remove(db.get_bind(), "before_cursor_execute", capture)
+    assert len(set(statements)) == len(statements) // 2
+    db.close()
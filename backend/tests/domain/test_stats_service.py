@@ -0,0 +1,57 @@
+# tests/domain/test_stats_service.py
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.db.models import Dataset, DatasetField, Record
+from app.domain.services.stats_service import compute_schema_stats
+from tests.conftest import TestingSessionLocal
+
+
+def test_compute_schema_stats_in_sql():
+    db: Session = TestingSessionLocal()
+    ds = Dataset(
+        id="cccccccc-cccc-cccc-cccc-cccccccccccc",
+        name="stats_test",
+        description="Schema stats test dataset",
+    )
+    db.add(ds)
+    db.flush()
+    db.add_all(
+        [
+            Record(dataset_id=ds.id, payload={"symbol": "TP53", "length": 10, "mixed": 1}),
+            Record(dataset_id=ds.id, payload={"symbol": "TP53", "length": 2.5, "flag": True}),
+            Record(dataset_id=ds.id, payload={"symbol": "EGFR", "length": None, "mixed": "x"}),
+            Record(dataset_id=ds.id, payload={"symbol": "MYC", "empty": None}),
+        ]
+    )
+    db.flush()
+
+    compute_schema_stats(db, ds)
+    db.commit()
+
+    fields = {
+        f.name: f
+        for f in db.scalars(select(DatasetField).where(DatasetField.dataset_id == ds.id))
+    }
+    assert ds.row_count == 4
+    assert sorted(fields) == ["empty", "flag", "length", "mixed", "symbol"]
+
+    symbol = fields["symbol"]
+    assert (symbol.type, symbol.null_frac, symbol.distinct_count) == ("string", 0.0, 3)
+    assert symbol.example_value == "TP53"
+
+    length = fields["length"]
+    assert (length.type, length.null_frac, length.distinct_count) == ("number", 0.5, 2)
+    assert length.example_value == 10
+
+    assert fields["mixed"].type == "string"
+    assert fields["flag"].type == "boolean"
+    assert fields["flag"].null_frac == 0.75
+    assert (fields["empty"].type, fields["empty"].example_value) == ("unknown", None)
+
+    # re-running replaces the previous stats
+    compute_schema_stats(db, ds)
+    db.commit()
+    count = len(db.scalars(select(DatasetField).where(DatasetField.dataset_id == ds.id)).all())
+    assert count == 5
+    db.close()